@@ -4,6 +4,7 @@ from components.network_graph.network_graph_layout import network_graph_layout
 from components.plots.cardinality_by_type import card_layout
 from components.plots.promotions_demotions import promo_demo_layout
 from components.plots.avg_core_intervals import avg_intervals_layout
+from components.plots.plot_data import plot_data_layout
 from components.sidebar.sidebar_layout import sidebar_layout
 from components.sidebar import sidebar_callbacks
 from components.network_graph import network_graph_callbacks
@@ -15,6 +16,7 @@ plots_layout = html.Div(
         className="column",
         style={"flex": "33%"},
         children=[ 
+            plot_data_layout,
             card_layout,
             promo_demo_layout, 
             avg_intervals_layout
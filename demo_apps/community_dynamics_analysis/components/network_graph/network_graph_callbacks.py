@@ -1,8 +1,35 @@
 import numpy as np
-from dash import Input, Output, State, callback, ctx
+from dash import Input, Output, State, callback, ctx, no_update
 import datetime as dt
-from data_utils.queries import fetch_data
-from graph_utils.graph_helper import build_graph, apply_pagerank, find_threshold, draw_network
+from data_utils.engine import load_config
+from data_utils.queries import fetch_data, marks_date_range
+from data_utils.cache import LRUCache
+from graph_utils.graph_helper import (apply_pagerank, normalize_scores, find_threshold, draw_network,
+                                      draw_network_animation, WEBGL_THRESHOLD, MAX_FIGURE_BYTES)
+from graph_utils.window_graph import get_windowed_graph
+from graph_utils.layout import cached_layout
+from graph_utils.timeline import peek_timeline, get_timeline, PAGERANK_TOL
+from graph_utils.frame_store import frame_store
+from graph_utils.prefetch import FramePrefetcher
+
+config = load_config()
+
+# animation frame duration (in milliseconds), one slider step per frame
+ANIMATION_INTERVAL = config.get('animation_interval', 500)
+
+# rendering settings of the network graph (see README)
+FIGURE_SETTINGS = {
+    'webgl_threshold': config.get('webgl_threshold', WEBGL_THRESHOLD),
+    'max_figure_bytes': config.get('max_figure_bytes', MAX_FIGURE_BYTES)
+}
+# PageRank settings of the timeline frames and windows, the same as the plots (see README)
+PAGERANK_SETTINGS = {
+    'tol': config.get('pagerank_tol', PAGERANK_TOL),
+    'warm_start': config.get('pagerank_warm_start', False)
+}
+
+# animated figures played in the browser, keyed by request (see `render_animation`)
+animation_cache = LRUCache(max_entries=4, ttl=900)
 
 
 
@@ -11,9 +38,19 @@ from graph_utils.graph_helper import build_graph, apply_pagerank, find_threshold
     Output('animation-interval', 'interval'),
     Input('play-button', 'n_clicks'),
     Input('pause-button', 'n_clicks'),
+    State('repo-org', 'value'),
+    State('repo-name', 'value'),
+    State('graph-slider', 'marks'),
+    State('cmt-weight', 'value'),
+    State('ism-weight', 'value'),
+    State('pr-weight', 'value'),
+    State('prm-weight', 'value'),
+    State('threshold-dropdown', 'value'),
+    State('number-input', 'value'),
     prevent_initial_call=True
 )
-def toggle_animation(play_clicks, pause_clicks):
+def toggle_animation(play_clicks, pause_clicks, repo_org, repo_name, marks, cmt_weight, ism_weight, pr_weight,
+                     prm_weight, threshold_type, threshold_value):
     """
     Control the animation based on play and pause button clicks.
 
@@ -21,6 +58,8 @@ def toggle_animation(play_clicks, pause_clicks):
     -----
         play_clicks (int): The number of times the play button has been clicked.
         pause_clicks (int): The number of times the pause button has been clicked.
+        repo_org, repo_name, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold_type,
+        threshold_value: The parameters of the animation, see `update_network`.
 
     Returns:
     --------
@@ -30,7 +69,10 @@ def toggle_animation(play_clicks, pause_clicks):
                - int: interval duration (in milliseconds) for the animation when it is enabled.
     """
     if ctx.triggered_id == 'play-button':
-        return False, 5000 # Enable the interval and set the interval duration (in milliseconds)
+        return False, ANIMATION_INTERVAL # Enable the interval and set the interval duration (in milliseconds)
+    # drop the frames computed ahead for this animation, other sessions keep theirs
+    frame_prefetcher.cancel(request_key(repo_org, repo_name, marks, cmt_weight, ism_weight, pr_weight, prm_weight,
+                                        threshold_type, threshold_value))
     return True, None # Disable the interval
 
 
@@ -62,18 +104,26 @@ def update_slider_value(n_intervals, slider_value, slider_max):
     reaches the maximum value, it resets to the minimum value, allowing the animation to loop through the time 
     intervals continuously.
     """
-    new_value = [(slider_value[0] + 1) % (slider_max + 1), (slider_value[1] + 1) % (slider_max + 1)]
-    return new_value
+    return next_slider_value(slider_value, slider_max)
+
+
+def next_slider_value(slider_value, slider_max):
+    """
+    Return the slider value of the next animation frame.
+    """
+    return [(slider_value[0] + 1) % (slider_max + 1), (slider_value[1] + 1) % (slider_max + 1)]
 
 
 @callback(
     Output('graph-animation', 'figure'),
     Input('submit-button', 'n_clicks'),
     Input('graph-slider', 'value'),
-    Input('animation-interval', 'n_intervals'),
+    Input('client-animation', 'value'),
+    State('animation-interval', 'disabled'),
     State('repo-org', 'value'),
     State('repo-name', 'value'),
     State('graph-slider', 'marks'),
+    State('graph-slider', 'max'),
     State('cmt-weight', 'value'), 
     State('ism-weight', 'value'), 
     State('pr-weight', 'value'), 
@@ -82,19 +132,28 @@ def update_slider_value(n_intervals, slider_value, slider_max):
     State('number-input', 'value'),
     prevent_initial_call=True
 )
-def update_network(n_clicks, slider_value, n_intervals, repo_org, repo_name, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold_type, threshold_value):
+def update_network(n_clicks, slider_value, client_animation, animation_disabled, repo_org, repo_name, marks, slider_max,
+                   cmt_weight, ism_weight, pr_weight, prm_weight, threshold_type, threshold_value):
     """
     Build, update, and plot the network graph based on user input and animation intervals.
 
+    During playback, the figures of the next frames are computed ahead of time by `frame_prefetcher` 
+    and served from its buffer when the slider reaches them. Submitting new parameters cancels them.
+
+    With the "Play in browser" option, the figure carries the frames of every interval and is played 
+    by the browser with its own controls (see `render_animation`), the graph slider is not used.
+
     Args:
     -----
         n_clicks (int): The number of times the submit button has been clicked.
         slider_value (list): The current value of the graph slider, representing the selected time interval.
-        n_intervals (int): The number of times the animation interval has been triggered.
+        client_animation (list): The "Play in browser" option value, ['client'] when checked.
+        animation_disabled (bool): Whether the animation interval is disabled (the animation is paused).
         repo_org (str): The organization name of the repository.
         repo_name (str): The name of the repository.
         marks (dict): A dictionary containing the time intervals as keys and their corresponding labels 
                       (formatted as "%m/%Y") as values.
+        slider_max (int): The maximum value of the graph slider.
         cmt_weight, ism_weight, pr_weight, prm_weight (float): The weights to assign to edges in 
                                                                the graph based on event type.
         threshold_type (str): The type of threshold for differentiating core and peripheral contributors 
@@ -105,18 +164,136 @@ def update_network(n_clicks, slider_value, n_intervals, repo_org, repo_name, mar
     --------
         go.Figure: A Plotly Figure object representing the updated network graph visualization.
     """
+    key = request_key(repo_org, repo_name, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold_type,
+                      threshold_value)
+    if ctx.triggered_id == 'submit-button':
+        frame_prefetcher.cancel(key) # the data may have changed
+    if client_animation:
+        if ctx.triggered_id == 'graph-slider':
+            return no_update # the frames are selected by the slider of the figure
+        return animation_cache.get_or_load(key, lambda: render_animation(key))
+    frame = tuple(slider_value)
+    figure = frame_prefetcher.get(key, frame)
+    if figure is None:
+        figure = render_network(key, frame)
+
+    if not animation_disabled:
+        # compute the next frames of the playback while this one is displayed
+        upcoming = []
+        for _ in range(frame_prefetcher.depth):
+            slider_value = next_slider_value(slider_value, slider_max)
+            upcoming.append(tuple(slider_value))
+        frame_prefetcher.schedule(key, upcoming)
+
+    return figure
+
+
+def request_key(repo_org, repo_name, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold_type,
+                threshold_value):
+    """
+    Return the key identifying the figures of a request, used by `frame_prefetcher` and `animation_cache`.
+    """
+    return (repo_org, repo_name, tuple((marks or {}).values()), (cmt_weight, ism_weight, pr_weight, prm_weight),
+            (threshold_type, threshold_value))
+
 
-    
-    data = fetch_data(repo_org, repo_name) # fetch data from Augur
-    marks = list(marks.values())
+def render_network(key, slider_value):
+    """
+    Build the network graph figure of a window.
+
+    Args:
+    -----
+        key (tuple): The request (repo_org, repo_name, marks, weights, threshold), with the marks 
+                     (formatted as "%m/%Y") in slider order, the weights as (cmt_weight, ism_weight, 
+                     pr_weight, prm_weight) and the threshold as (threshold_type, threshold_value).
+        slider_value (tuple): The slider positions (mark indices) of the window.
+
+    Returns:
+    --------
+        go.Figure: A Plotly Figure object representing the network graph visualization of the window.
+    """
+    repo_org, repo_name, marks, (cmt_weight, ism_weight, pr_weight, prm_weight), (threshold_type, threshold_value) = key
+    marks = list(marks)
     # convert dates to dt.datetime objects
     start_date = dt.datetime.strptime(marks[slider_value[0]], "%m/%Y") 
     end_date = dt.datetime.strptime(marks[slider_value[1]], "%m/%Y")
+    # the layout is cached per window and weights, and seeded with the layout of the preceding window if drawn
+    layout_key = (repo_org, repo_name, (cmt_weight, ism_weight, pr_weight, prm_weight))
+    layout_seed = None
+    if slider_value[0] > 0:
+        layout_seed = cached_layout(layout_key, (dt.datetime.strptime(marks[slider_value[0] - 1], "%m/%Y"),
+                                                 dt.datetime.strptime(marks[slider_value[1] - 1], "%m/%Y")))
+
+    # single interval windows precomputed offline (see graph_utils/precompute.py) are read from disk
+    if slider_value[1] == slider_value[0] + 1:
+        precomputed = frame_store.frame((repo_org, repo_name), marks, (cmt_weight, ism_weight, pr_weight, prm_weight), 
+                                        slider_value[0])
+        if precomputed is not None:
+            G, pagerank_scores = precomputed
+            norm_scores = normalize_scores(pagerank_scores)
+            threshold_score = find_threshold(np.array(list(pagerank_scores.values())),
+                                             [threshold_type, threshold_value])
+            return draw_network(G, start_date, end_date, pagerank_scores, norm_scores, threshold_score, 
+                                layout_key, layout_seed, **FIGURE_SETTINGS)
+
+    data = fetch_data(repo_org, repo_name, *marks_date_range(marks)) # fetch the analysis period data from Augur
+
+    # single interval windows are frames of a timeline, reuse its scores if one was computed already.
+    # The plots compute theirs in a background job process, which shares it through a disk cache (see plot_data.py)
+    timeline = None
+    if slider_value[1] == slider_value[0] + 1:
+        timeline = peek_timeline((repo_org, repo_name), marks, cmt_weight, ism_weight, pr_weight, prm_weight, 
+                                 [threshold_type, threshold_value], **PAGERANK_SETTINGS)
+
+    # graph engine shared across slider moves, only the events entering/leaving the window are processed.
+    # The window graph is copied so the engine is released while drawing (frames are prefetched concurrently)
+    graph_engine = get_windowed_graph((repo_org, repo_name), data, marks, cmt_weight, ism_weight, pr_weight, prm_weight)
+    G = graph_engine.graph(slider_value[0], slider_value[1])
+    if timeline is not None:
+        pagerank_scores, threshold_score = timeline.frame(slider_value[0])
+        norm_scores = normalize_scores(pagerank_scores)
+    else:
+        # pagerank scores for node size and color, optionally warm started from the previously displayed window
+        nstart = graph_engine.last_scores if PAGERANK_SETTINGS['warm_start'] else None
+        pagerank_scores, norm_scores = apply_pagerank(G, nstart, PAGERANK_SETTINGS['tol'])
+        graph_engine.last_scores = pagerank_scores
+
+        # based on threshold type and value, calculate threshold score for core contributors 
+        threshold_score = find_threshold(np.array(list(pagerank_scores.values())), [threshold_type, threshold_value]) 
+
+    return draw_network(G, start_date, end_date, pagerank_scores, norm_scores, threshold_score, 
+                        layout_key, layout_seed, **FIGURE_SETTINGS)
+
+def render_animation(key):
+    """
+    Build the animated network graph figure of every interval of the slider, played in the browser.
+
+    Args:
+    -----
+        key (tuple): The request (repo_org, repo_name, marks, weights, threshold), see `render_network`.
+
+    Returns:
+    --------
+        go.Figure: A Plotly Figure object with a frame per interval (see `graph_helper.draw_network_animation`).
+    """
+    repo_org, repo_name, marks, weights, threshold = key
+    marks = list(marks)
+
+    # intervals precomputed offline (see graph_utils/precompute.py) are read from disk
+    timeline = frame_store.timeline((repo_org, repo_name), marks, weights, threshold)
+    if timeline is not None:
+        graphs = [frame_store.frame((repo_org, repo_name), marks, weights, i)[0] for i in range(len(timeline))]
+    else:
+        data = fetch_data(repo_org, repo_name, *marks_date_range(marks)) # fetch the analysis period data from Augur
+        timeline = get_timeline((repo_org, repo_name), data, marks, *weights, threshold, **PAGERANK_SETTINGS)
+        graph_engine = get_windowed_graph((repo_org, repo_name), data, marks, *weights)
+        graphs = [graph_engine.graph(i, i + 1) for i in range(len(timeline))]
 
-    G = build_graph(data, start_date, end_date, cmt_weight, ism_weight, pr_weight, prm_weight) # use Augur data to create and populate nx.Graph object
-    pagerank_scores, norm_scores = apply_pagerank(G) # pagerank scores for node size and color 
+    windows = [(G, *timeline.frame(i)) for i, G in enumerate(graphs)]
+    return draw_network_animation(windows, marks, (repo_org, repo_name, weights), ANIMATION_INTERVAL, 
+                                  FIGURE_SETTINGS['max_figure_bytes'])
 
-    # based on threshold type and value, calculate threshold score for core contributors 
-    threshold_score = find_threshold(np.array(list(pagerank_scores.values())), [threshold_type, threshold_value]) 
 
-    return draw_network(G, start_date, end_date, pagerank_scores, norm_scores, threshold_score)
+# computes the figures of the upcoming animation frames ahead of playback
+frame_prefetcher = FramePrefetcher(render_network, workers=config.get('prefetch_workers', 2), 
+                                   depth=config.get('prefetch_frames', 4), max_keys=config.get('prefetch_requests', 8))
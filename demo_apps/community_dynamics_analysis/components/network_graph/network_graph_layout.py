@@ -45,6 +45,14 @@ slider_layout = html.Div(
             ),
             html.Button('▶', id='play-button', n_clicks=0, style={'margin-left': '10px', 'margin-right': '10px'}),
             html.Button('⏸', id='pause-button', n_clicks=0),
+            # plays the animation in the browser, from a figure carrying all the frames
+            dcc.Checklist(
+                id='client-animation',
+                options=[{'label': 'Play in browser', 'value': 'client'}],
+                value=[],
+                inline=True,
+                style={'display': 'inline-block', 'margin-left': '10px'}
+            ),
         ]
     )
 
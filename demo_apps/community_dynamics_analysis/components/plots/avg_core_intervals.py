@@ -1,9 +1,9 @@
 from dash import dcc, html
 import dash_bootstrap_components as dbc
-from dash import Input, Output, State, callback 
+from dash import Input, Output, callback 
 import plotly.graph_objs as go
-from data_utils.queries import fetch_data
-from components.plots.plots_helper import get_plot_data, add_trace
+import pandas as pd
+from components.plots.plots_helper import add_trace
 
 # layout
 avg_intervals_layout = html.Div(
@@ -38,45 +38,25 @@ avg_intervals_layout = html.Div(
         Output('average-intervals', 'figure')
     ],
     [
-        Input('submit-button', 'n_clicks')
-    ],
-    [
-        State('repo-org', 'value'),
-        State('repo-name', 'value'),
-        State('graph-slider', 'marks'),
-        State('cmt-weight', 'value'), 
-        State('ism-weight', 'value'), 
-        State('pr-weight', 'value'), 
-        State('prm-weight', 'value'),
-        State('threshold-dropdown', 'value'), 
-        State('number-input', 'value')
+        Input('plot-data', 'data')
     ],
     prevent_initial_call=True
 )
-def avg_int_plot(n_clicks, repo_org, repo_name, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold_type, threshold_value):
+def avg_int_plot(plot_data):
     """
     Generate a trend plot for average intervals a core node has served as core at a given interval.
 
     Args:
     -----
-        n_clicks (int): The number of times the submit button has been clicked.
-        repo_org (str): The organization name of the repository.
-        repo_name (str): The name of the repository.
-        marks (list): A list of formatted date strings representing the slider marks.
-        cmt_weight, ism_weight, pr_weight, prm_weight (float): The weights to assign to edges in 
-                                                               the graph based on event type.
-        threshold_type (str): The selected threshold type for differentiating core and peripheral nodes 
-                              ('elbow', 'percentage', or 'number').
-        threshold_value (float): The selected threshold value for threshold calculation.
+        plot_data (dict): The slider marks ('marks') and plot data ('plot_data') computed in the background 
+                          after Submit (see `plot_data.load_plot_data`).
 
     Returns:
     --------
         go.Figure: A Plotly Figure representing the plot for average intervals as core.
     """
-    marks = list(marks.values())
-    threshold = [threshold_type, threshold_value]
-    data = fetch_data(repo_org, repo_name)
-    plot_df = get_plot_data(data, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold)
+    marks = plot_data['marks']
+    plot_df = pd.DataFrame(plot_data['plot_data'])
 
     fig_data = add_trace(plot_df['avg_intervals'], 'average #intervals', 'red', marks)
 
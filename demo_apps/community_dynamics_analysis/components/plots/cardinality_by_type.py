@@ -1,9 +1,10 @@
 from dash import dcc, html
 import dash_bootstrap_components as dbc
-from dash import Input, Output, State, callback 
+from dash import Input, Output, callback 
+from dash.exceptions import PreventUpdate
 import plotly.graph_objs as go
-from data_utils.queries import fetch_data
-from components.plots.plots_helper import get_plot_data, add_trace
+import pandas as pd
+from components.plots.plots_helper import add_trace
 
 #layout
 card_layout =  html.Div(
@@ -46,22 +47,11 @@ card_layout =  html.Div(
     ],
     [
         Input('cardinality-checklist', 'value'),
-        Input('submit-button', 'n_clicks')
-    ],
-    [
-        State('repo-org', 'value'),
-        State('repo-name', 'value'),
-        State('graph-slider', 'marks'),
-        State('cmt-weight', 'value'), 
-        State('ism-weight', 'value'), 
-        State('pr-weight', 'value'), 
-        State('prm-weight', 'value'),
-        State('threshold-dropdown', 'value'), 
-        State('number-input', 'value')
+        Input('plot-data', 'data')
     ],
     prevent_initial_call=True
 )
-def card_plot(card_checks, n_clicks, repo_org, repo_name, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold_type, threshold_value):
+def card_plot(card_checks, plot_data):
     """
     Generate a trend plot for cardinality by contributor type.
 
@@ -69,24 +59,17 @@ def card_plot(card_checks, n_clicks, repo_org, repo_name, marks, cmt_weight, ism
     -----
         card_checks (list): A list containing strings representing the selected contributor types to 
                             display on the plot (e.g., 'core', 'peripheral', 'new', 'all time').
-        n_clicks (int): The number of times the submit button has been clicked.
-        repo_org (str): The organization name of the repository.
-        repo_name (str): The name of the repository.
-        marks (list): A list of formatted date strings representing the slider marks.
-        cmt_weight, ism_weight, pr_weight, prm_weight (float): The weights to assign to edges in 
-                                                               the graph based on event type.
-        threshold_type (str): The selected threshold type for differentiating core and peripheral nodes 
-                              ('elbow', 'percentage', or 'number').
-        threshold_value (float): The selected threshold value for threshold calculation.
+        plot_data (dict): The slider marks ('marks') and plot data ('plot_data') computed in the background 
+                          after Submit (see `plot_data.load_plot_data`).
 
     Returns:
     --------
         go.Figure: A Plotly Figure representing the plot for cardinality by contributor type.
     """
-    marks = list(marks.values())
-    threshold = [threshold_type, threshold_value]
-    data = fetch_data(repo_org, repo_name)
-    plot_df = get_plot_data(data, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold)
+    if plot_data is None:
+        raise PreventUpdate # nothing submitted yet
+    marks = plot_data['marks']
+    plot_df = pd.DataFrame(plot_data['plot_data'])
  
     fig_data = []
     # add traces based on user selection
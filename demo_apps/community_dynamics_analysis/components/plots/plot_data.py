@@ -0,0 +1,107 @@
+from dash import dcc, html
+from dash import Input, Output, State, callback, DiskcacheManager
+import diskcache
+from data_utils.engine import load_config
+from components.plots.plots_helper import get_repo_plot_data
+from graph_utils.timeline import share_timelines, PAGERANK_TOL
+
+config = load_config()
+
+# PageRank settings of the timeline frames (see README)
+PAGERANK_SETTINGS = {
+    'tol': config.get('pagerank_tol', PAGERANK_TOL),
+    'warm_start': config.get('pagerank_warm_start', False)
+}
+
+# background jobs run in their own process, with their state and results in a local disk cache
+background_cache = diskcache.Cache(config.get('background_cache_dir', './cache'))
+background_manager = DiskcacheManager(background_cache)
+# the timelines of the jobs are passed back to the network graph through the same disk cache
+share_timelines(background_cache)
+
+# layout
+plot_data_layout = html.Div(
+    children=[
+        # the plot data of the last Submit, shared by the trend plots
+        dcc.Store(id='plot-data'),
+        html.Div(
+            id='plot-progress-container',
+            style={'display': 'none'},
+            children=[
+                html.Progress(id='plot-progress', value='0', max='1', style={'width': '100%'}),
+                html.Span(id='plot-progress-text', style={'font-size': '12px', 'color': 'grey'})
+            ]
+        )
+    ]
+)
+
+# plot data callback
+@callback(
+    Output('plot-data', 'data'),
+    Input('submit-button', 'n_clicks'),
+    [
+        State('repo-org', 'value'),
+        State('repo-name', 'value'),
+        State('graph-slider', 'marks'),
+        State('cmt-weight', 'value'),
+        State('ism-weight', 'value'),
+        State('pr-weight', 'value'),
+        State('prm-weight', 'value'),
+        State('threshold-dropdown', 'value'),
+        State('number-input', 'value')
+    ],
+    background=True,
+    manager=background_manager,
+    progress=[
+        Output('plot-progress', 'value'),
+        Output('plot-progress', 'max'),
+        Output('plot-progress-text', 'children')
+    ],
+    running=[
+        (Output('plot-progress-container', 'style'), {'display': 'block'}, {'display': 'none'})
+    ],
+    prevent_initial_call=True
+)
+def load_plot_data(set_progress, n_clicks, repo_org, repo_name, marks, cmt_weight, ism_weight, pr_weight, prm_weight,
+                   threshold_type, threshold_value):
+    """
+    Compute the data of the trend plots in a background job, reporting the frames done.
+
+    The job runs outside of the request handlers, so a long computation neither blocks a worker thread
+    nor hits proxy timeouts. Pressing Submit again while it runs terminates it and starts a new one.
+
+    The job is a forked process: the fork hooks of `data_utils` give it its own engine connections and
+    query threads, and it starts from the fetch cache of its parent. The timeline it computes is put in
+    the disk cache of the jobs (see `timeline.share_timelines`), where the network graph of the parent
+    finds it with `peek_timeline` instead of computing the scores of its windows again.
+
+    Args:
+    -----
+        set_progress (callable): The progress function provided by Dash, updating the progress bar.
+        n_clicks (int): The number of times the submit button has been clicked.
+        repo_org (str): The organization name of the repository.
+        repo_name (str): The name of the repository.
+        marks (dict): A dictionary containing the slider positions as keys and their corresponding
+                      labels (formatted as "%m/%Y") as values.
+        cmt_weight, ism_weight, pr_weight, prm_weight (float): The weights to assign to edges in
+                                                               the graph based on event type.
+        threshold_type (str): The selected threshold type for differentiating core and peripheral nodes
+                              ('elbow', 'percentage', or 'number').
+        threshold_value (float): The selected threshold value for threshold calculation.
+
+    Returns:
+    --------
+        dict: The slider marks ('marks') and the columns of the plot data frame ('plot_data', see
+              `plots_helper.get_plot_data`).
+    """
+    marks = list(marks.values())
+    threshold = [threshold_type, threshold_value]
+
+    def progress(frames_done, frames_total):
+        set_progress((str(frames_done), str(frames_total), f"{frames_done}/{frames_total} intervals"))
+
+    set_progress(('0', str(max(len(marks) - 1, 1)), "Fetching data"))
+    plot_df = get_repo_plot_data(repo_org, repo_name, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold,
+                                 progress, **PAGERANK_SETTINGS)
+
+    return {'marks': marks, 'plot_data': plot_df.to_dict('list')}
@@ -1,12 +1,11 @@
-import numpy as np
-import pandas as pd 
-import networkx as nx
 import plotly.graph_objs as go
-from graph_utils.graph_helper import find_threshold, build_graph
-import datetime as dt
+from data_utils.queries import fetch_data, marks_date_range
+from graph_utils.timeline import Timeline, get_timeline, PAGERANK_TOL
+from graph_utils.frame_store import frame_store
 
 
-def get_plot_data(data, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold): 
+def get_plot_data(data, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold, progress=None,
+                  tol=PAGERANK_TOL, warm_start=False):
     """
     Get plot data for each interval frame of the network graph. The data collected at each interval includes: 
         - core: count of core nodes
@@ -26,6 +25,12 @@ def get_plot_data(data, marks, cmt_weight, ism_weight, pr_weight, prm_weight, th
         threshold (tuple): A tuple containing the threshold type and the corresponding value for 
                            threshold calculation. The tuple format should be 
                            (threshold_type, threshold_value).
+        progress (callable): Optional function called as `progress(frames_done, frames_total)` after 
+                             each interval frame is computed.
+        tol (float): The PageRank error tolerance.
+        warm_start (bool): Whether each frame starts from the PageRank scores of the previous one: faster, 
+                           but contributors with nearly tied scores can swap sides of the threshold 
+                           (see `timeline.Timeline`).
 
     Returns:
     --------
@@ -34,86 +39,44 @@ def get_plot_data(data, marks, cmt_weight, ism_weight, pr_weight, prm_weight, th
 
     """
 
-    #initialize dataframe to store plot data
-    plot_df = pd.DataFrame(columns=['core', 'peripheral', 'new', 'all_time', 'promo', 'demo', 'avg_intervals'])
+    return Timeline(data, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold, tol=tol, 
+                    warm_start=warm_start, progress=progress).plot_data()
 
-    # calculate the total number of frames
-    total_frames = len(marks)-1
 
-    for frame in range(total_frames): 
-        start_date = dt.datetime.strptime(marks[frame], "%m/%Y")
-        end_date = dt.datetime.strptime(marks[frame+1], "%m/%Y")
-
-        # add nodes and edges to the graph based on the snapshot data
-        G = build_graph(data, start_date, end_date, cmt_weight, ism_weight, pr_weight, prm_weight)
-
-        pagerank_scores = nx.pagerank(G)
-        threshold_score = find_threshold(np.array(list(pagerank_scores.values())), threshold)
-
-        if frame == 0:
-            prev_nodes, prev_peripheral, prev_core, core_intervals = init_sets(G)
-
-        # update core_nodes and peripheral_nodes based on the threshold condition
-        core_nodes = set()
-        peripheral_nodes = set()
-        for node in set(G.nodes()):
-            if pagerank_scores[node] >= threshold_score:
-                core_nodes.add(node)
-            else:
-                peripheral_nodes.add(node)
-
-        # calculate the net new nodes 
-        new_nodes = set(G.nodes()) - prev_nodes
-
-        # populate core intervals
-        for node in core_nodes:
-            core_intervals[node] = core_intervals.get(node, 0) + 1
-        avg_interval = sum(core_intervals[node] for node in core_nodes) / len(core_nodes)
-
-        prev_nodes = prev_nodes | set(G.nodes())
-        peripheral_to_core = len(prev_peripheral.intersection(core_nodes)) # promotion
-        core_to_peripheral = len(prev_core.intersection(peripheral_nodes)) # demotion
-
-        # update the prev_core, and prev_peripheral variables for the next frame
-        prev_core = core_nodes
-        prev_peripheral = peripheral_nodes
-
-        # append the data to the df for this frame
-        plot_df.loc[frame] = {
-            'core': len(core_nodes),
-            'peripheral': len(peripheral_nodes),
-            'new': len(new_nodes),
-            'all_time': len(prev_nodes),
-            'promo': peripheral_to_core,
-            'demo': core_to_peripheral,
-            'avg_intervals': avg_interval
-        }
-
-    return plot_df
-
-def init_sets(G):
+def get_repo_plot_data(repo_org, repo_name, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold, 
+                       progress=None, tol=PAGERANK_TOL, warm_start=False):
     """
-    Initialize sets for the first frame of the network graph.
+    Get the plot data of a repository (see `get_plot_data`) from its shared timeline.
+
+    The cardinality, promotions/demotions and average intervals plots all read the same timeline, 
+    so the frames are computed once per Submit instead of once per plot. Timelines whose frames 
+    were precomputed offline are built from the frame store without querying the database.
 
     Args:
     -----
-        G (nx.Graph): The input graph representing interactions among contributors.
+        repo_org (str): The organization name of the repository.
+        repo_name (str): The name of the repository.
+        marks (list): A list of date marks representing intervals for the network graph.
+        cmt_weight, ism_weight, pr_weight, prm_weight (float): The weights to assign to edges in 
+                                                               the graph based on event type.
+        threshold (tuple): A tuple containing the threshold type and value.
+        progress (callable): Optional progress function (see `get_plot_data`).
+        tol, warm_start: The PageRank settings of the frames computed online (see `get_plot_data`).
 
     Returns:
     --------
-        tuple: A tuple containing four sets and a dictionary:
-            - prev_nodes (set): A set containing all nodes in the graph for the first frame.
-            - prev_peripheral (set): An empty set for the first frame (no peripheral nodes).
-            - prev_core (set): An empty set for the first frame (no core nodes).
-            - core_intervals (dict): An empty dictionary for counting intervals for core nodes.
+        pd.DataFrame: A Pandas DataFrame containing the calculated metrics for each interval frame.
     """
 
-    prev_nodes = set(G.nodes())
-    prev_peripheral = set()
-    prev_core = set()
-    core_intervals = {}
+    # frames precomputed offline (see graph_utils/precompute.py) are read from disk instead
+    weights = (cmt_weight, ism_weight, pr_weight, prm_weight)
+    timeline = frame_store.timeline((repo_org, repo_name), marks, weights, threshold)
+    if timeline is not None:
+        return timeline.plot_data()
 
-    return prev_nodes, prev_peripheral, prev_core, core_intervals
+    data = fetch_data(repo_org, repo_name, *marks_date_range(marks)) # only the events of the analysis period
+    timeline = get_timeline((repo_org, repo_name), data, marks, *weights, threshold, progress, tol, warm_start)
+    return timeline.plot_data()
 
 def add_trace(df_table, name, color, marks):
     """
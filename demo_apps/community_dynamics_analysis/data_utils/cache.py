@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+# every cache of the process, whose locks are reset in the processes forked by the background jobs (see `_after_fork`)
+_caches = weakref.WeakSet()
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with per-entry time-to-live and single-flight loading.
+
+    Entries are evicted when the cache grows beyond `max_entries` (least recently used first) or
+    when they are older than `ttl` seconds. When several threads ask for the same missing key at
+    once, only the first one runs the loader; the others wait for its result instead of repeating
+    the work.
+
+    Args:
+    -----
+        max_entries (int): The maximum number of entries kept in the cache.
+        ttl (float): The number of seconds an entry stays valid (None to never expire).
+    """
+
+    def __init__(self, max_entries=8, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict() # key -> (timestamp, value)
+        self._in_flight = {} # key -> threading.Event set once the load has finished
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        _caches.add(self)
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for `key`, calling `loader()` to produce it on a miss.
+
+        Args:
+        -----
+            key (hashable): The cache key.
+            loader (callable): A function without arguments returning the value to cache.
+
+        Returns:
+        --------
+            object: The cached (or freshly loaded) value.
+        """
+        while True:
+            with self._lock:
+                value, found = self._lookup(key)
+                if found:
+                    self._hits += 1
+                    return value
+                event = self._in_flight.get(key)
+                if event is None:
+                    # no load in progress, this thread becomes the loader
+                    self._misses += 1
+                    event = threading.Event()
+                    self._in_flight[key] = event
+                    break
+            # another thread is loading this key, wait for it and look again
+            event.wait()
+
+        try:
+            value = loader()
+            with self._lock:
+                self._store(key, value)
+            return value
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            event.set()
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for `key` without loading it, or `default` if it is missing.
+        """
+        with self._lock:
+            value, found = self._lookup(key)
+            if found:
+                self._hits += 1
+                return value
+            self._misses += 1
+            return default
+
+    def put(self, key, value):
+        """
+        Store `value` under `key`, evicting the least recently used entries if needed.
+        """
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, key=None):
+        """
+        Remove `key` from the cache, or every entry if no key is given.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        Returns:
+        --------
+            dict: A dictionary with the number of hits, misses, evictions (size bound),
+                  expirations (ttl), the current size and the maximum size of the cache.
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'size': len(self._entries),
+                'max_entries': self.max_entries
+            }
+
+    def _after_fork(self):
+        # the lock and the loads in flight belong to the threads of the parent process, which do not
+        # exist in a forked child: a held lock would never be released and the waits never end
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def _lookup(self, key):
+        # must be called with the lock held
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        timestamp, value = entry
+        if self.ttl is not None and time.monotonic() - timestamp > self.ttl:
+            del self._entries[key]
+            self._expirations += 1
+            return None, False
+        self._entries.move_to_end(key) # mark as most recently used
+        return value, True
+
+    def _store(self, key, value):
+        # must be called with the lock held
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+
+def _after_fork():
+    for cache in list(_caches):
+        cache._after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork)
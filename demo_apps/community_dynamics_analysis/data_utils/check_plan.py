@@ -0,0 +1,35 @@
+"""
+Check the query plan of the commit query against an Augur database before deploying it.
+
+Run from the app directory (next to config.json):
+
+    python -m data_utils.check_plan <repo_org> <repo_name> [--analyze]
+
+Prints the plan and any problem found, and exits with status 1 if the plan needs attention.
+"""
+import argparse
+import sys
+from data_utils.queries import explain_commit_query, ALIAS_EMAIL_INDEX_DDL
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN the commit query of a repository.")
+    parser.add_argument('repo_org', help="The organization name of the repository.")
+    parser.add_argument('repo_name', help="The name of the repository.")
+    parser.add_argument('--analyze', action='store_true', help="Run the query and report actual timings.")
+    args = parser.parse_args()
+
+    plan, warnings = explain_commit_query(args.repo_org, args.repo_name, analyze=args.analyze)
+    print("\n".join(plan))
+
+    if warnings:
+        print()
+        for warning in warnings:
+            print(f"WARNING: {warning}")
+        print(f"\nRecommended index:{ALIAS_EMAIL_INDEX_DDL}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import uuid
+
+# contributor id columns of each event frame (cmt_data, ism_data, pr_data, prm_data)
+ID_COLUMNS = (('author_id', 'committer_id'), ('cntrb_id',), ('cntrb_id', 'reviewer'), ('cntrb_id',))
+# event frames whose 'cntrb_id' column holds the list of contributors of a thread
+LIST_FRAMES = (1, 3)
+
+
+def normalize_ids(data):
+    """
+    Return the event frames with every contributor id as a string.
+
+    The psycopg2 dialect of SQLAlchemy returns `uuid` columns (and `uuid[]` arrays) as `uuid.UUID`
+    objects. Ids of the same contributor must compare equal across frames, otherwise one contributor
+    becomes several graph nodes, and the frames must be storable in Parquet snapshots, so all the
+    contributor ids are converted to strings here, whichever query or snapshot they come from.
+
+    Args:
+    -----
+        data (tuple): The data frames of each event (cmt_data, ism_data, pr_data, prm_data).
+
+    Returns:
+    --------
+        tuple: The data frames, with string contributor ids.
+    """
+    frames = []
+    for i, (frame, columns) in enumerate(zip(data, ID_COLUMNS)):
+        converted = {}
+        for column in columns:
+            if column not in frame or not len(frame):
+                continue
+            if i in LIST_FRAMES and column == 'cntrb_id':
+                converted[column] = frame[column].map(lambda ids: None if ids is None else [id_str(v) for v in ids])
+            else:
+                converted[column] = frame[column].map(id_str)
+        frames.append(frame.assign(**converted) if converted else frame)
+    return tuple(frames)
+
+
+def id_str(value):
+    """
+    Return a contributor id as a string, leaving strings and missing values as they are.
+    """
+    return str(value) if isinstance(value, uuid.UUID) else value
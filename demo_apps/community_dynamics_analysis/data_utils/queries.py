@@ -1,26 +1,60 @@
 import sqlalchemy as salc
-import json
+import os
+import time
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+from data_utils.cache import LRUCache
+from data_utils.engine import load_config, get_engine
+from data_utils.snapshot import SnapshotStore
+from data_utils.ids import normalize_ids
 
-with open("config.json") as config_file:
-    config = json.load(config_file)
+config = load_config()
 
-# connect to Augur database
-database_connection_string = 'postgresql+psycopg2://{}:{}@{}:{}/{}'.format(config['user'], config['password'], config['host'], config['port'], config['database'])
+# process-wide cache of fetched event data, shared by all dashboard callbacks
+fetch_cache = LRUCache(
+    max_entries=config.get('fetch_cache_size', 8),
+    ttl=config.get('fetch_cache_ttl', 900))
 
-dbschema='augur_data'
-engine = salc.create_engine(
-    database_connection_string,
-    connect_args={'options': '-csearch_path={}'.format(dbschema)})
+# local Parquet snapshots of the event data, refreshed with delta queries (disabled unless configured)
+snapshot_store = SnapshotStore(config.get('snapshot_dir')) if config.get('use_snapshots', False) else None
 
-def fetch_data(repo_org, repo_name):
+# worker threads running the event queries of a fetch concurrently, at most one connection each
+query_pool = ThreadPoolExecutor(max_workers=config.get('query_workers', 4), thread_name_prefix='augur-query')
+
+
+def _after_fork():
+    # a forked child (e.g. a background job, see components/plots/plot_data.py) inherits the pool without its
+    # threads, and submitting to it would block forever: the child gets its own pool. The fetch cache is kept,
+    # its entries are still valid in the child (its lock is reset by `cache._after_fork`)
+    global query_pool
+    query_pool = ThreadPoolExecutor(max_workers=config.get('query_workers', 4), thread_name_prefix='augur-query')
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+def fetch_data(repo_org, repo_name, start_date=None, end_date=None, with_timings=False):
     """
     Fetch data from the Augur database for different events in a GitHub repository.
 
+    Results are kept in a process-wide LRU cache (see `fetch_cache`), keyed by repository and 
+    date range, so callbacks requesting the same repository and range share one set of queries. 
+    Concurrent requests for data that is still being fetched wait for that fetch instead of 
+    querying the database again.
+
+    When a date range is given, the time filter is pushed down into the queries so only the events 
+    of the analysis period are transferred (see `time_filter`). The four event queries run 
+    concurrently (see `query_data`), so a cold fetch takes as long as the slowest query. If 
+    snapshots are enabled, only the events updated since the local snapshot are queried and the data 
+    is read from the snapshot (see `load_data`).
+
     Args:
     -----
         repo_org (str): The organization name of the repository.
         repo_name (str): The name of the repository.
+        start_date, end_date (dt.datetime): Optional start and end of the analysis period (None for 
+                                            no bound).
+        with_timings (bool): Whether to also return the query timings of the fetch.
        
     Returns:
     --------
@@ -34,14 +68,174 @@ def fetch_data(repo_org, repo_name):
             - prm_data (pd.DataFrame): Data frame containing pull request message data with pull 
                                       request IDs, timestamps, and contributor IDs associated with 
                                       each pull request message thread.
+        dict: If `with_timings` is set, the data is returned with the query timings of the fetch 
+              that produced it (see `query_data`).
+    """
+
+    data, timings = fetch_cache.get_or_load(
+        (repo_org, repo_name, start_date, end_date),
+        lambda: load_data(repo_org, repo_name, start_date, end_date))
+
+    if with_timings:
+        return data, timings
+    return data
+
+
+def load_data(repo_org, repo_name, start_date=None, end_date=None):
+    """
+    Load the event data of a repository, from its local snapshot if snapshots are enabled and from 
+    the Augur database otherwise, bypassing the fetch cache.
+
+    Args:
+    -----
+        repo_org (str): The organization name of the repository.
+        repo_name (str): The name of the repository.
+        start_date, end_date (dt.datetime): Optional start and end of the analysis period.
+
+    Returns:
+    --------
+        tuple: A tuple containing the data and the timings, see `query_data`. With snapshots, the 
+               timings are those of the delta queries plus the snapshot read time ('snapshot_load').
     """
+    if snapshot_store is None:
+        return query_data(repo_org, repo_name, start_date, end_date)
 
-    cmt_data = commit_query(repo_org, repo_name)
-    ism_data = issue_msg_query(repo_org, repo_name)
-    pr_data = pr_query(repo_org, repo_name)
-    prm_data = pr_msg_query(repo_org, repo_name)
+    refresh_stats = snapshot_store.refresh(repo_org, repo_name, query_data)
+    start = time.perf_counter()
+    data = snapshot_store.load(repo_org, repo_name, start_date, end_date)
+    timings = dict(refresh_stats['timings'], snapshot_load=time.perf_counter() - start)
 
-    return cmt_data, ism_data, pr_data, prm_data
+    return data, timings
+
+
+def query_data(repo_org, repo_name, start_date=None, end_date=None, updated_since=None):
+    """
+    Query the Augur database for the event data of a repository, bypassing the fetch cache.
+
+    The four queries are independent round trips to the database, so they are submitted together 
+    to `query_pool` and each runs on its own pooled connection.
+
+    Args:
+    -----
+        repo_org (str): The organization name of the repository.
+        repo_name (str): The name of the repository.
+        start_date, end_date (dt.datetime): Optional start and end of the analysis period.
+        updated_since (tuple): Optional dates restricting each query to the events updated in Augur 
+                               since then (see `updated_filter`), in the order of the data (None for 
+                               no bound).
+
+    Returns:
+    --------
+        tuple: A tuple containing:
+            - data (tuple): The data frames for each event (cmt_data, ism_data, pr_data, prm_data), 
+              see `fetch_data`, with the contributor ids as strings (see `ids.normalize_ids`).
+            - timings (dict): The number of seconds taken by each query ('commit', 'issue_msg', 'pr', 
+              'pr_msg') and by the whole fetch ('total').
+    """
+
+    start = time.perf_counter()
+    queries = {
+        'commit': commit_query,
+        'issue_msg': issue_msg_query,
+        'pr': pr_query,
+        'pr_msg': pr_msg_query
+    }
+    updated_since = updated_since or (None,) * len(queries)
+    futures = {name: query_pool.submit(timed, query, repo_org, repo_name, start_date, end_date, since) 
+               for (name, query), since in zip(queries.items(), updated_since)}
+
+    results = {name: future.result() for name, future in futures.items()}
+    timings = {name: seconds for name, (_, seconds) in results.items()}
+    timings['total'] = time.perf_counter() - start
+    # the ids are uuid.UUID objects (uuid[] arrays for the threads), one string type for every frame
+    data = normalize_ids(tuple(frame for frame, _ in results.values()))
+
+    return data, timings
+
+
+def timed(query, *args):
+    """
+    Run a query function and return its result with the number of seconds it took.
+    """
+    start = time.perf_counter()
+    result = query(*args)
+    return result, time.perf_counter() - start
+
+
+def marks_date_range(marks):
+    """
+    Return the analysis period covered by the graph slider marks.
+
+    Args:
+    -----
+        marks (list): A list of date marks (formatted as "%m/%Y") representing the slider positions.
+
+    Returns:
+    --------
+        tuple: The start and end date (dt.datetime) of the first and last mark.
+    """
+    return dt.datetime.strptime(marks[0], "%m/%Y"), dt.datetime.strptime(marks[-1], "%m/%Y")
+
+
+def time_filter(column, start_date=None, end_date=None):
+    """
+    Build the SQL condition restricting a timestamp column to an analysis period.
+
+    The bounds are widened by a day on each side: the database compares time zone aware timestamps 
+    while the dashboard compares offset-naive ones, so the exact bounds are left to the pandas 
+    filters of the graph builders.
+
+    Args:
+    -----
+        column (str): The timestamp column (e.g. 'c.cmt_committer_timestamp').
+        start_date, end_date (dt.datetime): The start and end of the period (None for no bound).
+
+    Returns:
+    --------
+        str: The condition to append to a WHERE clause (empty if no bound is given).
+    """
+    condition = ""
+    if start_date is not None:
+        condition += f" AND {column} >= \'{(start_date - dt.timedelta(days=1)).isoformat()}\'"
+    if end_date is not None:
+        condition += f" AND {column} <= \'{(end_date + dt.timedelta(days=1)).isoformat()}\'"
+    return condition
+
+
+def updated_filter(updated_since, *conditions):
+    """
+    Build the SQL condition keeping the events updated in Augur since a date.
+
+    An event is updated when it changes in Augur after its own timestamp: a pull request reviewed 
+    or discussed later, an issue closed or commented later, a commit collected late. Each condition 
+    tests one source of updates against `{since}`, e.g. the collection date of the messages of an 
+    issue, and the event is kept if any of them holds. Unlike `time_filter`, the date is not 
+    widened, the snapshots already refetch a margin (see `snapshot.REFETCH_MARGIN`).
+
+    Args:
+    -----
+        updated_since (dt.datetime): The date (None for no bound).
+        conditions (str): The SQL conditions, with `{since}` in place of the date.
+
+    Returns:
+    --------
+        str: The condition to append to a WHERE clause (empty if no date is given).
+    """
+    if updated_since is None:
+        return ""
+    since = f"\'{updated_since.isoformat()}\'"
+    return " AND ({})".format(" OR ".join(condition.replace('{since}', since) for condition in conditions))
+
+
+def fetch_cache_stats():
+    """
+    Return the hit/miss/eviction counters of the fetch cache.
+
+    Returns:
+    --------
+        dict: The counters of `fetch_cache`, see `LRUCache.stats`.
+    """
+    return fetch_cache.stats()
 
 
 def is_repo_exists(repo_org, repo_name):
@@ -58,7 +252,6 @@ def is_repo_exists(repo_org, repo_name):
         bool: True if the repository exists, False otherwise.
     """
     repo_check_query = salc.sql.text(f"""
-        SET SCHEMA 'augur_data';
         SELECT EXISTS (
             SELECT 1
             FROM repo_groups rg
@@ -68,12 +261,19 @@ def is_repo_exists(repo_org, repo_name):
         )
     """)
 
-    result = pd.read_sql(repo_check_query, con=engine)
+    result = pd.read_sql(repo_check_query, con=get_engine())
     exists = result.iloc[0, 0] 
     return exists
 
 
-def commit_query(repo_org, repo_name):
+# recommended index for the alias lookups of `commit_query`, to be created by a database administrator
+# (CONCURRENTLY cannot run inside a transaction and does not block writes on the replica)
+ALIAS_EMAIL_INDEX_DDL = """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS contributors_aliases_alias_email_idx
+        ON augur_data.contributors_aliases (alias_email) INCLUDE (cntrb_id);
+"""
+
+def commit_query(repo_org, repo_name, start_date=None, end_date=None, updated_since=None):
     """
     Execute a SQL query to fetch commit data for a given repository.
 
@@ -81,42 +281,117 @@ def commit_query(repo_org, repo_name):
     -----
         repo_org (str): The organization name of the repository.
         repo_name (str): The name of the repository.
+        start_date, end_date (dt.datetime): Optional start and end of the analysis period.
+        updated_since (dt.datetime): Optional date, only the commits collected since then are fetched.
+
+    Returns:
+    --------
+        pd.DataFrame: Data frame containing commit data with commit hash, timestamps, corresponding 
+                      author and committer IDs, and the date the commit was collected ('updated_at').
+    """
+    cmt_query = salc.sql.text(commit_sql(repo_org, repo_name, start_date, end_date, updated_since))
+
+    cmt_data = pd.read_sql(cmt_query, con=get_engine())
+    cmt_data = cmt_data.dropna()
+    # Convert the timestamp columns to offset-naive datetime objects
+    for column in ('timestamp', 'updated_at'):
+        cmt_data[column] = cmt_data[column].apply(lambda x: x.replace(tzinfo=None) if x.tzinfo else x)
+
+    return cmt_data
+
+
+def commit_sql(repo_org, repo_name, start_date=None, end_date=None, updated_since=None):
+    """
+    Build the SELECT statement of `commit_query`.
+
+    The commits of the repository are deduplicated first (the commits table has one row per file 
+    changed), then joined twice with contributors_aliases to resolve the author and committer ids. 
+    Commits whose author or committer has no alias are dropped by the joins, as they are by the 
+    `dropna` of `commit_query`.
+
+    Args:
+    -----
+        repo_org (str): The organization name of the repository.
+        repo_name (str): The name of the repository.
+        start_date, end_date (dt.datetime): Optional start and end of the analysis period.
+        updated_since (dt.datetime): Optional date, only the commits collected since then are selected.
 
     Returns:
     --------
-        pd.DataFrame: Data frame containing commit data with commit hash, timestamps, and corresponding 
-                      author and committer IDs.
+        str: The SQL statement.
     """
-    cmt_query = salc.sql.text(f"""
-                    SET SCHEMA 'augur_data';
+    return f"""
                     SELECT
-                        DISTINCT c.cmt_commit_hash,
-                        c.cmt_committer_timestamp as timestamp,
-                        (SELECT ca.cntrb_id FROM contributors_aliases ca WHERE c.cmt_author_email = ca.alias_email) as author_id,
-                        (SELECT ca.cntrb_id FROM contributors_aliases ca WHERE c.cmt_committer_email = ca.alias_email) as committer_id
+                        c.cmt_commit_hash,
+                        c.timestamp,
+                        author.cntrb_id as author_id,
+                        committer.cntrb_id as committer_id,
+                        c.updated_at
                     FROM
-                        repo_groups rg,
-                        repo r,
-                        commits c
-                    WHERE
-                        c.repo_id = r.repo_id AND
-                        rg.repo_group_id = r.repo_group_id AND
-                        rg.rg_name = \'{repo_org}\' AND
-                        r.repo_name = \'{repo_name}\' AND
-                        c.cmt_author_email != c.cmt_committer_email
+                        (
+                            SELECT
+                                c.cmt_commit_hash,
+                                c.cmt_committer_timestamp as timestamp,
+                                c.cmt_author_email,
+                                c.cmt_committer_email,
+                                COALESCE(max(c.data_collection_date), c.cmt_committer_timestamp) as updated_at
+                            FROM
+                                repo_groups rg
+                                JOIN repo r ON rg.repo_group_id = r.repo_group_id
+                                JOIN commits c ON c.repo_id = r.repo_id
+                            WHERE
+                                rg.rg_name = \'{repo_org}\' AND
+                                r.repo_name = \'{repo_name}\' AND
+                                c.cmt_author_email != c.cmt_committer_email
+                                {time_filter('c.cmt_committer_timestamp', start_date, end_date)}
+                                {updated_filter(updated_since, 'c.data_collection_date >= {since}')}
+                            GROUP BY
+                                c.cmt_commit_hash, c.cmt_committer_timestamp, c.cmt_author_email, c.cmt_committer_email
+                        ) c
+                        JOIN contributors_aliases author ON author.alias_email = c.cmt_author_email
+                        JOIN contributors_aliases committer ON committer.alias_email = c.cmt_committer_email
                     ORDER BY
                         timestamp DESC
-            """)
+            """
 
-    cmt_data = pd.read_sql(cmt_query, con=engine)
-    cmt_data = cmt_data.dropna()
-    # Convert the timestamp column to offset-naive datetime objects
-    cmt_data['timestamp'] = cmt_data['timestamp'].apply(lambda x: x.replace(tzinfo=None) if x.tzinfo else x)
 
-    return cmt_data
+def explain_commit_query(repo_org, repo_name, start_date=None, end_date=None, analyze=False):
+    """
+    Run EXPLAIN on the commit query of a repository and check its plan.
 
+    The plan is flagged if it still evaluates a subquery per commit row (SubPlan) or scans the 
+    whole contributors_aliases table (Seq Scan), which usually means the index of 
+    `ALIAS_EMAIL_INDEX_DDL` is missing.
 
-def issue_msg_query(repo_org, repo_name):
+    Args:
+    -----
+        repo_org (str): The organization name of the repository.
+        repo_name (str): The name of the repository.
+        start_date, end_date (dt.datetime): Optional start and end of the analysis period.
+        analyze (bool): Whether to run the query (EXPLAIN ANALYZE) to report actual timings.
+
+    Returns:
+    --------
+        tuple: A tuple containing:
+            - plan (list): The lines of the query plan.
+            - warnings (list): A description of each problem found in the plan (empty if none).
+    """
+    explain = "EXPLAIN (ANALYZE, BUFFERS)" if analyze else "EXPLAIN"
+    plan_query = salc.sql.text(f"{explain} {commit_sql(repo_org, repo_name, start_date, end_date)}")
+
+    plan = pd.read_sql(plan_query, con=get_engine()).iloc[:, 0].tolist()
+
+    warnings = []
+    if any('SubPlan' in line for line in plan):
+        warnings.append("the plan evaluates a correlated subquery per row (SubPlan)")
+    if any('Seq Scan on contributors_aliases' in line for line in plan):
+        warnings.append("contributors_aliases is scanned sequentially, create the alias_email index "
+                        "(see ALIAS_EMAIL_INDEX_DDL)")
+
+    return plan, warnings
+
+
+def issue_msg_query(repo_org, repo_name, start_date=None, end_date=None, updated_since=None):
     """
     Execute a SQL query to fetch issue message data for a given repository.
 
@@ -124,18 +399,22 @@ def issue_msg_query(repo_org, repo_name):
     -----
         repo_org (str): The organization name of the repository.
         repo_name (str): The name of the repository.
+        start_date, end_date (dt.datetime): Optional start and end of the analysis period.
+        updated_since (dt.datetime): Optional date, only the issues updated or with messages collected 
+                                     since then are fetched (with all their messages).
 
     Returns:
     --------
-        pd.DataFrame: Data frame containing issue message data with issue IDs, timestamps, and 
-                      contributor IDs associated with each issue.
+        pd.DataFrame: Data frame containing issue message data with issue IDs, timestamps, the list 
+                      of distinct contributor IDs associated with each issue, and the date of its 
+                      last update ('updated_at').
     """
     ism_query = salc.sql.text(f"""
-                 SET SCHEMA 'augur_data';
                  SELECT
                     i.issue_id,
-                    m.cntrb_id,
-                    i.closed_at as timestamp
+                    array_agg(DISTINCT m.cntrb_id) FILTER (WHERE m.cntrb_id IS NOT NULL) as cntrb_id,
+                    i.closed_at as timestamp,
+                    GREATEST(i.updated_at, max(imr.data_collection_date)) as updated_at
                 FROM
                     repo_groups rg,
                     repo r,
@@ -149,23 +428,26 @@ def issue_msg_query(repo_org, repo_name):
                     m.msg_id = imr.msg_id AND
                     rg.rg_name = \'{repo_org}\' AND
                     r.repo_name = \'{repo_name}\'
+                    {time_filter('i.closed_at', start_date, end_date)}
+                    {updated_filter(updated_since, 'i.updated_at >= {since}',
+                                    'EXISTS (SELECT 1 FROM issue_message_ref u WHERE u.issue_id = i.issue_id '
+                                    'AND u.data_collection_date >= {since})')}
+                GROUP BY
+                    i.issue_id, i.closed_at, i.updated_at
+                HAVING
+                    count(DISTINCT m.cntrb_id) > 1
                 ORDER BY
                       timestamp DESC
         """)
 
-    ism_data = pd.read_sql(ism_query, con=engine)
-
-    # reformat issue message data, combine contributor ids for each issue
-    ism_data = ism_data.groupby('issue_id').agg({'cntrb_id': list, 'timestamp': 'last'}).reset_index()
-    
-    # remove issues with only one contributor (no connection to be made)
-    ism_data = ism_data[ism_data['cntrb_id'].apply(lambda x: len(x) > 1)]
-    ism_data = ism_data.sort_values('timestamp', ascending=False)
+    # one row per issue with the distinct contributor ids of its messages, issues with only one 
+    # contributor are filtered out by the query (no connection to be made)
+    ism_data = pd.read_sql(ism_query, con=get_engine())
 
     return ism_data
 
 
-def pr_query(repo_org, repo_name): 
+def pr_query(repo_org, repo_name, start_date=None, end_date=None, updated_since=None): 
     """
     Execute a SQL query to fetch pull request data for a given repository.
     
@@ -173,19 +455,24 @@ def pr_query(repo_org, repo_name):
     -----
         repo_org (str): The organization name of the repository.
         repo_name (str): The name of the repository.
+        start_date, end_date (dt.datetime): Optional start and end of the analysis period.
+        updated_since (dt.datetime): Optional date, only the pull requests updated or with events or 
+                                     reviewers collected since then are fetched (with all their rows).
 
     Returns:
     --------
         pd.DataFrame: Data frame containing pull request data with pull request IDs, timestamps, 
-                      contributor IDs, and reviewer IDs for each pull request.
+                      contributor IDs, reviewer IDs, and the date of the last update ('updated_at') 
+                      for each pull request.
     """
     pr_query = salc.sql.text(f"""
-                  SET SCHEMA 'augur_data';
                   SELECT
                       pr.pull_request_id,
                       pre.cntrb_id,
                       prr.cntrb_id as reviewer,
-                      pr.pr_created_at as timestamp
+                      pr.pr_created_at as timestamp,
+                      COALESCE(GREATEST(pr.pr_updated_at, pre.data_collection_date, prr.data_collection_date),
+                               pr.pr_created_at) as updated_at
                   FROM
                       repo_groups rg,
                       repo r,
@@ -200,17 +487,23 @@ def pr_query(repo_org, repo_name):
                       pre.cntrb_id != prr.cntrb_id AND
                       rg.rg_name = \'{repo_org}\' AND
                       r.repo_name = \'{repo_name}\'
+                      {time_filter('pr.pr_created_at', start_date, end_date)}
+                      {updated_filter(updated_since, 'pr.pr_updated_at >= {since}',
+                                      'EXISTS (SELECT 1 FROM pull_request_events u WHERE u.pull_request_id = '
+                                      'pr.pull_request_id AND u.data_collection_date >= {since})',
+                                      'EXISTS (SELECT 1 FROM pull_request_reviewers u WHERE u.pull_request_id = '
+                                      'pr.pull_request_id AND u.data_collection_date >= {since})')}
                   ORDER BY
                       timestamp DESC
           """)
 
-    pr_data = pd.read_sql(pr_query, con=engine)
+    pr_data = pd.read_sql(pr_query, con=get_engine())
     pr_data = pr_data.dropna()
 
     return pr_data
 
 
-def pr_msg_query(repo_org, repo_name): 
+def pr_msg_query(repo_org, repo_name, start_date=None, end_date=None, updated_since=None): 
     """
     Execute a SQL query to fetch pull request message data for a given repository.
 
@@ -218,18 +511,22 @@ def pr_msg_query(repo_org, repo_name):
     -----
         repo_org (str): The organization name of the repository.
         repo_name (str): The name of the repository.
+        start_date, end_date (dt.datetime): Optional start and end of the analysis period.
+        updated_since (dt.datetime): Optional date, only the pull requests updated or with messages 
+                                     collected since then are fetched (with all their messages).
 
     Returns:
     --------
         pd.DataFrame: Data frame containing pull request message data with pull request IDs, timestamps, 
-                      and contributor IDs associated with each pull request message thread.
+                      the list of distinct contributor IDs associated with each pull request message thread, 
+                      and the date of its last update ('updated_at').
     """
     prm_query = salc.sql.text(f"""
-                  SET SCHEMA 'augur_data';
                   SELECT
                       pr.pull_request_id,
-                      m.cntrb_id,
-                      pr.pr_created_at as timestamp
+                      array_agg(DISTINCT m.cntrb_id) FILTER (WHERE m.cntrb_id IS NOT NULL) as cntrb_id,
+                      pr.pr_created_at as timestamp,
+                      GREATEST(pr.pr_updated_at, max(prm.data_collection_date)) as updated_at
                   FROM
                       repo_groups rg,
                       repo r,
@@ -243,16 +540,20 @@ def pr_msg_query(repo_org, repo_name):
                       m.msg_id = prm.msg_id AND
                       rg.rg_name = \'{repo_org}\' AND
                       r.repo_name = \'{repo_name}\'
+                      {time_filter('pr.pr_created_at', start_date, end_date)}
+                      {updated_filter(updated_since, 'pr.pr_updated_at >= {since}',
+                                      'EXISTS (SELECT 1 FROM pull_request_message_ref u WHERE u.pull_request_id = '
+                                      'pr.pull_request_id AND u.data_collection_date >= {since})')}
+                  GROUP BY
+                      pr.pull_request_id, pr.pr_created_at, pr.pr_updated_at
+                  HAVING
+                      count(DISTINCT m.cntrb_id) > 1
                   ORDER BY
                       timestamp DESC
           """)
 
-    prm_data = pd.read_sql(prm_query, con=engine)
-
-    # reformat pull request message data, combine contributor ids for each pr thread
-    prm_data = prm_data.groupby('pull_request_id').agg({'cntrb_id': list, 'timestamp': 'last'}).reset_index()
-    # remove pr threads with only one contributor (no connection to be made)
-    prm_data = prm_data[prm_data['cntrb_id'].apply(lambda x: len(x) > 1)]
-    prm_data = prm_data.sort_values('timestamp', ascending=False)
+    # one row per pr thread with the distinct contributor ids of its messages, threads with only one 
+    # contributor are filtered out by the query (no connection to be made)
+    prm_data = pd.read_sql(prm_query, con=get_engine())
 
     return prm_data
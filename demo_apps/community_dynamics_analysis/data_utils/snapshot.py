@@ -0,0 +1,258 @@
+import os
+import json
+import shutil
+import threading
+import datetime as dt
+from contextlib import contextmanager
+from pathlib import Path
+import pandas as pd
+
+# root of the repository, the snapshots are stored under its data/interim directory by default
+PROJECT_DIR = Path(__file__).resolve().parents[3]
+DEFAULT_SNAPSHOT_DIR = PROJECT_DIR / 'data' / 'interim' / 'augur_events'
+
+# the four event tables returned by `fetch_data`, in order
+TABLES = ('cmt_data', 'ism_data', 'pr_data', 'prm_data')
+# event tables holding a list of contributor ids per thread
+LIST_TABLES = ('ism_data', 'prm_data')
+# column identifying an event of each table, the rows of an updated event replace its stored rows
+KEYS = {'cmt_data': 'cmt_commit_hash', 'ism_data': 'issue_id', 'pr_data': 'pull_request_id',
+        'prm_data': 'pull_request_id'}
+
+# events updated after the watermark minus this margin are fetched again and replace the stored ones, which
+# covers the time zone difference between the database and the offset-naive dashboard timestamps
+REFETCH_MARGIN = dt.timedelta(days=2)
+
+# version of the snapshot layout, snapshots of another version are fetched again in full
+SNAPSHOT_FORMAT = 2
+
+_repo_locks = {}
+_repo_locks_lock = threading.Lock()
+
+
+#------------------------------------------------------ SNAPSHOT STORE -------------------------------------------------
+
+class SnapshotStore:
+    """
+    Local Parquet store of the event data fetched from Augur, one snapshot per repository.
+
+    Each event table of a repository is stored as a Parquet dataset partitioned by month of the event
+    timestamp (`<root>/<org>/<repo>/<table>/month=YYYY-MM/part.parquet`), next to a `meta.json`
+    recording the watermark of every table: the latest update of its events in Augur ('updated_at',
+    see `queries.updated_filter`), not their timestamp, so reviews, messages and commits collected
+    long after the event are still picked up. Refreshing a snapshot only queries, per table, the
+    events updated since its watermark (minus `REFETCH_MARGIN`); their rows replace the stored rows
+    of the same events (see `KEYS`) and only the months holding either are rewritten. A table without
+    watermark (never fetched, or empty so far) is fetched in full on its own. Loading a snapshot reads
+    the months of the requested range, memory mapping the files.
+
+    The store is shared by the app workers, their background jobs and `make_dataset`: refreshing and
+    loading a snapshot hold a file lock of the repository (see `repo_lock`), so a process never reads
+    or rewrites a snapshot while another one is rewriting it.
+
+    Events without a timestamp are not stored: they never fall inside a graph window.
+
+    Args:
+    -----
+        root (str): The directory of the store (`DEFAULT_SNAPSHOT_DIR` if None).
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root is not None else DEFAULT_SNAPSHOT_DIR
+
+    def repo_dir(self, repo_org, repo_name):
+        return self.root / repo_org / repo_name
+
+    def read_meta(self, repo_org, repo_name):
+        """
+        Return the metadata of a repository snapshot (watermarks and row counts), or None if there is none.
+        """
+        meta_path = self.repo_dir(repo_org, repo_name) / 'meta.json'
+        if not meta_path.exists():
+            return None
+        with open(meta_path) as meta_file:
+            return json.load(meta_file)
+
+    def refresh(self, repo_org, repo_name, query, full=False):
+        """
+        Bring the snapshot of a repository up to date, fetching only the events updated since its watermarks.
+
+        Args:
+        -----
+            repo_org (str): The organization name of the repository.
+            repo_name (str): The name of the repository.
+            query (callable): A function `query(repo_org, repo_name, start_date, end_date, updated_since)`
+                              returning the data tuple and the query timings, such as `queries.query_data`.
+            full (bool): Whether to fetch and rewrite the whole history instead of a delta.
+
+        Returns:
+        --------
+            dict: The refresh statistics, by table: the start of the fetched updates ('since', None for a
+                  full fetch), the refresh mode ('modes', 'delta' or 'full'), the number of rows fetched
+                  ('fetched') and the new watermarks ('watermarks'), plus the query timings ('timings').
+        """
+        with repo_lock(self.root, repo_org, repo_name):
+            repo_dir = self.repo_dir(repo_org, repo_name)
+            meta = None if full else self.read_meta(repo_org, repo_name)
+            if meta is None or meta.get('format') != SNAPSHOT_FORMAT:
+                # full fetch, start the snapshot over
+                if repo_dir.exists():
+                    shutil.rmtree(repo_dir)
+                meta = {'format': SNAPSHOT_FORMAT, 'watermarks': {}, 'columns': {}, 'partitions': {}}
+
+            # each table is fetched from its own watermark, a table without one is fetched in full
+            since = {table: dt.datetime.fromisoformat(meta['watermarks'][table]) - REFETCH_MARGIN
+                     if meta['watermarks'].get(table) else None for table in TABLES}
+            data, timings = query(repo_org, repo_name, None, None, tuple(since.values()))
+
+            fetched = {}
+            for table, frame in zip(TABLES, data):
+                if since[table] is None and (repo_dir / table).exists():
+                    shutil.rmtree(repo_dir / table)
+                    meta['partitions'][table] = {}
+                partitions = meta['partitions'].setdefault(table, {})
+                partitions.update(self._write_table(repo_dir / table, frame, KEYS[table], partitions))
+                meta['partitions'][table] = {month: n for month, n in sorted(partitions.items()) if n > 0}
+                meta['columns'][table] = list(frame.columns)
+                fetched[table] = len(frame)
+                updated_at = naive_timestamps(frame['updated_at']).max()
+                if pd.notna(updated_at):
+                    watermark = updated_at.isoformat()
+                    meta['watermarks'][table] = max(watermark, meta['watermarks'].get(table) or watermark)
+
+            meta['refreshed_at'] = dt.datetime.now().isoformat(timespec='seconds')
+            write_json(repo_dir / 'meta.json', meta)
+
+        modes = {table: 'full' if since[table] is None else 'delta' for table in TABLES}
+        return {'since': since, 'modes': modes, 'fetched': fetched, 'watermarks': dict(meta['watermarks']),
+                'timings': timings}
+
+    def load(self, repo_org, repo_name, start_date=None, end_date=None):
+        """
+        Read the snapshot of a repository, restricted to the months of a date range.
+
+        Args:
+        -----
+            repo_org (str): The organization name of the repository.
+            repo_name (str): The name of the repository.
+            start_date, end_date (dt.datetime): Optional start and end of the analysis period.
+
+        Returns:
+        --------
+            tuple: The data frames of each event (cmt_data, ism_data, pr_data, prm_data), see
+                   `queries.fetch_data`, or None if the repository has no snapshot.
+        """
+        # read under the lock, so no partition is replaced or removed by a refresh meanwhile
+        with repo_lock(self.root, repo_org, repo_name):
+            meta = self.read_meta(repo_org, repo_name)
+            if meta is None:
+                return None
+
+            repo_dir = self.repo_dir(repo_org, repo_name)
+            first = month_key(start_date) if start_date is not None else None
+            last = month_key(end_date) if end_date is not None else None
+            data = []
+            for table in TABLES:
+                months = [month for month in meta['partitions'].get(table, {}) 
+                          if (first is None or month >= first) and (last is None or month <= last)]
+                frames = [pd.read_parquet(repo_dir / table / f'month={month}' / 'part.parquet', memory_map=True) 
+                          for month in months]
+                frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=meta['columns'][table])
+                if table in LIST_TABLES and len(frame):
+                    # Parquet lists are read back as arrays, the graph builders expect Python lists
+                    frame['cntrb_id'] = frame['cntrb_id'].map(list)
+                data.append(frame.sort_values('timestamp', ascending=False, ignore_index=True))
+
+        return tuple(data)
+
+    def _write_table(self, table_dir, frame, key, partitions):
+        """
+        Write the fetched rows of a table into its month partitions. The stored rows of the events
+        fetched again (same `key`) are replaced by the new ones, whichever month they are stored in.
+
+        Returns:
+        --------
+            dict: The new number of rows of each rewritten month partition.
+        """
+        updated = set(frame[key]) # includes the events whose timestamp was removed
+        frame = frame[frame['timestamp'].notna()]
+        months = pd.to_datetime(frame['timestamp']).dt.strftime('%Y-%m')
+        affected = set(months)
+        for month in partitions:
+            # only the key column is read to find the months holding events fetched again
+            stored_keys = pd.read_parquet(table_dir / f'month={month}' / 'part.parquet', columns=[key])[key]
+            if stored_keys.isin(updated).any():
+                affected.add(month)
+
+        counts = {}
+        for month in sorted(affected):
+            path = table_dir / f'month={month}' / 'part.parquet'
+            parts = [frame[months == month]]
+            if path.exists():
+                stored = pd.read_parquet(path)
+                parts.insert(0, stored[~stored[key].isin(updated)])
+            rows = pd.concat(parts, ignore_index=True)
+            if len(rows):
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix('.tmp')
+                rows.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, path) # readers see either the old or the new partition
+            elif path.exists():
+                shutil.rmtree(path.parent)
+            counts[month] = len(rows)
+
+        return counts
+
+
+def month_key(date):
+    return date.strftime('%Y-%m')
+
+
+def naive_timestamps(values):
+    """
+    Convert a column of timestamps to offset-naive timestamps, like the event timestamps of the dashboard.
+    """
+    values = pd.to_datetime(values, utc=True) if values.dtype == object else pd.to_datetime(values)
+    return values.dt.tz_localize(None) if values.dt.tz is not None else values
+
+
+@contextmanager
+def repo_lock(root, repo_org, repo_name):
+    """
+    Hold the lock of the snapshot of a repository, serializing its refreshes and loads across the threads
+    of the process and across processes.
+
+    Between processes, the lock is an exclusive `fcntl.flock` of `<root>/<org>/<repo>.lock`, next to the
+    snapshot directory so a full refresh does not remove it. Without `fcntl` (e.g. on Windows), only the
+    threads of the process are serialized.
+    """
+    with _repo_locks_lock:
+        thread_lock = _repo_locks.setdefault((str(root), repo_org, repo_name), threading.Lock())
+    with thread_lock:
+        lock_path = Path(root) / repo_org / f'{repo_name}.lock'
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, 'w') as lock_file:
+            try:
+                import fcntl
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            except ImportError:
+                pass
+            yield # the file lock is released when the file is closed
+
+
+def _after_fork():
+    # locks held by the threads of the parent are never released in a forked child, it starts with its own
+    global _repo_locks, _repo_locks_lock
+    _repo_locks = {}
+    _repo_locks_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def write_json(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as json_file:
+        json.dump(content, json_file, indent=2)
+    os.replace(tmp_path, path)
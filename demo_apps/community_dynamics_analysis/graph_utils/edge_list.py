@@ -0,0 +1,200 @@
+import itertools
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+#------------------------------------------------------ EVENT SNAPSHOTS ------------------------------------------------
+
+def get_snapshot(data, start_date, end_date):
+    """
+    Select the rows of an event data frame that fall inside a time range (both ends included).
+
+    Args:
+    -----
+        data (pd.DataFrame): An event data frame with a 'timestamp' column.
+        start_date, end_date (datetime.date): The start and end date of the time range.
+
+    Returns:
+    --------
+        pd.DataFrame: The rows of `data` inside the time range.
+    """
+    return data[(data['timestamp'] >= start_date) & (data['timestamp'] <= end_date)]
+
+#------------------------------------------------------ EDGE LISTS -----------------------------------------------------
+
+def commit_pairs(snapshot):
+    """
+    Count the commits of each (author, committer) pair, as `add_cmt_data` does.
+
+    Args:
+    -----
+        snapshot (pd.DataFrame): Commit data with columns 'author_id' and 'committer_id'.
+
+    Returns:
+    --------
+        pd.DataFrame: A data frame with columns 'author_id', 'committer_id' and 'n' (the number of
+                      commits of the pair), without pairs where author and committer are the same.
+    """
+    pairs = snapshot.groupby(['author_id', 'committer_id']).size().rename('n').reset_index()
+    return pairs[pairs['author_id'] != pairs['committer_id']]
+
+
+def review_pairs(snapshot):
+    """
+    Select the (contributor, reviewer) pairs of pull request reviews, as `add_pr_data` does.
+
+    Args:
+    -----
+        snapshot (pd.DataFrame): Pull request review data with columns 'cntrb_id' and 'reviewer'.
+
+    Returns:
+    --------
+        pd.DataFrame: A data frame with columns 'cntrb_id' and 'reviewer', one row per review where
+                      contributor and reviewer differ.
+    """
+    snapshot = snapshot[['cntrb_id', 'reviewer']]
+    return snapshot[snapshot['cntrb_id'] != snapshot['reviewer']]
+
+
+def thread_pairs(snapshot, thread_col):
+    """
+    Explode the contributor lists of message threads (issues or pull requests) into pair edges.
+
+    Every pair of list positions i < j holding different contributors produces one edge, in the
+    same order as the nested loops of `add_ism_data` and `add_prm_data`.
+
+    Args:
+    -----
+        snapshot (pd.DataFrame): Message thread data with a 'cntrb_id' column holding lists of
+                                 contributor ids, and a thread id column.
+        thread_col (str): The name of the thread id column ('issue_id' or 'pull_request_id').
+
+    Returns:
+    --------
+        tuple: A tuple containing:
+            - members (np.ndarray): The contributor ids of all threads, one entry per list element.
+            - pairs (pd.DataFrame): A data frame with columns 'thread', 'u' and 'v' holding the thread id
+              and the two contributor ids of each pair edge.
+    """
+    lists = snapshot['cntrb_id'].tolist()
+    lengths = np.fromiter((len(x) for x in lists), dtype=np.int64, count=len(lists))
+    members = np.empty(int(lengths.sum()), dtype=object)
+    members[:] = list(itertools.chain.from_iterable(lists))
+
+    # position of each element inside its own list
+    starts = np.cumsum(lengths) - lengths
+    pos = np.arange(len(members)) - np.repeat(starts, lengths)
+    # element at position p pairs with the (length - 1 - p) elements after it
+    partners = np.repeat(lengths, lengths) - 1 - pos
+    i = np.repeat(np.arange(len(members)), partners)
+    offset = np.arange(len(i)) - np.repeat(np.cumsum(partners) - partners, partners)
+    j = i + 1 + offset
+
+    threads = np.repeat(snapshot[thread_col].to_numpy(), lengths)
+    pairs = pd.DataFrame({'thread': threads[i], 'u': members[i], 'v': members[j]})
+    pairs = pairs[pairs['u'] != pairs['v']]
+
+    return members, pairs
+
+#------------------------------------------------------ BUILD GRAPH OBJECT ---------------------------------------------
+
+def build_graph_vectorized(data, start_date, end_date, cmt_weight, ism_weight, pr_weight, prm_weight):
+    """
+    Build the same weighted graph as `graph_helper.build_graph` using bulk array operations.
+
+    Contributor lists are exploded into pair edges with NumPy, weights and node counts are
+    aggregated with one group-by, and the result is bulk loaded into the graph. The graph matches
+    `build_graph` in node `count` attributes, edge weights and `issue`/`pr` edge attributes.
+
+    Note:
+    -----
+    As in `build_graph`, commit edges are weighted by the number of commits of each (author, committer)
+    pair and `cmt_weight` is not applied. Missing contributor ids are skipped.
+
+    Args:
+    -----
+        data (tuple): A tuple containing four data frames (cmt_data, ism_data, pr_data, prm_data).
+        start_date, end_date (datetime.date): The start and end date to define the time range
+                                              for snapshot data inclusion in the graph.
+        cmt_weight, ism_weight, pr_weight, prm_weight (float): The weights to assign to edges in
+                                                               the graph based on event type.
+
+    Returns:
+    --------
+        nx.Graph: The constructed weighted graph (G) representing the interactions among contributors
+                  in the specified time range.
+    """
+
+    cmt_data, ism_data, pr_data, prm_data = (get_snapshot(d, start_date, end_date) for d in data)
+
+    cmt_pairs = commit_pairs(cmt_data)
+    ism_members, ism_pairs = thread_pairs(ism_data, 'issue_id')
+    pr_pairs = review_pairs(pr_data)
+    prm_members, prm_pairs = thread_pairs(prm_data, 'pull_request_id')
+
+    # every node occurrence, in the order the per-row builders visit them
+    occurrences = np.concatenate([
+        cmt_pairs[['author_id', 'committer_id']].to_numpy().ravel(),
+        ism_members,
+        pr_pairs.to_numpy().ravel(),
+        prm_members
+    ])
+    # integer code per contributor, in order of first appearance
+    codes, nodes = pd.factorize(occurrences)
+    counts = np.bincount(codes[codes >= 0], minlength=len(nodes))
+    index = pd.Index(nodes)
+    base = max(len(nodes), 1)
+
+    def edge_keys(u, v):
+        # undirected edge key lo * base + hi, -1 for edges with a missing endpoint
+        u, v = index.get_indexer(u), index.get_indexer(v)
+        return np.where((u >= 0) & (v >= 0), np.minimum(u, v) * base + np.maximum(u, v), -1)
+
+    cmt_keys = edge_keys(cmt_pairs['author_id'], cmt_pairs['committer_id'])
+    ism_keys = edge_keys(ism_pairs['u'], ism_pairs['v'])
+    pr_keys = edge_keys(pr_pairs['cntrb_id'], pr_pairs['reviewer'])
+    prm_keys = edge_keys(prm_pairs['u'], prm_pairs['v'])
+
+    edges = pd.DataFrame({
+        'key': np.concatenate([cmt_keys, ism_keys, pr_keys, prm_keys]),
+        'weight': np.concatenate([
+            cmt_pairs['n'].to_numpy(dtype=float),
+            np.full(len(ism_keys), ism_weight, dtype=float),
+            np.full(len(pr_keys), pr_weight, dtype=float),
+            np.full(len(prm_keys), prm_weight, dtype=float)
+        ])
+    })
+    edges = edges[edges['key'] >= 0].groupby('key', sort=False)['weight'].sum()
+
+    G = nx.Graph()
+    G.add_nodes_from((node, {'count': int(count)}) for node, count in zip(nodes, counts))
+    lo, hi = np.divmod(edges.index.to_numpy(), base)
+    G.add_weighted_edges_from(zip(nodes[lo], nodes[hi], edges.to_numpy()))
+
+    # the thread that created an edge sets its issue/pr attribute, unless an earlier event type did
+    issue_attrs = first_thread(ism_keys, ism_pairs['thread'], cmt_keys)
+    pr_attrs = first_thread(prm_keys, prm_pairs['thread'], np.concatenate([cmt_keys, ism_keys, pr_keys]))
+    for attr, first in (('issue', issue_attrs), ('pr', pr_attrs)):
+        lo, hi = np.divmod(first.index.to_numpy(), base)
+        nx.set_edge_attributes(G, dict(zip(zip(nodes[lo], nodes[hi]), first.tolist())), attr)
+
+    return G
+
+
+def first_thread(keys, threads, existing_keys):
+    """
+    Find the first thread creating each edge that does not already exist.
+
+    Args:
+    -----
+        keys (np.ndarray): The edge keys of the thread pair edges, in insertion order.
+        threads (pd.Series): The thread id of each pair edge.
+        existing_keys (np.ndarray): The keys of edges added before these threads.
+
+    Returns:
+    --------
+        pd.Series: The id of the first thread of each new edge, indexed by edge key.
+    """
+    first = pd.Series(threads.to_numpy(), index=keys)
+    first = first[(first.index >= 0) & ~first.index.duplicated()]
+    return first[~first.index.isin(existing_keys)]
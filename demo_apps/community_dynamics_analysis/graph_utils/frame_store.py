@@ -0,0 +1,253 @@
+import os
+import json
+import datetime as dt
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import networkx as nx
+from dateutil.relativedelta import relativedelta
+from graph_utils.window_graph import WindowedGraph
+from graph_utils.pagerank import sparse_pagerank
+from graph_utils.timeline import Timeline
+from data_utils.cache import LRUCache
+from data_utils import queries
+
+# root of the repository, the frames are stored under its data/processed directory by default
+PROJECT_DIR = Path(__file__).resolve().parents[3]
+DEFAULT_FRAME_DIR = PROJECT_DIR / 'data' / 'processed' / 'frames'
+
+# the interval options and default event weights of the sidebar
+DEFAULT_INTERVALS = (1, 3, 12)
+DEFAULT_WEIGHTS = (1.0, 0.1, 2.0, 0.5)
+
+
+#------------------------------------------------------ PRECOMPUTED FRAMES ---------------------------------------------
+
+def month_marks(first_date, last_date):
+    """
+    Return monthly date marks (formatted as "%m/%Y") from the month of `first_date` to the month of `last_date`.
+    """
+    current = dt.datetime(first_date.year, first_date.month, 1)
+    marks = []
+    while current <= last_date:
+        marks.append(current.strftime("%m/%Y"))
+        current += relativedelta(months=1)
+    return marks
+
+
+def compute_frames(data, months, interval, cmt_weight, ism_weight, pr_weight, prm_weight):
+    """
+    Compute the graph and PageRank scores of every `interval`-month frame starting at each month.
+
+    Frame m covers the months months[m]..months[m + interval], like a slider window of the dashboard,
+    so any request whose marks are `interval` months apart is a subset of these frames. The scores are
+    not warm started, like the default timeline frames (see `timeline.Timeline`).
+
+    Args:
+    -----
+        data (tuple): A tuple containing four data frames (cmt_data, ism_data, pr_data, prm_data).
+        months (list): Consecutive monthly date marks (formatted as "%m/%Y").
+        interval (int): The number of months of a frame.
+        cmt_weight, ism_weight, pr_weight, prm_weight (float): The weights to assign to edges in
+                                                               the graph based on event type.
+
+    Returns:
+    --------
+        dict: The frame arrays: the contributor ids ('nodes'), the node entries of each frame ('node_ptr',
+              'codes', 'scores', 'counts') and the edges of each frame ('edge_ptr', 'edge_u', 'edge_v',
+              'edge_w'), with codes indexing 'nodes'. Also the 'months' and 'interval' of the frames.
+    """
+    graph_engine = WindowedGraph(data, months, cmt_weight, ism_weight, pr_weight, prm_weight)
+    node_codes = {}
+    codes, scores, counts, node_ptr = [], [], [], [0]
+    edge_u, edge_v, edge_w, edge_ptr = [], [], [], [0]
+
+    for m in range(len(months) - interval):
+        with graph_engine.window(m, m + interval) as G:
+            pagerank_scores, _ = sparse_pagerank(G)
+            node_counts = dict(G.nodes(data='count'))
+            edges = list(G.edges(data='weight'))
+
+        for node in node_counts:
+            node_codes.setdefault(node, len(node_codes))
+        codes.extend(node_codes[node] for node in node_counts)
+        scores.extend(pagerank_scores[node] for node in node_counts)
+        counts.extend(node_counts.values())
+        node_ptr.append(len(codes))
+        edge_u.extend(node_codes[u] for u, _, _ in edges)
+        edge_v.extend(node_codes[v] for _, v, _ in edges)
+        edge_w.extend(w for _, _, w in edges)
+        edge_ptr.append(len(edge_u))
+
+    return {
+        'months': np.array(months, dtype=str),
+        'interval': np.array(interval),
+        'nodes': np.array(list(node_codes), dtype=str),
+        'node_ptr': np.array(node_ptr, dtype=np.int64),
+        'codes': np.array(codes, dtype=np.int32),
+        'scores': np.array(scores, dtype=np.float32),
+        'counts': np.array(counts, dtype=np.int32),
+        'edge_ptr': np.array(edge_ptr, dtype=np.int64),
+        'edge_u': np.array(edge_u, dtype=np.int32),
+        'edge_v': np.array(edge_v, dtype=np.int32),
+        'edge_w': np.array(edge_w, dtype=np.float32)
+    }
+
+
+class FrameStore:
+    """
+    On-disk store of precomputed frames (see `compute_frames`), one file per repository, weights and interval.
+
+    Frames are stored as `<root>/<org>/<repo>/weights_<cmt>_<ism>_<pr>_<prm>/interval_<n>.npz`. The
+    dashboard looks up the frames of a request here and computes them live when they are missing.
+
+    Each file records the watermarks of the data its frames were computed from (the latest update of
+    each event table, see `snapshot.SnapshotStore`). Frames older than the current watermarks of the
+    repository, or without watermarks, are stale: they are ignored, so they are computed live until
+    the repository is precomputed again. Without current watermarks (snapshots disabled), the frames
+    are served as they are.
+
+    Args:
+    -----
+        root (str): The directory of the store (`DEFAULT_FRAME_DIR` if None).
+        watermarks (callable): Optional function `watermarks(repo_org, repo_name)` returning the current
+                               watermarks of a repository by table, or None if they are unknown.
+    """
+
+    def __init__(self, root=None, watermarks=None):
+        self.root = Path(root) if root is not None else DEFAULT_FRAME_DIR
+        self.watermarks = watermarks
+        self._files = LRUCache(max_entries=8, ttl=900) # loaded files, keyed by path and modification time
+
+    def path(self, repo_org, repo_name, weights, interval):
+        weights_dir = 'weights_' + '_'.join(f'{w:g}' for w in weights)
+        return self.root / repo_org / repo_name / weights_dir / f'interval_{interval}.npz'
+
+    def write(self, repo_org, repo_name, weights, frames, watermarks=None):
+        """
+        Store the frames computed by `compute_frames` for a repository and weights, with the watermarks
+        of the data they were computed from (None if unknown, the frames are then stale with snapshots).
+        """
+        path = self.path(repo_org, repo_name, weights, int(frames['interval']))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.stem + '.tmp.npz')
+        np.savez(tmp_path, **frames, watermarks=np.array(json.dumps(watermarks)))
+        os.replace(tmp_path, path) # readers see either the old or the new frames
+
+    def read(self, repo_org, repo_name, weights, interval):
+        """
+        Return the stored frames of a repository, weights and interval, or None if there are none or
+        they are stale.
+        """
+        path = self.path(repo_org, repo_name, weights, interval)
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        frames = self._files.get_or_load((path, mtime), lambda: dict(np.load(path)))
+        current = self.watermarks(repo_org, repo_name) if self.watermarks is not None else None
+        if current is not None and is_stale(frames, current):
+            return None
+        return frames
+
+    def timeline(self, key, marks, weights, threshold):
+        """
+        Return the `Timeline` of a request built from the stored frames, or None if they are not all stored.
+
+        Args:
+        -----
+            key (tuple): A tuple identifying the repository (repo_org, repo_name).
+            marks (list): A list of date marks (formatted as "%m/%Y") representing the slider positions.
+            weights (tuple): The event weights (cmt_weight, ism_weight, pr_weight, prm_weight).
+            threshold (tuple): A tuple containing the threshold type and value.
+
+        Returns:
+        --------
+            Timeline: The timeline of the request, or None.
+        """
+        located = self._locate(key, marks, weights)
+        if located is None:
+            return None
+        frames, indices = located
+        node_ptr = frames['node_ptr']
+        frame_list = [(frames['codes'][node_ptr[i]:node_ptr[i + 1]], frames['scores'][node_ptr[i]:node_ptr[i + 1]])
+                      for i in indices]
+        return Timeline.from_frames(marks, frames['nodes'].tolist(), frame_list, threshold)
+
+    def frame(self, key, marks, weights, index):
+        """
+        Return the graph and PageRank scores of the window marks[index]..marks[index + 1] from the stored
+        frames, or None if they are not stored.
+
+        Returns:
+        --------
+            tuple: A tuple containing the graph of the window (nx.Graph, with node 'count' and edge
+                   'weight' attributes) and its PageRank scores (dict), or None.
+        """
+        located = self._locate(key, marks, weights)
+        if located is None:
+            return None
+        frames, indices = located
+        i = indices[index]
+        nodes = frames['nodes'][frames['codes'][frames['node_ptr'][i]:frames['node_ptr'][i + 1]]].tolist()
+        counts = frames['counts'][frames['node_ptr'][i]:frames['node_ptr'][i + 1]].tolist()
+        scores = frames['scores'][frames['node_ptr'][i]:frames['node_ptr'][i + 1]].tolist()
+        edges = slice(frames['edge_ptr'][i], frames['edge_ptr'][i + 1])
+
+        G = nx.Graph()
+        G.add_nodes_from((node, {'count': count}) for node, count in zip(nodes, counts))
+        G.add_weighted_edges_from(zip(frames['nodes'][frames['edge_u'][edges]].tolist(),
+                                      frames['nodes'][frames['edge_v'][edges]].tolist(),
+                                      frames['edge_w'][edges].tolist()))
+        return G, dict(zip(nodes, scores))
+
+    def _locate(self, key, marks, weights):
+        """
+        Find the stored frames matching the windows between consecutive marks.
+
+        Returns:
+        --------
+            tuple: The frame arrays and the index of the stored frame of each window, or None.
+        """
+        if len(marks) < 2:
+            return None
+        dates = pd.to_datetime(marks, format="%m/%Y")
+        steps = np.diff(dates.year * 12 + dates.month)
+        interval = int(steps[0])
+        if not (steps == interval).all():
+            return None
+
+        frames = self.read(*key, weights, interval)
+        if frames is None:
+            return None
+        months = frames['months'].tolist()
+        if marks[0] not in months:
+            return None
+        indices = months.index(marks[0]) + interval * np.arange(len(marks) - 1)
+        if indices[-1] >= len(frames['node_ptr']) - 1:
+            return None # the request goes past the precomputed months
+        return frames, indices
+
+
+def is_stale(frames, current):
+    """
+    Return whether stored frames were computed from data older than the `current` watermarks by table.
+    """
+    stored = json.loads(str(frames['watermarks'])) if 'watermarks' in frames else None
+    if stored is None:
+        return True
+    # ISO formatted timestamps, ordered as strings
+    return any(watermark > (stored.get(table) or '') for table, watermark in current.items() if watermark)
+
+
+def snapshot_watermarks(repo_org, repo_name):
+    """
+    Return the watermarks of the snapshot of a repository by table, or None without snapshot.
+    """
+    if queries.snapshot_store is None:
+        return None
+    meta = queries.snapshot_store.read_meta(repo_org, repo_name)
+    return meta['watermarks'] if meta is not None else None
+
+
+frame_store = FrameStore(watermarks=snapshot_watermarks)
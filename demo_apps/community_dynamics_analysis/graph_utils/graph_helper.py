@@ -1,9 +1,17 @@
+import base64
 import numpy as np
 import networkx as nx
+import scipy.sparse as sp
 import plotly.graph_objs as go
-import matplotlib.pyplot as plt
+from graph_utils.pagerank import sparse_pagerank
+from graph_utils.layout import get_layout
 
-#------------------------------------------------------ THRESHOLD CALCULATION ------------------------------------------------------ 
+# graphs with more nodes + edges than this are drawn with WebGL traces (go.Scattergl) built from NumPy arrays
+WEBGL_THRESHOLD = 5000
+# default limit of the serialized figure size (in bytes) of WebGL graphs, the lowest weight edges are dropped above it
+MAX_FIGURE_BYTES = 5_000_000
+
+#------------------------------------------------------ THRESHOLD CALCULATION ------------------------------------------
 
 def find_threshold(scores, threshold):
     """
@@ -61,15 +69,18 @@ def find_threshold(scores, threshold):
 
     return threshold_score
 
-#------------------------------------------------------ PAGERANK SCORES ------------------------------------------------------ 
+#------------------------------------------------------ PAGERANK SCORES ------------------------------------------------
 
-def apply_pagerank(G): 
+def apply_pagerank(G, nstart=None, tol=1.0e-6): 
     """
     Calculate the PageRank scores and normalize them for node sizes.
 
     Args:
     -----
         G (NetworkX Graph): The input graph for which PageRank scores need to be calculated.
+        nstart (dict): Optional starting scores for the power iteration, e.g. the scores of the 
+                       previously displayed window.
+        tol (float): The error tolerance used to check convergence.
 
     Returns:
     --------
@@ -80,15 +91,32 @@ def apply_pagerank(G):
               scores as values.
     """
 
-    pagerank_scores = nx.pagerank(G)
+    pagerank_scores, _ = sparse_pagerank(G, nstart, tol=tol)
+    norm_scores = normalize_scores(pagerank_scores)
+    
+    return pagerank_scores, norm_scores
+
+
+def normalize_scores(pagerank_scores):
+    """
+    Scale PageRank scores to the range [5, 20] used for node sizes.
+
+    Args:
+    -----
+        pagerank_scores (dict): A dictionary with nodes as keys and their PageRank scores as values.
+
+    Returns:
+    --------
+        dict: A dictionary with nodes as keys and their normalized PageRank scores as values.
+    """
+
     min_score = min(pagerank_scores.values())
     max_score = max(pagerank_scores.values())
     # normalize between 5 to 20 for plotting
-    norm_scores = {node: (pagerank_scores[node] - min_score) / (max_score - min_score) * (20 - 5) + 5 for node in G.nodes()}
-    
-    return pagerank_scores, norm_scores
+    return {node: (score - min_score) / (max_score - min_score) * (20 - 5) + 5
+            for node, score in pagerank_scores.items()}
 
-#------------------------------------------------------ BUILD GRAPH OBJECT ------------------------------------------------------ 
+#------------------------------------------------------ BUILD GRAPH OBJECT ---------------------------------------------
 
 def build_graph(data, start_date, end_date, cmt_weight, ism_weight, pr_weight, prm_weight):
     """
@@ -104,6 +132,9 @@ def build_graph(data, start_date, end_date, cmt_weight, ism_weight, pr_weight, p
     interactions between contributors. The weights of the edges represent the strength or 
     significance of each interaction type, which can be customized using the input weights.
 
+    This is the reference, row-by-row implementation; `edge_list.build_graph_vectorized` builds the 
+    same graph with bulk array operations and is the one used by the dashboard callbacks.
+
     Args:
     -----
         data (tuple): A tuple containing four data frames (cmt_data, ism_data, pr_data, prm_data).
@@ -285,11 +316,10 @@ def add_prm_data(G, data, start_date, end_date, weight):
                         G.add_edge(contributors[i], contributors[j], pr=pr_id, weight=weight) # add edge if not already in graph
     return G
 
-plt.switch_backend('Agg') 
-
-#------------------------------------------------------ NETWORK GRAPH VISUALIZATION ------------------------------------------------------ 
+#------------------------------------------------------ NETWORK GRAPH VISUALIZATION ------------------------------------
 
-def draw_network(G, start_date, end_date, pagerank_scores, norm_scores, threshold_score):
+def draw_network(G, start_date, end_date, pagerank_scores, norm_scores, threshold_score, layout_key=None, 
+                 layout_seed=None, webgl_threshold=WEBGL_THRESHOLD, max_figure_bytes=MAX_FIGURE_BYTES):
     """
     Draw and visualize a network graph based on nx.Graph object 
     data using a combination of NetworkX and Plotly libraries.
@@ -310,42 +340,240 @@ def draw_network(G, start_date, end_date, pagerank_scores, norm_scores, threshol
                                  scores. Core contributors with scores greater than or equal to this 
                                  threshold will be displayed in red, while those with lower scores 
                                  (peripheral) will be displayed in blue.
+        layout_key (tuple): Optional tuple identifying the repository and event weights (repo_org, repo_name, 
+                            weights). When given, node positions are cached per window (see `layout.get_layout`).
+        layout_seed (dict): Optional node positions seeding the layout, e.g. those of the preceding window.
+        webgl_threshold (int): The number of nodes + edges above which the graph is drawn with WebGL traces 
+                               (None to never use them).
+        max_figure_bytes (int): The serialized size limit of WebGL figures. Above it, only the highest weight 
+                                edges that fit are drawn (None for no limit).
 
     Returns:
     --------
         go.Figure: A Plotly Figure object representing the network graph visualization.
     """
 
-    fig = plt.subplots(figsize=(20, 20))
     # set node colors based on contributor category
     node_colors = ['red' if pagerank_scores[n] >= threshold_score else 'blue' for n in G.nodes()]
     # set node sizes based on cantrality (PageRank) scores
     node_sizes = [norm_scores[node] for node in G.nodes()]
-    pos = nx.spring_layout(G, iterations=50) 
-    edge_trace, node_trace = draw_network_traces(G, pos, node_colors, node_sizes)
+    pos = get_layout(G, layout_key, (start_date, end_date), layout_seed) 
+    webgl = webgl_threshold is not None and G.number_of_nodes() + G.number_of_edges() > webgl_threshold
+    edge_trace, node_trace = draw_network_traces(G, pos, node_colors, node_sizes, webgl)
     # convert dates to string for title
     start_date = start_date.strftime("%m/%Y")
     end_date = end_date.strftime("%m/%Y")
+    # the one figure of the frame, returned as is to the dcc.Graph
     fig = go.Figure(data=[edge_trace, node_trace],
                 layout=go.Layout(
-                    title=(f"{start_date}-{end_date}"),
-                    titlefont_size=20,
+                    title=dict(text=f"{start_date}-{end_date}", font_size=20),
                     showlegend=False,
                     hovermode='closest',
                     margin=dict(b=20,l=5,r=5,t=40),
                     xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
                     yaxis=dict(showgrid=False, zeroline=False, showticklabels=False))
                     )
-    figure = go.Figure(data=fig)
+    if webgl and max_figure_bytes is not None:
+        fit_figure_size(fig, G, pos, max_figure_bytes)
+
+    return fig
+
+
+def fit_figure_size(fig, G, pos, max_figure_bytes):
+    """
+    Drop the lowest weight edges of a WebGL network figure (see `draw_network`) until its serialized 
+    size fits `max_figure_bytes`, updating the edge trace and title in place.
+
+    The figure is serialized once. The edge coordinates are sent as typed arrays, whose serialized size 
+    is computed from the arrays themselves (see `encoded_size`), so the edges to keep are found without 
+    serializing the figure again.
+
+    Returns:
+    --------
+        int: The number of edges kept, or None if the figure already fits.
+    """
+    size = len(fig.to_json())
+    if size <= max_figure_bytes:
+        return None
+
+    xy, u, v, w = graph_arrays(G, pos)
+    x, y = edge_coordinates(xy, u, v)
+    n_edges = G.number_of_edges()
+    title = fig.layout.title.text
+    # the rest of the figure, measured with the longest title suffix
+    node_bytes = size - encoded_size(x) - encoded_size(y) + len(f" (top {n_edges} of {n_edges} edges by weight)")
+    edge_bytes = size - node_bytes
+    max_edges = n_edges
+    # keep as many of the highest weight edges as fit in the size left by the nodes, the encoded size 
+    # per edge varies a little (JSON escapes part of the base64 characters) so the estimate is checked
+    while node_bytes + edge_bytes > max_figure_bytes and max_edges > 0:
+        max_edges = int(max_edges * max(max_figure_bytes - node_bytes, 0) / max(edge_bytes, 1))
+        keep = decimate_edges(w, max_edges)
+        x, y = edge_coordinates(xy, u[keep], v[keep])
+        edge_bytes = encoded_size(x) + encoded_size(y)
+
+    fig.data[0].update(x=x, y=y)
+    fig.layout.title.text = f"{title} (top {max_edges} of {n_edges} edges by weight)"
+    return max_edges
+
+
+def encoded_size(values):
+    """
+    Return the number of characters of a NumPy array in the JSON of a figure: Plotly sends it as base64 
+    data, where JSON escapes '/' as '\\u002f'.
+    """
+    data = base64.b64encode(np.ascontiguousarray(values).tobytes())
+    return len(data) + 5 * data.count(b'/')
+
+#------------------------------------------------------ NETWORK GRAPH ANIMATION ----------------------------------------
 
-    return figure
+def draw_network_animation(windows, marks, layout_key=None, frame_duration=500, max_figure_bytes=MAX_FIGURE_BYTES):
+    """
+    Draw the network graphs of consecutive windows as one Plotly figure with animation frames, 
+    played by the browser without a server round trip per step.
+
+    The nodes of all windows share one ordering and one layout (of the union graph), so the node 
+    coordinates are sent once; each frame carries the node sizes, colors and hover data of its window 
+    (nodes absent from it are hidden) and its edge trace, as typed arrays. The edges are not delta 
+    encoded, a Plotly frame replaces the whole trace: the size is bounded instead by dropping the 
+    lowest weight edges of every frame in the same proportion above `max_figure_bytes`.
 
-#------------------------------------------------------ NETWORKX TO PLOTLY ------------------------------------------------------ 
+    Args:
+    -----
+        windows (list): The (G, pagerank_scores, threshold_score) of each window, window i covering 
+                        marks[i]..marks[i + 1] (see `draw_network`).
+        marks (list): A list of date marks (formatted as "%m/%Y") representing the slider positions.
+        layout_key (tuple): Optional tuple identifying the repository and event weights (repo_org, repo_name, 
+                            weights), to cache the layout (see `layout.get_layout`).
+        frame_duration (int): The duration of a frame, in milliseconds.
+        max_figure_bytes (int): The serialized size limit of the figure (None for no limit).
 
-def draw_network_traces(G, pos, node_colors, node_sizes):
+    Returns:
+    --------
+        go.Figure: A Plotly Figure object with a frame per window, and play/pause buttons and a slider 
+                   to control them.
+    """
+    # one node ordering for all the windows
+    index = {}
+    for G, _, _ in windows:
+        for node in G:
+            index.setdefault(node, len(index))
+    n = len(index)
+
+    nodes = []
+    edges = []
+    for G, pagerank_scores, threshold_score in windows:
+        frame_nodes = np.fromiter((index[node] for node in G), dtype=np.int64, count=len(G))
+        u, v, w = edge_arrays(G, index)
+        # hidden nodes have a size of 0, the others are sized and colored like in `draw_network`
+        size = np.zeros(n, dtype=np.float32)
+        core = np.zeros(n, dtype=np.float32)
+        counts = np.zeros((n, 2), dtype=np.int32)
+        if len(G):
+            scores = np.fromiter((pagerank_scores[node] for node in G), dtype=np.float64, count=len(G))
+            span = scores.max() - scores.min()
+            # normalized between 5 to 20 as in `normalize_scores`
+            size[frame_nodes] = (scores - scores.min()) / span * (20 - 5) + 5 if span > 0 else 5
+            core[frame_nodes] = scores >= threshold_score
+            counts[frame_nodes, 0] = [count for _, count in G.nodes(data='count')]
+            degrees = np.bincount(u, minlength=n) + np.bincount(v[u != v], minlength=n)
+            counts[frame_nodes, 1] = degrees[frame_nodes]
+        nodes.append((size, core, counts))
+        edges.append((u, v, w))
+
+    # one layout for the union of the windows (summed edge weights), so nodes keep their place across frames
+    union = nx.Graph()
+    union.add_nodes_from(index)
+    if edges:
+        u, v, w = (np.concatenate(arrays) for arrays in zip(*edges))
+        weights = sp.coo_array((w, (np.minimum(u, v), np.maximum(u, v))), shape=(n, n)).tocsr().tocoo()
+        labels = list(index)
+        union.add_weighted_edges_from(zip([labels[i] for i in weights.row.tolist()], 
+                                          [labels[i] for i in weights.col.tolist()], weights.data.tolist()))
+    pos = get_layout(union, layout_key, (marks[0], marks[-1]))
+    xy = np.array([pos[node] for node in index], dtype=np.float32).reshape(-1, 2)
+
+    fig = animation_figure(xy, nodes, edges, marks, frame_duration)
+    if max_figure_bytes is not None:
+        size = len(fig.to_json())
+        edge_total = sum(len(w) for _, _, w in edges)
+        no_edges = animation_figure(xy, nodes, [(np.empty(0, dtype=np.int64),) * 3] * len(edges), marks, frame_duration)
+        edge_bytes = size - len(no_edges.to_json())
+        fraction = 1.0
+        # drop the same fraction of lowest weight edges in every frame until the figure fits, the 
+        # encoded size per edge varies a little so the estimate is checked
+        while size > max_figure_bytes and edge_total > 0 and fraction > 0:
+            fraction *= max(max_figure_bytes - (size - edge_bytes), 0) / max(edge_bytes, 1)
+            kept = []
+            for u, v, w in edges:
+                keep = decimate_edges(w, int(len(w) * fraction))
+                kept.append((u[keep], v[keep], w[keep]))
+            fig = animation_figure(xy, nodes, kept, marks, frame_duration)
+            previous, size = size, len(fig.to_json())
+            edge_bytes -= previous - size
+
+    return fig
+
+
+def animation_figure(xy, nodes, edges, marks, frame_duration):
+    """
+    Build the animated figure of `draw_network_animation` from the node positions, the (size, core, counts) 
+    node arrays and the (u, v, w) edge arrays of each frame.
+    """
+    titles = [f"{marks[i]}-{marks[i + 1]}" for i in range(len(nodes))]
+    frames = []
+    for i, (size, core, counts) in enumerate(nodes):
+        edge_x, edge_y = trail_coordinates(xy, edges[i][0], edges[i][1])
+        frame_data = [
+            go.Scattergl(x=edge_x, y=edge_y),
+            go.Scattergl(marker=dict(size=size, color=core, opacity=(size > 0).astype(np.float32)), customdata=counts)
+        ]
+        frames.append(go.Frame(name=str(i), data=frame_data, traces=[0, 1], layout=dict(title_text=titles[i])))
+
+    # the figure starts on the first frame
+    first_edge_x, first_edge_y = trail_coordinates(xy, edges[0][0], edges[0][1]) if edges else ([], [])
+    size, core, counts = nodes[0] if nodes else (np.empty(0),) * 3
+    edge_trace = go.Scattergl(
+        x=first_edge_x, y=first_edge_y,
+        line=dict(width=0.5, color='#888'),
+        hoverinfo='none',
+        mode='lines')
+    node_trace = go.Scattergl(
+        x=xy[:, 0], y=xy[:, 1],
+        marker=dict(size=size, color=core, colorscale=[[0, 'blue'], [1, 'red']], cmin=0, cmax=1, 
+                    opacity=(size > 0).astype(np.float32)),
+        customdata=counts,
+        hovertemplate="# of contributions: %{customdata[0]}<br># of connections: %{customdata[1]}<extra></extra>",
+        mode='markers')
+
+    play = dict(frame=dict(duration=frame_duration, redraw=True), transition=dict(duration=0), fromcurrent=True)
+    jump = dict(mode='immediate', frame=dict(duration=0, redraw=True), transition=dict(duration=0))
+    steps = [dict(method='animate', label=marks[i], args=[[str(i)], jump]) for i in range(len(frames))]
+
+    return go.Figure(data=[edge_trace, node_trace], frames=frames,
+                layout=go.Layout(
+                    title=dict(text=titles[0] if titles else "", font_size=20),
+                    showlegend=False,
+                    hovermode='closest',
+                    margin=dict(b=20,l=5,r=5,t=40),
+                    xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+                    yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+                    updatemenus=[dict(type='buttons', showactive=False, x=0, y=0, xanchor='left', yanchor='top',
+                                      buttons=[dict(label='▶', method='animate', args=[None, play]),
+                                               dict(label='⏸', method='animate', args=[[None], jump])])],
+                    sliders=[dict(active=0, steps=steps, x=0.1, len=0.9, y=0, yanchor='top', 
+                                  currentvalue=dict(visible=False))])
+                    )
+
+#------------------------------------------------------ NETWORKX TO PLOTLY ---------------------------------------------
+
+def draw_network_traces(G, pos, node_colors, node_sizes, webgl=False):
     """
     Create edge and node traces for a network graph visualization.
 
+    The nodes are mapped to integer indices once, and the edge coordinates, degrees and hover texts 
+    are computed in bulk with NumPy from the resulting arrays.
+
     Args:
     -----------
         G (nx.Graph): The input graph representing interactions among contributors. Nodes in the graph 
@@ -357,49 +585,177 @@ def draw_network_traces(G, pos, node_colors, node_sizes):
                             contributor based on certain criteria (e.g., core, peripheral, new).
         node_sizes (list): A list of sizes for nodes in the graph, where each size corresponds to a 
                             contributor based on their centrality calculated via Pagerank score.
+        webgl (bool): Whether to create WebGL traces (go.Scattergl), rendered by the GPU, for large graphs.
 
     Returns:
     --------
-        tuple: A tuple containing two Plotly Scatter objects representing the edge and node traces for 
-               the network graph visualization.
-    """
-    edge_x = []
-    edge_y = []
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x.append(x0)
-        edge_x.append(x1)
-        edge_x.append(None)
-        edge_y.append(y0)
-        edge_y.append(y1)
-        edge_y.append(None)
-
-    edge_trace = go.Scatter(
+        tuple: A tuple containing two Plotly Scatter (or Scattergl) objects representing the edge and node 
+               traces for the network graph visualization.
+    """
+    scatter = go.Scattergl if webgl else go.Scatter
+    xy, u, v, w = graph_arrays(G, pos)
+
+    # number of edges of each node (self loops count once, like len(G.adj[node]))
+    degrees = np.bincount(u, minlength=len(xy)) + np.bincount(v[u != v], minlength=len(xy))
+    counts = [count for _, count in G.nodes(data='count')]
+    node_text = [f"# of contributions: {count}<br># of connections: {degree}" 
+                 for count, degree in zip(counts, degrees.tolist())]
+
+    edge_x, edge_y = edge_coordinates(xy, u, v)
+
+    edge_trace = scatter(
         x=edge_x, y=edge_y,
         line=dict(width=0.5, color='#888'),
         hoverinfo='none',
         mode='lines')
-    
-    node_x = []
-    node_y = []
-    node_text = []
-    for node in G.nodes():
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
-        # calculate number of contributions and edges for hover text
-        node_count = G.nodes[node]['count']
-        contributions_text = '# of contributions: ' + str(node_count)
-        adjacencies = G.adj[node]  # adjacent nodes for the current node
-        connections_text = '# of connections: ' + str(len(adjacencies))
-        node_text.append(contributions_text + '<br>' + connections_text)
-
-    node_trace = go.Scatter(
-        x=node_x, y=node_y,
-        marker=dict(size = node_sizes, color = node_colors),
-        text = node_text,
+
+    node_trace = scatter(
+        x=xy[:, 0], y=xy[:, 1],
+        marker=dict(size=np.asarray(node_sizes, dtype=np.float32), **marker_colors(node_colors)),
+        text=node_text,
         mode='markers',
         hoverinfo='text')
 
     return edge_trace, node_trace
+
+
+def marker_colors(colors):
+    """
+    Encode a list of marker colors as numeric codes into a discrete colorscale, which Plotly validates 
+    in bulk instead of color by color.
+
+    Returns:
+    --------
+        dict: The 'color', 'colorscale', 'cmin' and 'cmax' properties of the marker.
+    """
+    palette, codes = np.unique(np.asarray(colors, dtype=str), return_inverse=True)
+    if len(palette) == 0:
+        return dict(color=[])
+    # code i is drawn with palette[i], a single color spans the whole scale
+    stops = np.linspace(0, 1, len(palette)) if len(palette) > 1 else np.array([0, 1])
+    colorscale = [[stop, palette[min(i, len(palette) - 1)]] for i, stop in enumerate(stops.tolist())]
+    return dict(color=codes.astype(np.float32), colorscale=colorscale, cmin=0, cmax=max(len(palette) - 1, 1))
+
+
+def graph_arrays(G, pos):
+    """
+    Gather the node positions and edges of a graph into NumPy arrays, nodes being indexed in `G.nodes()` order.
+
+    Returns:
+    --------
+        tuple: The (n, 2) float32 array of node positions, and the end point indices (int64) and 
+               weights (float64) of the edges.
+    """
+    index = dict(zip(G, range(len(G))))
+    xy = np.array([pos[node] for node in G], dtype=np.float32).reshape(-1, 2)
+    return (xy, *edge_arrays(G, index))
+
+
+def edge_arrays(G, index):
+    """
+    Return the end point indices (int64, given by `index`, a dict of node indices) and weights (float64) 
+    of the edges of a graph.
+    """
+    # a single pass over the edge view, the rest is done on arrays
+    edges = np.array([(index[a], index[b], weight) for a, b, weight in G.edges(data='weight', default=1)], 
+                     dtype=np.float64).reshape(-1, 3)
+    return edges[:, 0].astype(np.int64), edges[:, 1].astype(np.int64), edges[:, 2]
+
+
+def edge_coordinates(xy, u, v):
+    """
+    Return the x and y coordinate arrays (float32) of the edge lines between the nodes `u` and `v`, each 
+    edge drawn as its two end points followed by a NaN gap.
+    """
+    coords = np.full((len(u), 3, 2), np.nan, dtype=np.float32)
+    coords[:, 0] = xy[u]
+    coords[:, 1] = xy[v]
+    return coords[:, :, 0].ravel(), coords[:, :, 1].ravel()
+
+
+def trail_coordinates(xy, u, v):
+    """
+    Return the x and y coordinate arrays (float32) of the edge lines between the nodes `u` and `v`, with the 
+    edges chained into trails (see `edge_trails`) so consecutive edges share their common end point.
+
+    A trail of k edges takes k + 2 values (NaN gap included) instead of the 3k of `edge_coordinates`.
+    """
+    sequence = edge_trails(u, v, len(xy))
+    coords = np.full((len(sequence), 2), np.nan, dtype=np.float32)
+    coords[sequence >= 0] = xy[sequence[sequence >= 0]]
+    return coords[:, 0], coords[:, 1]
+
+
+def edge_trails(u, v, n):
+    """
+    Chain the edges (u, v) of a graph of `n` nodes into trails, walks using every edge exactly once.
+
+    The odd degree nodes are paired with virtual edges so every component has an Eulerian circuit, found 
+    with Hierholzer's algorithm; the circuits are cut at the virtual edges.
+
+    Returns:
+    --------
+        np.ndarray: The node indices (int64) of the trails, each followed by -1.
+    """
+    m = len(u)
+    degree = np.bincount(u, minlength=n) + np.bincount(v, minlength=n)
+    odd = np.flatnonzero(degree % 2)
+    # edges m and above are virtual
+    a = np.concatenate([u, odd[::2]])
+    b = np.concatenate([v, odd[1::2]])
+    ends = np.concatenate([a, b])
+    incident = (np.argsort(ends, kind='stable') % len(a)).tolist() # edges incident to each node, grouped by node
+    ptr = np.concatenate([[0], np.cumsum(np.bincount(ends, minlength=n))]).tolist()
+    a, b = a.tolist(), b.tolist()
+    cursor = ptr[:-1] # next incident edge to look at, per node
+    used = [False] * len(a)
+
+    sequence = []
+    for start in range(n):
+        if cursor[start] == ptr[start + 1]:
+            continue
+        stack = [(start, -1)] # (node, edge it was reached by)
+        circuit = []
+        while stack:
+            node, reached_by = stack[-1]
+            c, end = cursor[node], ptr[node + 1]
+            while c < end and used[incident[c]]:
+                c += 1
+            cursor[node] = c
+            if c < end:
+                edge = incident[c]
+                used[edge] = True
+                stack.append((a[edge] + b[edge] - node, edge))
+            else:
+                stack.pop()
+                circuit.append((node, reached_by))
+
+        # circuit[i] was reached from circuit[i + 1] by edge circuit[i][1]
+        in_trail = False
+        for i in range(len(circuit) - 1):
+            node, edge = circuit[i]
+            if edge >= m:
+                if in_trail:
+                    sequence.append(-1)
+                    in_trail = False
+                continue
+            if not in_trail:
+                sequence.append(node)
+                in_trail = True
+            sequence.append(circuit[i + 1][0])
+        if in_trail:
+            sequence.append(-1)
+
+    return np.array(sequence, dtype=np.int64)
+
+
+def decimate_edges(weights, max_edges):
+    """
+    Return the (sorted) indices of the `max_edges` highest weights, i.e. drop the edges below the weight 
+    percentile leaving `max_edges` edges.
+    """
+    if max_edges <= 0:
+        return np.array([], dtype=np.int64)
+    if max_edges >= len(weights):
+        return np.arange(len(weights))
+    return np.sort(np.argpartition(-weights, max_edges - 1)[:max_edges])
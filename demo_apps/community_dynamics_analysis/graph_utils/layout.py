@@ -0,0 +1,151 @@
+import numpy as np
+import networkx as nx
+from scipy.spatial import cKDTree
+from data_utils.cache import LRUCache
+
+# graphs with more nodes than this are laid out with `fast_layout` instead of nx.spring_layout
+FAST_LAYOUT_NODES = 1000
+# seed of the random initial positions, so a graph and seed layout always give the same positions
+LAYOUT_SEED = 0
+
+# node positions of the drawn windows, keyed by (repo_org, repo_name, weights, start_date, end_date)
+layout_cache = LRUCache(max_entries=64, ttl=900)
+
+
+#------------------------------------------------------ GRAPH LAYOUT ---------------------------------------------------
+
+def get_layout(G, key=None, window=None, previous=None, fast_layout_nodes=FAST_LAYOUT_NODES):
+    """
+    Compute the node positions of a graph, reusing the positions of previously drawn windows.
+
+    A window that was already drawn gets its cached positions back. Otherwise the layout starts from
+    the `previous` positions given by the caller, e.g. those of the preceding slider window (see
+    `cached_layout`), so fewer iterations are needed and the nodes stay in place between frames. The
+    seed is passed explicitly rather than taken from the last window drawn, which depends on the
+    order the prefetch threads finish in. Graphs above `fast_layout_nodes` nodes use `fast_layout`.
+
+    Args:
+    -----
+        G (nx.Graph): The graph to lay out.
+        key (tuple): A tuple identifying the repository and the event weights of the graph (repo_org,
+                     repo_name, weights), None to disable caching.
+        window (tuple): The (start_date, end_date) of the window drawn.
+        previous (dict): Optional node positions seeding the layout.
+        fast_layout_nodes (int): The number of nodes above which `fast_layout` is used (None to never use it).
+
+    Returns:
+    --------
+        dict: A dictionary with nodes as keys and their (x, y) positions as values.
+    """
+    if key is None:
+        return layout(G, previous, fast_layout_nodes)
+
+    window_key = (*key, *window)
+    pos = layout_cache.get(window_key)
+    if pos is None or any(node not in pos for node in G):
+        pos = layout(G, previous, fast_layout_nodes)
+        layout_cache.put(window_key, pos)
+    return pos
+
+
+def cached_layout(key, window):
+    """
+    Return the node positions of a window drawn by `get_layout`, or None if they are not cached.
+    """
+    return layout_cache.get((*key, *window))
+
+
+def layout(G, previous=None, fast_layout_nodes=FAST_LAYOUT_NODES):
+    """
+    Lay out a graph, seeded with the positions of a previous layout when given.
+    """
+    seed = {node: previous[node] for node in G if node in previous} if previous else {}
+    # the seeded nodes are close to equilibrium already, fewer iterations are needed
+    iterations = 15 if seed else 50
+
+    if fast_layout_nodes is not None and len(G) > fast_layout_nodes:
+        return fast_layout(G, seed, iterations=iterations, seed=LAYOUT_SEED)
+    return nx.spring_layout(G, pos=seed or None, iterations=iterations, seed=LAYOUT_SEED)
+
+
+def fast_layout(G, previous=None, iterations=50, weight='weight', seed=None):
+    """
+    Force-directed layout with a cutoff on the repulsive forces, in O(n log n) per iteration.
+
+    A Fruchterman-Reingold layout where nodes only repel nodes closer than a cutoff distance, found
+    with a k-d tree, instead of every other node. Attractive forces along the edges are computed in
+    bulk with NumPy. Nodes of a previous layout start at their previous positions with a lower
+    temperature, so the layout changes little between consecutive windows.
+
+    Args:
+    -----
+        G (nx.Graph): The graph to lay out.
+        previous (dict): Optional positions of a previous layout (in the [-1, 1] range of `spring_layout`).
+        iterations (int): The number of iterations.
+        weight (str): The edge attribute used as weight.
+        seed (int): The seed of the random initial positions.
+
+    Returns:
+    --------
+        dict: A dictionary with nodes as keys and their (x, y) positions in [-1, 1] as values.
+    """
+    nodes = list(G)
+    n = len(nodes)
+    if n == 0:
+        return {}
+    index = {node: i for i, node in enumerate(nodes)}
+    rng = np.random.default_rng(seed)
+
+    pos = rng.random((n, 2))
+    temperature = 0.1
+    if previous:
+        known = np.array([node in previous for node in nodes])
+        if known.any():
+            pos[known] = (np.array([previous[node] for node in nodes if node in previous]) + 1) / 2
+            temperature = 0.02
+
+    edges = np.array([(index[u], index[v], w) for u, v, w in G.edges(data=weight, default=1)], dtype=float)
+    edges = edges.reshape(-1, 3)
+    u, v, w = edges[:, 0].astype(np.int64), edges[:, 1].astype(np.int64), edges[:, 2]
+
+    k = np.sqrt(1.0 / n) # optimal distance between nodes
+    cutoff = 3 * k
+    cooling = temperature / (iterations + 1)
+    # the spread of uniform positions in [0, 1], previous positions are rescaled to it as well
+    spread = np.sqrt(1 / 12)
+    pos = (pos - pos.mean(axis=0)) * (spread / max(pos.std(), 1e-12)) + 0.5
+    for _ in range(iterations):
+        displacement = np.zeros((n, 2))
+
+        # repulsion between the nodes closer than the cutoff
+        pairs = cKDTree(pos).query_pairs(cutoff, output_type='ndarray')
+        if len(pairs):
+            i, j = pairs[:, 0], pairs[:, 1]
+            delta = pos[i] - pos[j]
+            distance = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 0.01 * k)
+            force = delta * (k * k / distance ** 2)[:, None]
+            displacement += scatter_add(i, force, n) - scatter_add(j, force, n)
+
+        # attraction along the edges
+        if len(u):
+            delta = pos[u] - pos[v]
+            distance = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 0.01 * k)
+            force = delta * (distance * w / k)[:, None]
+            displacement += scatter_add(v, force, n) - scatter_add(u, force, n)
+
+        # move the nodes, by at most the temperature
+        length = np.maximum(np.hypot(displacement[:, 0], displacement[:, 1]), 0.01 * k)
+        pos += displacement * (np.minimum(length, temperature) / length)[:, None]
+        # without long range repulsion the layout would contract, keep its spread (and node density) constant
+        pos = (pos - pos.mean(axis=0)) * (spread / max(pos.std(), 1e-12)) + 0.5
+        temperature -= cooling
+
+    pos = nx.rescale_layout(pos)
+    return dict(zip(nodes, pos))
+
+
+def scatter_add(index, values, n):
+    """
+    Sum the rows of `values` (shape (m, 2)) into an (n, 2) array by row `index`.
+    """
+    return np.column_stack([np.bincount(index, values[:, 0], n), np.bincount(index, values[:, 1], n)])
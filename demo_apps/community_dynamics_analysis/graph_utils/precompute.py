@@ -0,0 +1,56 @@
+"""
+Precompute the per-interval frames of the dashboard for a list of repositories.
+
+Run from the app directory (next to config.json):
+
+    python -m graph_utils.precompute <repo_list> [--intervals 1 3 12] [--weights 1 0.1 2 0.5] [--output DIR]
+
+The repository list has one `org/repo` per line. For every repository, interval and the given weights,
+the graph edge lists and PageRank scores of every frame are stored in the frame store (see
+`graph_utils.frame_store`), where the dashboard callbacks look them up before computing live. With
+snapshots, the frames record the snapshot watermarks of their data and are ignored once the snapshot
+is refreshed past them.
+"""
+import argparse
+import time
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+from data_utils.queries import load_data
+from graph_utils.frame_store import (FrameStore, compute_frames, month_marks, snapshot_watermarks, DEFAULT_INTERVALS,
+                                     DEFAULT_WEIGHTS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the dashboard frames of a list of repositories.")
+    parser.add_argument('repo_list', help="A file with one org/repo per line.")
+    parser.add_argument('--intervals', type=int, nargs='+', default=list(DEFAULT_INTERVALS),
+                        help="The interval lengths in months.")
+    parser.add_argument('--weights', type=float, nargs=4, default=list(DEFAULT_WEIGHTS),
+                        metavar=('CMT', 'ISM', 'PR', 'PRM'), help="The event weights.")
+    parser.add_argument('--output', default=None, help="The frame store directory.")
+    args = parser.parse_args()
+
+    store = FrameStore(args.output)
+    with open(args.repo_list) as repo_file:
+        repos = [line.split('#', 1)[0].strip() for line in repo_file]
+
+    for repo in filter(None, repos):
+        repo_org, repo_name = repo.split('/', 1)
+        start = time.perf_counter()
+        data, _ = load_data(repo_org, repo_name)
+        watermarks = snapshot_watermarks(repo_org, repo_name) # the version of the data, None without snapshots
+        timestamps = pd.concat([d['timestamp'] for d in data]).dropna()
+        if timestamps.empty:
+            print(f"{repo}: no events")
+            continue
+        # the last mark is after the last event so every event falls inside a frame
+        months = month_marks(timestamps.min(), timestamps.max() + relativedelta(months=1))
+
+        for interval in args.intervals:
+            frames = compute_frames(data, months, interval, *args.weights)
+            store.write(repo_org, repo_name, args.weights, frames, watermarks)
+        print(f"{repo}: {len(months)} months, {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
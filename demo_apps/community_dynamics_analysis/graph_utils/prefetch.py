@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+
+#------------------------------------------------------ FRAME PREFETCH -------------------------------------------------
+
+class FramePrefetcher:
+    """
+    Computes the figures of the upcoming animation frames in a worker pool, ahead of playback.
+
+    Each animation is identified by a request key (repository, marks, weights, threshold) and has its
+    own buffer, so sessions playing different animations do not cancel each other. `schedule` submits
+    the frames expected next, and `get` hands over a prefetched figure, waiting for it if it is still
+    being computed. At most `depth` frames are buffered per key: frames no longer expected are dropped
+    when the next ones are scheduled. At most `max_keys` buffers are kept, the least recently used one
+    is dropped beyond. Dropping a buffer (eviction or `cancel`) drops its frames; frames not started
+    yet are never computed, and frames being computed are discarded when they finish.
+
+    The buffers live in the memory of the process: with several server workers (e.g. gunicorn), each
+    worker has its own prefetcher, and a frame prefetched by one worker is a miss for the others.
+
+    Args:
+    -----
+        render (callable): A function `render(key, frame)` returning the figure of a frame.
+        workers (int): The number of worker threads.
+        depth (int): The maximum number of frames computed ahead per key.
+        max_keys (int): The maximum number of request keys buffered at once.
+    """
+
+    def __init__(self, render, workers=2, depth=4, max_keys=8):
+        self.depth = depth
+        self.max_keys = max_keys
+        self._render = render
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='frame-prefetch')
+        self._lock = threading.Lock()
+        self._buffers = OrderedDict() # request key -> (frame -> Future of its figure, in playback order)
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key, frame):
+        """
+        Return the prefetched figure of a frame and remove it from the buffer, or None if it was not
+        prefetched for this request key (or its computation failed).
+        """
+        with self._lock:
+            futures = self._buffers.get(key)
+            future = futures.pop(frame, None) if futures is not None else None
+            if future is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._buffers.move_to_end(key)
+        try:
+            return future.result()
+        except CancelledError:
+            return None
+        except Exception:
+            return None # computed again by the caller, which reports the error
+
+    def schedule(self, key, frames):
+        """
+        Prefetch the next frames of a request, in playback order (only the first `depth` are kept).
+
+        Args:
+        -----
+            key (hashable): The request key, its buffer becomes the most recently used one.
+            frames (list): The upcoming frames, each a hashable passed to `render`.
+        """
+        frames = list(OrderedDict.fromkeys(frames))[:self.depth]
+        with self._lock:
+            futures = self._buffers.setdefault(key, OrderedDict())
+            self._buffers.move_to_end(key)
+            while len(self._buffers) > self.max_keys:
+                _, evicted = self._buffers.popitem(last=False)
+                self._evictions += 1
+                _cancel(evicted)
+            # frames no longer expected (e.g. after the slider was moved by hand) are dropped
+            for frame in [frame for frame in futures if frame not in frames]:
+                futures.pop(frame).cancel()
+            for frame in frames:
+                if frame not in futures:
+                    futures[frame] = self._pool.submit(self._render, key, frame)
+
+    def cancel(self, key=None):
+        """
+        Drop the buffered frames of a request key, e.g. when its animation is paused, or of every key if
+        no key is given.
+        """
+        with self._lock:
+            if key is None:
+                for futures in self._buffers.values():
+                    _cancel(futures)
+                self._buffers.clear()
+            else:
+                _cancel(self._buffers.pop(key, {}))
+
+    def stats(self):
+        """
+        Return the number of frames served from the buffers ('hits'), requested but not prefetched
+        ('misses'), currently buffered or in progress ('buffered'), the number of request keys buffered
+        ('keys') and of buffers dropped to stay within `max_keys` ('evictions').
+        """
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses,
+                    'buffered': sum(len(futures) for futures in self._buffers.values()),
+                    'keys': len(self._buffers), 'evictions': self._evictions}
+
+
+def _cancel(futures):
+    for future in futures.values():
+        future.cancel()
+    futures.clear()
@@ -0,0 +1,266 @@
+import numpy as np
+import pandas as pd
+from graph_utils.graph_helper import find_threshold
+from graph_utils.window_graph import WindowedMatrix
+from graph_utils.pagerank import pagerank_matrix
+from data_utils.cache import LRUCache
+
+# timelines shared by the plot and network graph callbacks, keyed by repo, marks, weights, threshold and
+# PageRank settings
+timeline_cache = LRUCache(max_entries=8, ttl=900)
+# optional store sharing the timelines with other processes, e.g. the background jobs (see `share_timelines`)
+shared_store = None
+
+# PageRank error tolerance of the frames, the `nx.pagerank` default
+PAGERANK_TOL = 1.0e-6
+
+
+class Timeline:
+    """
+    Per-interval PageRank scores and core/peripheral split of a repository, computed in one pass.
+
+    Frame i is the graph of the interactions between marks[i] and marks[i+1]. Every frame's graph
+    and PageRank vector are computed once and stored in a compact columnar layout: contributors are
+    integer codes into `nodes`, and the codes, scores (float32) and core flags of all frames are
+    concatenated, with `frame_ptr[i]:frame_ptr[i+1]` selecting the entries of frame i.
+
+    The frame matrices are maintained incrementally (`WindowedMatrix`). By default each PageRank power
+    iteration starts from uniform scores like `nx.pagerank`, so only contributors with exactly tied
+    scores, split by float rounding, can fall on another side of the threshold. With `warm_start`, each
+    iteration starts from the scores of the previous frame and consecutive frames with a similar
+    community converge in a few iterations, but it stops at other scores within `tol`: contributors
+    with nearly tied scores can swap ranks, moving the threshold cut (by number, percentage or elbow)
+    and the promotions, demotions and average intervals with it. The number of iterations and final
+    residual of every frame are kept in `iterations` and `residuals`.
+
+    Args:
+    -----
+        data (tuple): A tuple containing four data frames (cmt_data, ism_data, pr_data, prm_data).
+        marks (list): A list of date marks (formatted as "%m/%Y") representing intervals for the network graph.
+        cmt_weight, ism_weight, pr_weight, prm_weight (float): The weights to assign to edges in
+                                                               the graph based on event type.
+        threshold (tuple): A tuple containing the threshold type and the corresponding value for
+                           threshold calculation (threshold_type, threshold_value).
+        tol (float): The PageRank error tolerance used to check convergence.
+        warm_start (bool): Whether each frame starts from the PageRank scores of the previous one.
+        progress (callable): Optional function called as `progress(frames_done, frames_total)` after each frame.
+    """
+
+    def __init__(self, data, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold, tol=PAGERANK_TOL,
+                 warm_start=False, progress=None):
+        self.marks = list(marks)
+        frames, iterations, residuals = [], [], []
+
+        matrix_engine = WindowedMatrix(data, marks, cmt_weight, ism_weight, pr_weight, prm_weight)
+        self.nodes = list(matrix_engine.nodes) # contributor id of each code
+        last_scores = np.full(len(self.nodes), np.nan) # scores of the previous frame, NaN if absent
+        for frame in range(len(marks) - 1):
+            frame_codes, A = matrix_engine.matrix(frame, frame + 1)
+            frame_scores, info = pagerank_matrix(A, last_scores[frame_codes] if warm_start else None, tol=tol)
+            last_scores[:] = np.nan
+            last_scores[frame_codes] = frame_scores
+
+            frames.append((frame_codes, frame_scores))
+            iterations.append(info['iterations'])
+            residuals.append(info['residual'])
+            if progress is not None:
+                progress(frame + 1, len(marks) - 1)
+
+        self._store_frames(frames, threshold)
+        self.iterations = np.array(iterations, dtype=np.int32)
+        self.residuals = np.array(residuals, dtype=np.float32)
+
+    @classmethod
+    def from_frames(cls, marks, nodes, frames, threshold):
+        """
+        Build a timeline from precomputed PageRank frames (see `graph_utils.frame_store`).
+
+        Args:
+        -----
+            marks (list): A list of date marks (formatted as "%m/%Y"), one more than the frames.
+            nodes (list): The contributor id of each code.
+            frames (list): The (codes, scores) arrays of each frame.
+            threshold (tuple): A tuple containing the threshold type and value.
+
+        Returns:
+        --------
+            Timeline: The timeline. Its `iterations` and `residuals` are zero (not recorded).
+        """
+        timeline = cls.__new__(cls)
+        timeline.marks = list(marks)
+        timeline.nodes = list(nodes)
+        timeline._store_frames(frames, threshold)
+        timeline.iterations = np.zeros(len(frames), dtype=np.int32)
+        timeline.residuals = np.zeros(len(frames), dtype=np.float32)
+        return timeline
+
+    def _store_frames(self, frames, threshold):
+        """
+        Split every frame into core and peripheral contributors and store the frames in the columnar layout.
+        """
+        codes, scores, core, frame_ptr, thresholds = [], [], [], [0], []
+        for frame_codes, frame_scores in frames:
+            threshold_score = find_threshold(frame_scores, threshold) if len(frame_scores) else np.nan
+            codes.append(np.asarray(frame_codes, dtype=np.int32))
+            scores.append(np.asarray(frame_scores, dtype=np.float32))
+            core.append(frame_scores >= threshold_score)
+            thresholds.append(threshold_score)
+            frame_ptr.append(frame_ptr[-1] + len(frame_codes))
+
+        self.codes = np.concatenate(codes) if codes else np.empty(0, dtype=np.int32)
+        self.scores = np.concatenate(scores) if scores else np.empty(0, dtype=np.float32)
+        self.core = np.concatenate(core) if core else np.empty(0, dtype=bool)
+        self.frame_ptr = np.array(frame_ptr, dtype=np.int64)
+        self.thresholds = np.array(thresholds, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.frame_ptr) - 1
+
+    def frame(self, frame):
+        """
+        Return the PageRank scores and threshold score of a frame.
+
+        Args:
+        -----
+            frame (int): The frame index.
+
+        Returns:
+        --------
+            tuple: A tuple containing:
+                - pagerank_scores (dict): A dictionary with contributors as keys and their PageRank scores as values.
+                - threshold_score (float): The core node threshold score of the frame.
+        """
+        entries = slice(self.frame_ptr[frame], self.frame_ptr[frame + 1])
+        pagerank_scores = {self.nodes[c]: float(s) for c, s in zip(self.codes[entries], self.scores[entries])}
+        return pagerank_scores, self.thresholds[frame]
+
+    def plot_data(self):
+        """
+        Get plot data for each interval frame of the network graph. The data collected at each interval includes:
+            - core: count of core nodes
+            - peripheral: count of peripheral nodes
+            - new: count of net new nodes (not previously seen in the network)
+            - all_time: net count of all nodes over current and prior intervals
+            - promo: count of core nodes that were peripheral in the previous interval
+            - demo: count of peripheral nodes that were core in the previous interval
+            - avg_intervals: average number of intervals current core nodes have spent as core
+
+        Returns:
+        --------
+            pd.DataFrame: A Pandas DataFrame containing the calculated metrics for each interval frame
+                          of the network graph.
+        """
+        plot_df = pd.DataFrame(columns=['core', 'peripheral', 'new', 'all_time', 'promo', 'demo', 'avg_intervals'])
+
+        n_nodes = len(self.nodes)
+        seen = np.zeros(n_nodes, dtype=bool)
+        prev_core = np.zeros(n_nodes, dtype=bool)
+        prev_peripheral = np.zeros(n_nodes, dtype=bool)
+        core_intervals = np.zeros(n_nodes, dtype=np.int64)
+
+        for frame in range(len(self)):
+            entries = slice(self.frame_ptr[frame], self.frame_ptr[frame + 1])
+            frame_codes = self.codes[entries]
+            core_codes = frame_codes[self.core[entries]]
+            peripheral_codes = frame_codes[~self.core[entries]]
+
+            if frame == 0:
+                seen[frame_codes] = True # the first frame has no net new nodes
+
+            new_nodes = np.count_nonzero(~seen[frame_codes])
+            seen[frame_codes] = True
+
+            core_intervals[core_codes] += 1
+            avg_interval = core_intervals[core_codes].sum() / len(core_codes) if len(core_codes) else 0
+
+            core_nodes = np.zeros(n_nodes, dtype=bool)
+            core_nodes[core_codes] = True
+            peripheral_nodes = np.zeros(n_nodes, dtype=bool)
+            peripheral_nodes[peripheral_codes] = True
+
+            plot_df.loc[frame] = {
+                'core': len(core_codes),
+                'peripheral': len(peripheral_codes),
+                'new': new_nodes,
+                'all_time': np.count_nonzero(seen),
+                'promo': np.count_nonzero(prev_peripheral & core_nodes), # promotion
+                'demo': np.count_nonzero(prev_core & peripheral_nodes), # demotion
+                'avg_intervals': avg_interval
+            }
+            prev_core, prev_peripheral = core_nodes, peripheral_nodes
+
+        return plot_df
+
+
+def get_timeline(key, data, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold, progress=None,
+                 tol=PAGERANK_TOL, warm_start=False):
+    """
+    Return the shared `Timeline` of a repository, computing it on first use.
+
+    Concurrent callbacks asking for the same timeline wait for a single computation. A timeline computed
+    by another process and put in the shared store (see `share_timelines`) is read from it instead.
+
+    Args:
+    -----
+        key (tuple): A tuple identifying the repository (repo_org, repo_name).
+        data (tuple): A tuple containing four data frames (cmt_data, ism_data, pr_data, prm_data).
+        marks (list): A list of date marks representing intervals for the network graph.
+        cmt_weight, ism_weight, pr_weight, prm_weight (float): The weights to assign to edges in
+                                                               the graph based on event type.
+        threshold (tuple): A tuple containing the threshold type and value.
+        progress (callable): Optional progress function, called if the timeline is computed (see `Timeline`).
+        tol, warm_start: The PageRank settings of the frames (see `Timeline`).
+
+    Returns:
+    --------
+        Timeline: The timeline of the repository.
+    """
+    weights = (cmt_weight, ism_weight, pr_weight, prm_weight)
+    cache_key = timeline_key(key, marks, weights, threshold, tol, warm_start)
+
+    def load():
+        timeline = shared_store.get(cache_key) if shared_store is not None else None
+        if timeline is None:
+            timeline = Timeline(data, marks, *weights, threshold, tol=tol, warm_start=warm_start, progress=progress)
+            if shared_store is not None:
+                shared_store.set(cache_key, timeline, expire=timeline_cache.ttl)
+        return timeline
+
+    return timeline_cache.get_or_load(cache_key, load)
+
+
+def peek_timeline(key, marks, cmt_weight, ism_weight, pr_weight, prm_weight, threshold, tol=PAGERANK_TOL,
+                  warm_start=False):
+    """
+    Return the shared `Timeline` of a repository if it has already been computed, by this process or
+    another one sharing its timelines (see `share_timelines`), None otherwise.
+    """
+    weights = (cmt_weight, ism_weight, pr_weight, prm_weight)
+    cache_key = timeline_key(key, marks, weights, threshold, tol, warm_start)
+    timeline = timeline_cache.get(cache_key)
+    if timeline is None and shared_store is not None:
+        timeline = shared_store.get(cache_key)
+        if timeline is not None:
+            timeline_cache.put(cache_key, timeline)
+    return timeline
+
+
+def share_timelines(store):
+    """
+    Share the timelines computed by `get_timeline` with the other processes using the same `store`.
+
+    The background jobs computing the plot data run in forked processes, whose in-process caches die
+    with them: with a shared store, the network graph of the parent process reads the timeline of the
+    job instead of computing the PageRank of its windows again.
+
+    Args:
+    -----
+        store (diskcache.Cache): The shared store, any object with `get(key)` and `set(key, value, expire)`
+                                 methods (None to stop sharing).
+    """
+    global shared_store
+    shared_store = store
+
+
+def timeline_key(key, marks, weights, threshold, tol=PAGERANK_TOL, warm_start=False):
+    return (*key, tuple(marks), tuple(weights), tuple(threshold), tol, warm_start)
@@ -0,0 +1,369 @@
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import datetime as dt
+from collections import Counter
+import numpy as np
+import pandas as pd
+import networkx as nx
+import scipy.sparse as sp
+from graph_utils.edge_list import review_pairs, thread_pairs
+from data_utils.cache import LRUCache
+
+# windowed graphs shared by the network graph callbacks, keyed by repo, slider marks and weights
+windowed_graph_cache = LRUCache(max_entries=4, ttl=900)
+
+
+#------------------------------------------------------ EVENT BUCKETS --------------------------------------------------
+
+def bucket_contributions(data, marks):
+    """
+    Split the event tables into per-bucket contributions to node counts and edge weights.
+
+    Buckets alternate between the events exactly at a mark (even indices) and the events strictly
+    between two marks (odd indices), so the window covering the marks a..b is the union of the
+    buckets 2a..2b, inclusive at both ends like `build_graph`.
+
+    Args:
+    -----
+        data (tuple): A tuple containing four data frames (cmt_data, ism_data, pr_data, prm_data).
+        marks (list): A list of date marks (formatted as "%m/%Y") representing the slider positions.
+
+    Returns:
+    --------
+        tuple: A tuple containing:
+            - n_buckets (int): The number of buckets.
+            - cmt (pd.DataFrame): Commits per (bucket, author_id, committer_id) pair, in column 'n'.
+            - members (pd.DataFrame): Count contributions of the issue, review and pr message events
+              per (bucket, node), in column 'n'.
+            - pairs (pd.DataFrame): Edge contributions per (bucket, u, v, type), in column 'n', where type
+              is the event type (0: commit, 1: issue message, 2: pr review, 3: pr message) and u, v are
+              the endpoints in a canonical order.
+    """
+    mark_times = np.array([dt.datetime.strptime(m, "%m/%Y") for m in marks], dtype='datetime64[ns]')
+    n_buckets = 2 * len(mark_times) - 1
+    cmt_data, ism_data, pr_data, prm_data = (
+        d.assign(bucket=bucket_index(d['timestamp'], mark_times)).query('bucket >= 0') for d in data)
+
+    # commit pairs per bucket, counted per pair for node counts and per commit for weights
+    cmt = cmt_data.groupby(['bucket', 'author_id', 'committer_id']).size().rename('n').reset_index()
+    cmt = cmt[cmt['author_id'] != cmt['committer_id']]
+
+    # node counts and edge contributions of the issue, review and pr message events
+    ism_members, ism_pairs = thread_pairs(ism_data, 'bucket')
+    prm_members, prm_pairs = thread_pairs(prm_data, 'bucket')
+    pr = review_pairs(pr_data).assign(bucket=pr_data['bucket'])
+    members = pd.DataFrame({
+        'bucket': np.concatenate([
+            np.repeat(ism_data['bucket'].to_numpy(), ism_data['cntrb_id'].str.len()),
+            np.repeat(pr['bucket'].to_numpy(), 2),
+            np.repeat(prm_data['bucket'].to_numpy(), prm_data['cntrb_id'].str.len())
+        ]),
+        'node': np.concatenate([ism_members, pr[['cntrb_id', 'reviewer']].to_numpy().ravel(), prm_members])
+    })
+    members = members.dropna().groupby(['bucket', 'node']).size().rename('n').reset_index()
+
+    pairs = pd.concat([
+        cmt.rename(columns={'author_id': 'u', 'committer_id': 'v'}).assign(type=0),
+        ism_pairs.rename(columns={'thread': 'bucket'}).assign(type=1, n=1),
+        pr.rename(columns={'cntrb_id': 'u', 'reviewer': 'v'}).assign(type=2, n=1),
+        prm_pairs.rename(columns={'thread': 'bucket'}).assign(type=3, n=1)
+    ]).dropna()
+    # undirected edges, keyed by their endpoints in a canonical order
+    swap = pairs['u'].astype(str) > pairs['v'].astype(str)
+    pairs.loc[swap, ['u', 'v']] = pairs.loc[swap, ['v', 'u']].to_numpy()
+    pairs = pairs.groupby(['bucket', 'u', 'v', 'type'])['n'].sum().reset_index()
+
+    return n_buckets, cmt, members, pairs
+
+
+def bucket_index(timestamps, mark_times):
+    """
+    Return the bucket of each timestamp (see `bucket_contributions`), -1 outside the slider range.
+    """
+    ts = timestamps.to_numpy(dtype='datetime64[ns]')
+    k = np.searchsorted(mark_times, ts, side='right') - 1
+    at_mark = (k >= 0) & (ts == mark_times[np.clip(k, 0, None)])
+    bucket = np.where(at_mark, 2 * k, 2 * k + 1)
+    return np.where((k >= 0) & (bucket < 2 * len(mark_times) - 1), bucket, -1)
+
+#------------------------------------------------------ WINDOWED GRAPH -------------------------------------------------
+
+class BucketWindow(ABC):
+    """
+    Base class of the structures maintained over a sliding window of event buckets.
+
+    Subclasses implement `_reset` (empty the structure) and `_apply` (add or subtract the
+    contributions of one bucket), a subclass missing either cannot be instantiated; `_move`
+    brings the window to the requested buckets.
+    """
+
+    def _move(self, first, last):
+        # must be called with the lock held
+        if self._window is None or first > self._window[1] or last < self._window[0]:
+            # no overlap with the current window, start from scratch
+            self._reset()
+            current = set()
+        else:
+            current = set(range(self._window[0], self._window[1] + 1))
+        target = set(range(first, last + 1))
+        for bucket in sorted(current - target):
+            self._apply(bucket, -1)
+        for bucket in sorted(target - current):
+            self._apply(bucket, 1)
+        self._window = (first, last)
+
+    @abstractmethod
+    def _reset(self):
+        """
+        Empty the structure, before moving to a window without overlap with the current one.
+        """
+
+    @abstractmethod
+    def _apply(self, bucket, sign):
+        """
+        Add (`sign` 1) or subtract (`sign` -1) the contributions of a bucket to the structure.
+        """
+
+
+class WindowedGraph(BucketWindow):
+    """
+    Incrementally maintained contributor graph for the windows of the graph slider.
+
+    The four event tables are bucketed once by the slider marks. A window covering the marks
+    a..b is the union of the buckets between them, so moving the window only adds the buckets
+    entering it and subtracts the buckets leaving it, instead of rebuilding the graph from every
+    event in the window.
+
+    The maintained graph matches `graph_helper.build_graph` in node `count` attributes and edge
+    weights; the `issue`/`pr` edge attributes are not maintained.
+
+    Args:
+    -----
+        data (tuple): A tuple containing four data frames (cmt_data, ism_data, pr_data, prm_data).
+        marks (list): A list of date marks (formatted as "%m/%Y") representing the slider positions.
+        cmt_weight, ism_weight, pr_weight, prm_weight (float): The weights to assign to edges in
+                                                               the graph based on event type.
+    """
+
+    def __init__(self, data, marks, cmt_weight, ism_weight, pr_weight, prm_weight):
+        # as in build_graph, commit edges are weighted by their number of commits
+        self._weights = (1.0, ism_weight, pr_weight, prm_weight)
+        n_buckets, cmt, members, pairs = bucket_contributions(data, marks)
+
+        self._buckets = [{'pairs': [], 'nodes': [], 'edges': []} for _ in range(n_buckets)]
+        for b, group in cmt.groupby('bucket'):
+            self._buckets[b]['pairs'] = list(zip(group['author_id'], group['committer_id'], group['n']))
+        for b, group in members.groupby('bucket'):
+            self._buckets[b]['nodes'] = list(zip(group['node'], group['n']))
+        for b, group in pairs.groupby('bucket'):
+            self._buckets[b]['edges'] = list(zip(group['u'], group['v'], group['type'], group['n']))
+
+        self._lock = threading.Lock()
+        self._window = None # (first bucket, last bucket) currently in the graph
+        self._pairs = Counter() # (author, committer) -> commits in the window
+        self._counts = Counter() # contributor -> count attribute
+        self._edges = {} # (u, v) -> number of contributions per event type
+        self.G = nx.Graph()
+        self.last_scores = None # pagerank scores of the last displayed window, to warm start the next one
+
+    def graph(self, start, end):
+        """
+        Move the window to the slider positions `start`..`end` and return a copy of its graph.
+
+        Args:
+        -----
+            start, end (int): The slider positions (mark indices) of the window.
+
+        Returns:
+        --------
+            nx.Graph: A copy of the weighted graph of the interactions inside the window.
+        """
+        with self.window(start, end) as G:
+            return G.copy()
+
+    @contextmanager
+    def window(self, start, end):
+        """
+        Move the window to the slider positions `start`..`end` and lock its graph while in use.
+
+        The yielded graph is the maintained graph itself (no copy is made), so it must not be
+        modified and must not be used after the `with` block ends.
+
+        Args:
+        -----
+            start, end (int): The slider positions (mark indices) of the window.
+
+        Yields:
+        -------
+            nx.Graph: The weighted graph of the interactions inside the window.
+        """
+        with self._lock:
+            self._move(2 * start, 2 * end)
+            yield self.G
+
+    def _reset(self):
+        self._pairs.clear()
+        self._counts.clear()
+        self._edges.clear()
+        self.G = nx.Graph()
+
+    def _apply(self, bucket, sign):
+        """
+        Add (sign=1) or subtract (sign=-1) the contributions of a bucket to the graph.
+        """
+        contributions = self._buckets[bucket]
+        touched_nodes = set()
+        touched_edges = set()
+
+        for author, committer, n in contributions['pairs']:
+            before = self._pairs[(author, committer)]
+            after = before + sign * n
+            self._pairs[(author, committer)] = after
+            # a commit pair adds one to the count of both contributors, whatever its number of commits
+            if (before == 0) != (after == 0):
+                self._counts[author] += sign
+                self._counts[committer] += sign
+                touched_nodes.update((author, committer))
+            if after == 0:
+                del self._pairs[(author, committer)]
+
+        for node, n in contributions['nodes']:
+            self._counts[node] += sign * n
+            touched_nodes.add(node)
+
+        for u, v, event_type, n in contributions['edges']:
+            counts = self._edges.setdefault((u, v), [0, 0, 0, 0])
+            counts[event_type] += sign * n
+            touched_edges.add((u, v))
+
+        G = self.G
+        for node in touched_nodes:
+            if self._counts[node] > 0:
+                if G.has_node(node):
+                    G.nodes[node]['count'] = self._counts[node]
+                else:
+                    G.add_node(node, count=self._counts[node])
+        for u, v in touched_edges:
+            counts = self._edges[(u, v)]
+            if any(counts):
+                G.add_edge(u, v, weight=sum(n * w for n, w in zip(counts, self._weights)))
+            else:
+                del self._edges[(u, v)]
+                if G.has_edge(u, v):
+                    G.remove_edge(u, v)
+        for node in touched_nodes:
+            if self._counts[node] <= 0:
+                del self._counts[node]
+                if G.has_node(node):
+                    G.remove_node(node)
+
+
+#------------------------------------------------------ WINDOWED MATRIX ------------------------------------------------
+
+class WindowedMatrix(BucketWindow):
+    """
+    Incrementally maintained sparse adjacency matrix for the windows of the graph slider.
+
+    The matrix counterpart of `WindowedGraph`, for computations such as PageRank that work on the
+    weighted adjacency matrix and do not need a NetworkX graph. Contributors are integer codes into
+    `nodes`. For each event type, the number of contributions per edge inside the window is kept in
+    a symmetric sparse count matrix; moving the window adds the count matrices of the buckets
+    entering it and subtracts those of the buckets leaving it. Counts are kept rather than weights
+    so that edges leaving the window cancel out exactly.
+
+    Args:
+    -----
+        data (tuple): A tuple containing four data frames (cmt_data, ism_data, pr_data, prm_data).
+        marks (list): A list of date marks (formatted as "%m/%Y") representing the slider positions.
+        cmt_weight, ism_weight, pr_weight, prm_weight (float): The weights to assign to edges in
+                                                               the graph based on event type.
+    """
+
+    def __init__(self, data, marks, cmt_weight, ism_weight, pr_weight, prm_weight):
+        # as in build_graph, commit edges are weighted by their number of commits
+        self._weights = (1.0, ism_weight, pr_weight, prm_weight)
+        n_buckets, cmt, members, pairs = bucket_contributions(data, marks)
+
+        # contributor occurrences per bucket, a contributor is in the window while it has any
+        occurrences = pd.concat([
+            cmt[['bucket', 'author_id']].rename(columns={'author_id': 'node'}),
+            cmt[['bucket', 'committer_id']].rename(columns={'committer_id': 'node'}),
+            members[['bucket', 'node']]
+        ])
+        codes, self.nodes = pd.factorize(occurrences['node'])
+        index = pd.Index(self.nodes)
+        N = len(self.nodes)
+
+        self._buckets = [{'nodes': np.empty(0, dtype=np.int64), 'links': {}} for _ in range(n_buckets)]
+        occurrences = pd.DataFrame({'bucket': occurrences['bucket'].to_numpy(), 'code': codes})
+        for b, group in occurrences.groupby('bucket'):
+            self._buckets[b]['nodes'] = group['code'].to_numpy()
+        links = pairs.assign(u=index.get_indexer(pairs['u']), v=index.get_indexer(pairs['v']))
+        for (b, event_type), group in links.groupby(['bucket', 'type']):
+            counts = sp.csr_array(
+                (group['n'].to_numpy(dtype=np.int64), (group['u'].to_numpy(), group['v'].to_numpy())), shape=(N, N))
+            self._buckets[b]['links'][event_type] = counts + counts.T
+
+        self._lock = threading.Lock()
+        self._window = None # (first bucket, last bucket) currently in the matrix
+        self._reset()
+
+    def matrix(self, start, end):
+        """
+        Move the window to the slider positions `start`..`end` and return its adjacency matrix.
+
+        Args:
+        -----
+            start, end (int): The slider positions (mark indices) of the window.
+
+        Returns:
+        --------
+            tuple: A tuple containing:
+                - codes (np.ndarray): The codes (indices into `nodes`) of the contributors in the window.
+                - A (scipy.sparse.csr_array): The weighted adjacency matrix of the window, with rows and
+                  columns in the order of `codes`.
+        """
+        with self._lock:
+            self._move(2 * start, 2 * end)
+            codes = np.flatnonzero(self._counts > 0)
+            A = sum(w * counts for w, counts in zip(self._weights, self._links))
+            return codes, sp.csr_array(A[codes][:, codes], dtype=float)
+
+    def _reset(self):
+        N = len(self.nodes)
+        self._counts = np.zeros(N, dtype=np.int64) # contributor -> occurrences in the window
+        self._links = [sp.csr_array((N, N), dtype=np.int64) for _ in range(4)] # contributions per event type
+
+    def _apply(self, bucket, sign):
+        """
+        Add (sign=1) or subtract (sign=-1) the contributions of a bucket to the matrix.
+        """
+        contributions = self._buckets[bucket]
+        np.add.at(self._counts, contributions['nodes'], sign)
+        for event_type, counts in contributions['links'].items():
+            links = self._links[event_type] + sign * counts
+            links.eliminate_zeros()
+            self._links[event_type] = links
+
+
+def get_windowed_graph(key, data, marks, cmt_weight, ism_weight, pr_weight, prm_weight):
+    """
+    Return the shared `WindowedGraph` for a repository, slider marks and weights, creating it if needed.
+
+    Args:
+    -----
+        key (tuple): A tuple identifying the repository (repo_org, repo_name).
+        data (tuple): A tuple containing four data frames (cmt_data, ism_data, pr_data, prm_data).
+        marks (list): A list of date marks (formatted as "%m/%Y") representing the slider positions.
+        cmt_weight, ism_weight, pr_weight, prm_weight (float): The weights to assign to edges in
+                                                               the graph based on event type.
+
+    Returns:
+    --------
+        WindowedGraph: The windowed graph engine.
+    """
+    weights = (cmt_weight, ism_weight, pr_weight, prm_weight)
+    return windowed_graph_cache.get_or_load(
+        (*key, tuple(marks), weights),
+        lambda: WindowedGraph(data, marks, *weights))
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the app modules are imported from the app directory (e.g. `from graph_utils.edge_list import ...`)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,40 @@
+import sys
+import datetime as dt
+import networkx as nx
+import pytest
+from graph_utils.graph_helper import draw_network, apply_pagerank
+
+resource = pytest.importorskip('resource')
+
+FRAMES = 500
+WARMUP_FRAMES = 50
+# growth of the peak resident memory allowed over the frames drawn after the warm up (the layout
+# caches are bounded, so drawing more frames must not keep more memory)
+MAX_RSS_GROWTH_MB = 25
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def test_draw_network_memory_is_bounded():
+    G = nx.barabasi_albert_graph(80, 3, seed=1)
+    nx.set_edge_attributes(G, 1.0, 'weight')
+    nx.set_node_attributes(G, 3, 'count')
+    pagerank_scores, norm_scores = apply_pagerank(G)
+    threshold_score = sorted(pagerank_scores.values())[-10]
+
+    for frame in range(FRAMES):
+        if frame == WARMUP_FRAMES:
+            baseline = peak_rss_mb()
+        # a new window every frame, as when the slider or the animation moves
+        start_date = dt.datetime(2000, 1, 1) + dt.timedelta(days=frame)
+        fig = draw_network(G, start_date, start_date + dt.timedelta(days=30), pagerank_scores, norm_scores,
+                           threshold_score, layout_key=('org', 'repo', (1.0, 0.1, 2.0, 0.5)))
+        assert len(fig.data) > 0
+
+    assert peak_rss_mb() - baseline < MAX_RSS_GROWTH_MB
+    # the figures are built with Plotly only, no Matplotlib figure is left open
+    assert 'matplotlib.pyplot' not in sys.modules or not sys.modules['matplotlib.pyplot'].get_fignums()
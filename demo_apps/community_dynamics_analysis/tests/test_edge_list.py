@@ -0,0 +1,88 @@
+import random
+import uuid
+import datetime as dt
+import pandas as pd
+import pytest
+from graph_utils.graph_helper import build_graph
+from graph_utils.edge_list import build_graph_vectorized
+from data_utils.ids import normalize_ids
+
+START = dt.datetime(2020, 1, 1)
+WEIGHTS = (1, 0.1, 2, 0.5)
+
+
+def random_data(seed, n_people, n_events):
+    """
+    Build random event frames (cmt_data, ism_data, pr_data, prm_data) over two years, with repeated pairs,
+    self pairs and duplicate contributors in the thread lists.
+    """
+    rnd = random.Random(seed)
+    people = [f'c{i}' for i in range(n_people)]
+
+    def timestamps(n):
+        return [START + dt.timedelta(days=rnd.randint(0, 730), hours=rnd.randint(0, 23)) for _ in range(n)]
+
+    def contributors(n):
+        return [rnd.choice(people) for _ in range(n)]
+
+    def threads(n):
+        return [[rnd.choice(people) for _ in range(rnd.randint(1, 6))] for _ in range(n)]
+
+    n_threads = n_events // 2
+    cmt_data = pd.DataFrame({'cmt_commit_hash': [f'h{i}' for i in range(n_events)], 'timestamp': timestamps(n_events),
+                             'author_id': contributors(n_events), 'committer_id': contributors(n_events)})
+    ism_data = pd.DataFrame({'issue_id': range(n_threads), 'cntrb_id': threads(n_threads),
+                             'timestamp': timestamps(n_threads)})
+    pr_data = pd.DataFrame({'pull_request_id': range(n_events), 'cntrb_id': contributors(n_events),
+                            'reviewer': contributors(n_events), 'timestamp': timestamps(n_events)})
+    prm_data = pd.DataFrame({'pull_request_id': range(n_threads), 'cntrb_id': threads(n_threads),
+                             'timestamp': timestamps(n_threads)})
+    return cmt_data, ism_data, pr_data, prm_data
+
+
+def assert_same_graph(expected, actual):
+    assert list(actual.nodes) == list(expected.nodes)
+    assert dict(actual.nodes(data='count')) == dict(expected.nodes(data='count'))
+    assert {frozenset(edge) for edge in actual.edges} == {frozenset(edge) for edge in expected.edges}
+    for u, v, attrs in expected.edges(data=True):
+        other = actual[u][v]
+        assert other['weight'] == pytest.approx(attrs['weight'])
+        assert other.get('issue') == attrs.get('issue')
+        assert other.get('pr') == attrs.get('pr')
+
+
+@pytest.mark.parametrize('seed', range(12))
+@pytest.mark.parametrize('window', [(0, 730), (60, 150), (400, 401), (1000, 1100)])
+def test_vectorized_graph_matches_reference(seed, window):
+    data = random_data(seed, n_people=random.Random(seed).choice([2, 5, 30]), n_events=300)
+    start_date, end_date = (START + dt.timedelta(days=day) for day in window)
+
+    expected = build_graph(data, start_date, end_date, *WEIGHTS)
+    actual = build_graph_vectorized(data, start_date, end_date, *WEIGHTS)
+
+    assert_same_graph(expected, actual)
+
+
+def test_empty_frames():
+    data = tuple(frame.iloc[:0] for frame in random_data(0, n_people=5, n_events=10))
+
+    assert_same_graph(build_graph(data, START, START + dt.timedelta(days=730), *WEIGHTS),
+                      build_graph_vectorized(data, START, START + dt.timedelta(days=730), *WEIGHTS))
+
+
+def test_contributor_ids_are_one_node():
+    # the commit and review queries return uuid.UUID ids, the threads may hold their string form
+    contributor, other = uuid.uuid4(), uuid.uuid4()
+    day = START + dt.timedelta(days=1)
+    cmt_data = pd.DataFrame({'cmt_commit_hash': ['h0'], 'timestamp': [day], 'author_id': [contributor],
+                             'committer_id': [other]})
+    ism_data = pd.DataFrame({'issue_id': [0], 'cntrb_id': [[str(contributor), str(other)]], 'timestamp': [day]})
+    pr_data = pd.DataFrame({'pull_request_id': [0], 'cntrb_id': [contributor], 'reviewer': [other],
+                            'timestamp': [day]})
+    prm_data = pd.DataFrame({'pull_request_id': [0], 'cntrb_id': [[contributor, str(other)]], 'timestamp': [day]})
+    data = normalize_ids((cmt_data, ism_data, pr_data, prm_data))
+
+    for build in (build_graph, build_graph_vectorized):
+        G = build(data, START, START + dt.timedelta(days=2), *WEIGHTS)
+        assert sorted(G.nodes) == sorted([str(contributor), str(other)])
+        assert G.number_of_edges() == 1
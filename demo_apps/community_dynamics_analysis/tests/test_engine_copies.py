@@ -0,0 +1,21 @@
+from pathlib import Path
+import pytest
+
+APP_DIR = Path(__file__).resolve().parents[1]
+REPO_DIR = APP_DIR.parents[1]
+
+# vendored copies of data_utils/engine.py in the other apps
+COPIES = ('notebooks/collab_network/wasm/data_utils/engine.py', 'models/density_metrics/pages/df/engine.py')
+
+
+def code_lines(path):
+    # the lines of a module without its leading comment, nor the default config path relative to each app
+    lines = path.read_text().splitlines()
+    while lines and lines[0].startswith('#'):
+        lines.pop(0)
+    return [line for line in lines if not line.startswith('CONFIG_PATH =')]
+
+
+@pytest.mark.parametrize('copy', COPIES)
+def test_engine_copy_matches_original(copy):
+    assert code_lines(REPO_DIR / copy) == code_lines(APP_DIR / 'data_utils' / 'engine.py')
@@ -0,0 +1,37 @@
+import warnings
+import datetime as dt
+import pandas as pd
+import pytest
+from graph_utils.timeline import Timeline
+
+MARKS = ['01/2020', '02/2020', '03/2020', '04/2020']
+WEIGHTS = (1, 0.1, 2, 0.5)
+
+
+def events(days):
+    """
+    Build event frames with a commit and a pull request review between the same contributors on each day.
+    """
+    timestamps = [dt.datetime(2020, 1, 1) + dt.timedelta(days=day) for day in days]
+    cmt_data = pd.DataFrame({'cmt_commit_hash': [f'h{i}' for i in range(len(days))], 'timestamp': timestamps,
+                             'author_id': ['a'] * len(days), 'committer_id': ['b'] * len(days)})
+    ism_data = pd.DataFrame({'issue_id': pd.Series([], dtype=int), 'cntrb_id': pd.Series([], dtype=object),
+                             'timestamp': pd.Series([], dtype='datetime64[ns]')})
+    pr_data = pd.DataFrame({'pull_request_id': range(len(days)), 'cntrb_id': ['c'] * len(days),
+                            'reviewer': ['a'] * len(days), 'timestamp': timestamps})
+    prm_data = ism_data.rename(columns={'issue_id': 'pull_request_id'})
+    return cmt_data, ism_data, pr_data, prm_data
+
+
+@pytest.mark.parametrize('threshold', [['number', 1], ['percentage', 50], ['elbow', 0]])
+def test_plot_data_of_an_interval_without_events(threshold):
+    # events in January and March only, February has no node
+    data = events([3, 10, 65, 70])
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        plot_df = Timeline(data, MARKS, *WEIGHTS, threshold).plot_data()
+
+    assert len(plot_df) == len(MARKS) - 1
+    assert not plot_df.isna().any().any()
+    assert plot_df.loc[1, 'core'] == 0 and plot_df.loc[1, 'peripheral'] == 0
+    assert plot_df.loc[1, 'avg_intervals'] == 0
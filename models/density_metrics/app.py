@@ -2,8 +2,8 @@
 from subprocess import call
 import dash_bootstrap_components as dbc
 import dash
-from dash import Dash, dcc, html, callback
-from dash.dependencies import Output, Input
+from dash import Dash, dcc, html, callback, no_update
+from dash.dependencies import Output, Input, State
 
 app = Dash(
     __name__,
@@ -16,8 +16,17 @@ app = Dash(
     }],
 )
 
-# import dataframe for options to the dropdown list
-from pages.df.df_activities import dframe_perc
+# data providers of the pages, loaded in the background (see pages/df/provider.py)
+from pages.df.df_activities import activities
+from pages.df.df_communities import communities
+from pages.df.df_performances import performances
+from pages.df.provider import LOADING_MESSAGE
+
+providers = [activities, communities, performances]
+
+# milliseconds between two checks for new data, while loading and once loaded
+POLL_INTERVAL_LOADING = 2000
+POLL_INTERVAL_LOADED = 30000
 
 # side bar code for page navigation
 sidebar = html.Div(
@@ -45,6 +54,11 @@ app.layout = dbc.Container(
                     [
                         html.H1("Org-repo Density Metrics", className="text-center"),
 
+                        # versions of the loaded data, the pages are drawn again when they change
+                        dcc.Store(id="data-version"),
+                        dcc.Interval(id="data-poll", interval=POLL_INTERVAL_LOADING),
+                        html.Div(id="data-status", className="text-center"),
+
                         # search bar with buttons
                         html.Label(
                             ["Select Github org and repo:"],
@@ -62,7 +76,7 @@ app.layout = dbc.Container(
                                             style={"display": True},
                                             value="kubernetes",
                                             placeholder="Select Organization",
-                                            options=[{"label": c, "value": c} for c in dframe_perc["org"].unique()],
+                                            options=[],
                                         ),
                                         dcc.Dropdown(
                                             id="select_repo",
@@ -118,15 +132,54 @@ app.layout = dbc.Container(
     )
 
 
+# data loading status
+@callback(
+    Output("data-version", "data"),
+    Output("data-status", "children"),
+    Output("data-poll", "interval"),
+    Input("data-poll", "n_intervals"),
+    State("data-version", "data"),
+)
+def poll_data(n_intervals, data_version):
+    # accessing the providers starts their loading on the first poll
+    for provider in providers:
+        provider.get()
+    statuses = [provider.status() for provider in providers]
+    version = [status["version"] for status in statuses]
+
+    if all(status["loaded"] for status in statuses):
+        message, interval = "", POLL_INTERVAL_LOADED
+    else:
+        errors = [status["error"] for status in statuses if not status["loaded"] and status["error"]]
+        message = LOADING_MESSAGE if not errors else "Loading data failed, retrying: {}".format(errors[0])
+        interval = POLL_INTERVAL_LOADING
+
+    if version == data_version:
+        version = no_update # nothing new since the last poll, the pages are not drawn again
+    return version, message, interval
+
+
 # cascading dropdown
-@callback(Output("select_repo", "options"), Input("select_org", "value"))
-def get_repo_options(select_org):
-    org_data = dframe_perc[dframe_perc["org"] == select_org]
-    return [{"label": i, "value": i} for i in org_data["repo"].unique()]
+@callback(Output("select_org", "options"), Input("data-version", "data"))
+def get_org_options(data_version):
+    frames = activities.get()
+    if frames is None:
+        return []
+    return [{"label": c, "value": c} for c in frames["orgs"]]
+
+
+@callback(Output("select_repo", "options"), Input("select_org", "value"), Input("data-version", "data"))
+def get_repo_options(select_org, data_version):
+    frames = activities.get()
+    if frames is None:
+        return []
+    return [{"label": i, "value": i} for i in frames["repos_by_org"].get(select_org, [])]
 
 
 @callback(Output("select_repo", "value"),Input("select_repo", "options"))
 def update_repo_value(select_repo):
+    if not select_repo:
+        return None
     return [v["value"] for v in select_repo][0]
 
 
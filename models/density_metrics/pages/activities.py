@@ -13,7 +13,8 @@ import plotly.io as pio
 pio.templates.default = "plotly_white"
 
 # Dataframe
-from pages.df.df_activities import dframe_perc, breakdown_frame
+from pages.df.df_activities import activities
+from pages.df.provider import LOADING_MESSAGE
 
 
 # layout of first (activity) tab ******************************************
@@ -61,14 +62,19 @@ layout = dbc.Card(
 @callback(
     Output(component_id='activity_output_container', component_property='children'),
     Output(component_id="barplot", component_property="figure"),
-    [Input(component_id='select_org', component_property='value')]
+    [Input(component_id='select_org', component_property='value'),
+     Input(component_id='data-version', component_property='data')]
 )
 
-def update_graph(select_org):
+def update_graph(select_org, data_version):
+
+    frames = activities.get()
+    if frames is None:
+        return (LOADING_MESSAGE, {})
 
     container = 'Density within {}'.format(select_org)
 
-    dframe_org = dframe_perc[dframe_perc['org'] == select_org]
+    dframe_org = frames['perc_by_org'][select_org]
     barchart=px.bar(
         data_frame=dframe_org,
         x="org",
@@ -85,16 +91,21 @@ def update_graph(select_org):
     Output(component_id='activity_output_subgraph_title', component_property='children'),
     Output(component_id='breakdown', component_property='figure'),
     Input(component_id='select_repo', component_property='value'),
-    Input(component_id='select_org', component_property='value')
+    Input(component_id='select_org', component_property='value'),
+    Input(component_id='data-version', component_property='data')
 )
 
 
-def update_side_graph(select_repo, select_org):
+def update_side_graph(select_repo, select_org, data_version):
+
+    frames = activities.get()
+    if frames is None:
+        return LOADING_MESSAGE, {}
 
     subgraph_title = 'Changes in Activity by Month - {}'.format(select_repo)
 
-    df_org = breakdown_frame[breakdown_frame["rg_name"] == select_org]
-    df_repo = df_org[df_org["repo_name"] == select_repo].groupby(["rg_name", "repo_name", "pr_yearmonth"]).sum().reset_index()
+    # monthly sums of the repository, computed once per data load
+    df_repo = frames['breakdown_by_repo'][(select_org, select_repo)]
     breakdown_fig = go.Figure(
         data=[
             # go.Bar(
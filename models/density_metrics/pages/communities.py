@@ -14,7 +14,8 @@ import plotly.io as pio
 pio.templates.default = "plotly_white"
 
 # Dataframe
-from pages.df.df_communities import df_pr_committers
+from pages.df.df_communities import communities
+from pages.df.provider import LOADING_MESSAGE
 
 
 # layout of second (community) tab ******************************************
@@ -51,17 +52,20 @@ layout = dbc.Card(
 @callback(
     Output(component_id='community_output_container', component_property='children'),
     Output(component_id="c_graph2", component_property="figure"),
-    [Input(component_id='select_org', component_property='value')]
+    [Input(component_id='select_org', component_property='value'),
+     Input(component_id='data-version', component_property='data')]
 )
 
-def update_graph(select_org):
+def update_graph(select_org, data_version):
+
+    frames = communities.get()
+    if frames is None:
+        return (LOADING_MESSAGE, {})
 
     container = 'Number of Unique Committers - {}'.format(select_org)
 
-    df_org = df_pr_committers[df_pr_committers['rg_name'] == select_org]
-    # group by yearmonth and repo name to get the monthly unique committers.
-    pr_committer_gb = df_org.groupby(['yearmonth', 'repo_name'])['num_of_unique_commit'].sum()
-    pr_committer_gb = pr_committer_gb.to_frame().reset_index(drop=False, inplace=False).rename(columns={'num_of_unique_commit':'Number of Unique Committers'})
+    # monthly unique committers of each repository, computed once per data load
+    pr_committer_gb = frames['committers_by_org'][select_org]
 
     barchart=px.bar(
         data_frame=pr_committer_gb,
@@ -83,20 +87,25 @@ def update_graph(select_org):
 Output(component_id='community_output_subgraph_title', component_property='children'),
 Output(component_id='breakdown_commit', component_property='figure'),
 Input(component_id='select_repo', component_property='value'),
-Input(component_id='select_org', component_property='value')
+Input(component_id='select_org', component_property='value'),
+Input(component_id='data-version', component_property='data')
 )
 
 # def update_side_graph(hov_data, clk_data, slct_data, select_org):
-def update_side_graph(select_repo, select_org):
+def update_side_graph(select_repo, select_org, data_version):
+
+    frames = communities.get()
+    if frames is None:
+        return LOADING_MESSAGE, {}
 
     subgraph_title = 'Number of Commits by Committer - {}'.format(select_repo)
 
-    df_org = df_pr_committers[df_pr_committers['rg_name'] == select_org]
-    df_repo = df_org[df_org['repo_name'] == select_repo]
-    sub_frame = df_repo[["rg_name", "repo_name", 'yearmonth', 'cmt_committer_raw_email', 'cntrb_company', 'num_of_commit']]
+    df_repo = frames['commits_by_repo'][(select_org, select_repo)]
+    sub_frame = df_repo[["rg_name", "repo_name", 'yearmonth', 'cmt_committer_raw_email', 'cntrb_company',
+                         'num_of_commit']]
     pvt_table = pd.pivot_table(sub_frame, values='num_of_commit',
                             index=['cmt_committer_raw_email', 'cntrb_company'],
-                        columns=['yearmonth'], aggfunc=np.sum)
+                        columns=['yearmonth'], aggfunc=np.sum, observed=True)
     pvt_table = pvt_table.fillna(0)
     pvt_table = pvt_table.reset_index().rename(columns={'2022-1':'Jan', '2022-2':'Feb', '2022-3':'Mar',
                                                 '2022-4':'Apr', '2022-5':'May', '2022-6':'Jun',
@@ -0,0 +1,40 @@
+"""
+Create or refresh the activity materialized views read by the activities page.
+
+Run from the app directory (next to config.json), e.g. from cron after the Augur collection:
+
+    python -m pages.df.activity_views [--create] [--blocking] [--config <path>]
+
+`--create` creates the views and their indexes first (once, with a user allowed to create the
+`density_metrics` schema, see `--config`). Without the views the app computes the same frames itself.
+"""
+import argparse
+import sys
+import time
+from pages.df.engine import load_config, create_engine_from_config, get_engine
+from pages.df.df_activities import create_activity_views, refresh_activity_views
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or refresh the activity materialized views.")
+    parser.add_argument('--create', action='store_true',
+                        help="Create the views and their indexes if they do not exist.")
+    parser.add_argument('--blocking', action='store_true',
+                        help="Refresh without CONCURRENTLY: faster, but the views cannot be read meanwhile.")
+    parser.add_argument('--config', help="Config file of a database user owning the views (the app config by default).")
+    args = parser.parse_args()
+
+    engine = create_engine_from_config(load_config(args.config)) if args.config else get_engine()
+    start = time.perf_counter()
+    if args.create:
+        # creating the views fills them, no refresh needed
+        create_activity_views(engine)
+        print(f"Created the activity views in {time.perf_counter() - start:.1f}s")
+    else:
+        refresh_activity_views(engine, concurrently=not args.blocking)
+        print(f"Refreshed the activity views in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,25 +2,8 @@ import pandas as pd
 import json
 import sqlalchemy as salc
 import psycopg2
-
-with open("../config.json") as config_file:
-    config = json.load(config_file)
-
-database_connection_string = 'postgresql+psycopg2://{}:{}@{}:{}/{}'.format(
-                              config['user'],
-                              config['password'],
-                              config['host'],
-                              config['port'],
-                              config['database']
-                            )
-
-dbschema='augur_data'
-engine = salc.create_engine(
-    database_connection_string,
-    connect_args={'options': '-csearch_path={}'.format(dbschema)})
-
-
-dframe = pd.DataFrame()
+from pages.df.engine import get_engine
+from pages.df.provider import DataProvider, FrameIndex
 
 repo_query = salc.sql.text(f"""
 /*
@@ -151,29 +134,186 @@ from pr_table
 order by pr_table.repo_id, pr_table.repo_name, pr_table.pr_year, pr_table.pr_month   
 """)
 
-dframe = pd.read_sql(repo_query, con=engine)
+#------------------------------------------------------ MATERIALIZED VIEWS ---------------------------------------------
+
+# schema of the materialized views, outside of augur_data
+VIEW_SCHEMA = 'density_metrics'
+
+# the rows of repo_query with their total activity score, and the activity percentage of each repository within its org.
+# Created and refreshed with `python -m pages.df.activity_views` (see README)
+ACTIVITY_VIEWS_DDL = [
+    f"CREATE SCHEMA IF NOT EXISTS {VIEW_SCHEMA}",
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {VIEW_SCHEMA}.repo_activity_monthly AS
+    SELECT monthly.*,
+        (COALESCE(monthly.issue_increment, 0) + COALESCE(monthly.pr_increment, 0)
+            + COALESCE(monthly.closed_pr_increment, 0) + COALESCE(monthly.merged_pr_increment, 0)
+        )::double precision AS total
+    FROM ({repo_query.text}) AS monthly
+    """,
+    # unique index required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+    f"""
+    CREATE UNIQUE INDEX IF NOT EXISTS repo_activity_monthly_repo_month_idx
+        ON {VIEW_SCHEMA}.repo_activity_monthly (repo_id, pr_year, pr_month)
+    """,
+    f"""
+    CREATE INDEX IF NOT EXISTS repo_activity_monthly_org_repo_month_idx
+        ON {VIEW_SCHEMA}.repo_activity_monthly (rg_name, repo_name, pr_year, pr_month)
+    """,
+    f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {VIEW_SCHEMA}.repo_activity_percentage AS
+    SELECT org, repo, percentage
+    FROM (
+        SELECT rg_name AS org,
+            repo_name AS repo,
+            (100 * SUM(total) / NULLIF(ABS(SUM(SUM(total)) OVER (PARTITION BY rg_name)), 0)
+            )::double precision AS percentage
+        FROM {VIEW_SCHEMA}.repo_activity_monthly
+        GROUP BY rg_name, repo_name
+    ) AS p
+    WHERE percentage <> 0
+    """,
+    f"""
+    CREATE UNIQUE INDEX IF NOT EXISTS repo_activity_percentage_org_repo_idx
+        ON {VIEW_SCHEMA}.repo_activity_percentage (org, repo)
+    """
+]
+
+# the percentage view is computed from the monthly view, they are refreshed in this order
+ACTIVITY_VIEWS = [f'{VIEW_SCHEMA}.repo_activity_monthly', f'{VIEW_SCHEMA}.repo_activity_percentage']
+
+monthly_view_query = salc.sql.text(f"""
+SELECT * FROM {VIEW_SCHEMA}.repo_activity_monthly
+ORDER BY repo_id, repo_name, pr_year, pr_month
+""")
+
+percentage_view_query = salc.sql.text(f"""
+SELECT org, repo, percentage FROM {VIEW_SCHEMA}.repo_activity_percentage
+ORDER BY percentage DESC
+""")
+
+
+def create_activity_views(engine=None):
+    """
+    Create the activity materialized views and their indexes, if they do not exist yet, and fill them.
+
+    Args:
+    -----
+        engine (sqlalchemy.engine.Engine): The engine of a user allowed to create the views
+                                           (the app engine by default).
+    """
+    with (engine or get_engine()).begin() as connection:
+        for statement in ACTIVITY_VIEWS_DDL:
+            connection.execute(salc.sql.text(statement))
+
+
+def refresh_activity_views(engine=None, concurrently=True):
+    """
+    Recompute the activity materialized views, in a single transaction.
+
+    Args:
+    -----
+        engine (sqlalchemy.engine.Engine): The engine of the owner of the views (the app engine by default).
+        concurrently (bool): Whether to refresh without locking out the readers of the views (slower).
+    """
+    option = ' CONCURRENTLY' if concurrently else ''
+    with (engine or get_engine()).begin() as connection:
+        for view in ACTIVITY_VIEWS:
+            connection.execute(salc.sql.text(f"REFRESH MATERIALIZED VIEW{option} {view}"))
+
+
+#------------------------------------------------------ ACTIVITY FRAMES ------------------------------------------------
+
+def load_activities():
+    """
+    Read the monthly activity of every repository and the activity percentages from the materialized
+    views, or compute them from `repo_query` when the views do not exist.
+
+    Returns:
+    --------
+        dict: The monthly activity increments of each repository ('breakdown_frame') and the activity
+              percentage of each repository within its org ('dframe_perc').
+    """
+    try:
+        with get_engine().connect() as connection:
+            dframe = pd.read_sql(monthly_view_query, con=connection)
+            dframe_perc = pd.read_sql(percentage_view_query, con=connection)
+    except salc.exc.DBAPIError:
+        dframe, dframe_perc = None, None # views not created, aggregated below
+
+    if dframe is None:
+        dframe = pd.read_sql(repo_query, con=get_engine())
+
+    # Fill all NA value into zero
+    dframe = dframe.fillna(0)
+
+    if dframe_perc is None:
+        # create a total column
+        dframe['total'] = (dframe['issue_increment'] + dframe['pr_increment'] + dframe['closed_pr_increment']
+                           + dframe['merged_pr_increment'])
+        dframe_perc = activity_percentages(dframe)
+
+    # sort by org and repo once, so the rows of a repository are contiguous
+    dframe = dframe.sort_values(['rg_name', 'repo_name'], kind='stable', ignore_index=True)
+
+    # create a breakdown frame for the breakdown chart
+    return {'breakdown_frame': dframe, 'dframe_perc': dframe_perc}
+
+
+def activity_percentages(dframe):
+    """
+    Compute the activity percentage of each repository within its org, as the percentage view does.
+
+    Args:
+    -----
+        dframe (pd.DataFrame): The monthly activity of every repository, with its 'total' column.
 
+    Returns:
+    --------
+        pd.DataFrame: The org ('org'), repository ('repo') and activity percentage ('percentage') of the
+                      repositories with some activity, by decreasing percentage.
+    """
+    # calculating activeness percentage based on org and repo_name
+    dframe_group = dframe.groupby(['rg_name', 'repo_name']).agg({'total': 'sum'})
+    dframe_perc = dframe_group.groupby(level=0, group_keys=False).apply(lambda x:100 * x / float(abs(x['total'].sum())))
+    dframe_perc = dframe_perc['total'].to_frame().sort_values(by = 'total', ascending=False).reset_index()
 
-# Fill all NA value into zero
-dframe = dframe.fillna(0)
+    # exclude the repo that has no total value and rename the columns
+    dframe_perc = dframe_perc[dframe_perc['total'] != 0.0]
+    return dframe_perc.rename(columns={'rg_name':'org',
+                                       'repo_name':'repo',
+                                       'total':'percentage'})
 
-# create a total column
-dframe['total'] = dframe['issue_increment'] + dframe['pr_increment']  + dframe['closed_pr_increment'] + dframe['merged_pr_increment']
 
-# create a breakdown frame for the breakdown chart
-breakdown_frame = dframe
+def build_activities(frames):
+    """
+    Compute the rollups of the callbacks from the loaded activity frames.
 
+    Args:
+    -----
+        frames (dict): The frames of `load_activities`, with categorical org and repository names.
 
-# calculating activeness percentage based on org and repo_name
-dframe_group = dframe.groupby(['rg_name', 'repo_name']).agg({'total': 'sum'})
-dframe_perc = dframe_group.groupby(level=0).apply(lambda x:100 * x / float(abs(x.sum())))
-dframe_perc = dframe_perc['total'].to_frame().sort_values(by = 'total', ascending=False).reset_index()
+    Returns:
+    --------
+        dict: The monthly activity increments of each repository ('breakdown_frame'), the activity
+              percentage of each repository within its org ('dframe_perc') and their rollups: the orgs
+              ('orgs'), the repositories of each org by decreasing percentage ('repos_by_org'), the
+              percentages by org ('perc_by_org') and the monthly increments by (org, repo) ('breakdown_by_repo').
+    """
+    breakdown_frame, dframe_perc = frames['breakdown_frame'], frames['dframe_perc']
 
-# exclude the repo that has no total value and rename the columns
-dframe_perc = dframe_perc[dframe_perc['total'] != 0.0]
-dframe_perc = dframe_perc.rename(columns={'rg_name':'org',
-                                            'repo_name':'repo',
-                                            'total':'percentage'})
+    # rollups looked up by the callbacks
+    orgs = dframe_perc['org'].unique().tolist()
+    repos_by_org = {org: repos.tolist() for org, repos in
+                    dframe_perc.groupby('org', sort=False, observed=True)['repo'].unique().items()}
+    perc_by_org = FrameIndex(dframe_perc, 'org')
+    monthly = breakdown_frame.groupby(['rg_name', 'repo_name', 'pr_yearmonth'], observed=True).sum(numeric_only=True)
+    monthly = monthly.reset_index()
+    breakdown_by_repo = FrameIndex(monthly, ['rg_name', 'repo_name'])
 
+    return {'dframe_perc': dframe_perc, 'breakdown_frame': breakdown_frame, 'orgs': orgs, 'repos_by_org': repos_by_org,
+            'perc_by_org': perc_by_org, 'breakdown_by_repo': breakdown_by_repo}
 
 
+# activity frames, loaded on first access and refreshed in the background
+activities = DataProvider('activities', load_activities, build_activities)
@@ -3,9 +3,8 @@ import numpy as np
 import json
 import sqlalchemy as salc
 import psycopg2
-from pages.df.df_activities import engine
-
-df_pr_committers = pd.DataFrame()
+from pages.df.engine import get_engine
+from pages.df.provider import DataProvider, FrameIndex
 
 committer_query = salc.sql.text(f"""
 /*
@@ -58,4 +57,47 @@ committer_query = salc.sql.text(f"""
 """)
 
 
-df_pr_committers = pd.read_sql(committer_query, con=engine)
+def load_communities():
+    """
+    Query the monthly commits of every committer since 2022.
+
+    Returns:
+    --------
+        dict: The number of commits of each committer by repository and month ('df_pr_committers').
+    """
+    df_pr_committers = pd.read_sql(committer_query, con=get_engine())
+
+    # sort by org and repo once, so the rows of a repository are contiguous
+    df_pr_committers = df_pr_committers.sort_values(['rg_name', 'repo_name'], kind='stable', ignore_index=True)
+    return {'df_pr_committers': df_pr_committers}
+
+
+def build_communities(frames):
+    """
+    Compute the rollups of the callbacks from the loaded community frames.
+
+    Args:
+    -----
+        frames (dict): The frames of `load_communities`, with categorical org, repository and committer columns.
+
+    Returns:
+    --------
+        dict: The number of commits of each committer by repository and month ('df_pr_committers'),
+              with its rollups: the monthly unique committers of each repository by org
+              ('committers_by_org') and the rows of each (org, repo) ('commits_by_repo').
+    """
+    df_pr_committers = frames['df_pr_committers']
+
+    # group by yearmonth and repo name to get the monthly unique committers.
+    unique_committers = df_pr_committers.groupby(['rg_name', 'yearmonth', 'repo_name'],
+                                                 observed=True)['num_of_unique_commit'].sum()
+    unique_committers = unique_committers.reset_index().rename(
+        columns={'num_of_unique_commit':'Number of Unique Committers'})
+
+    return {'df_pr_committers': df_pr_committers,
+            'committers_by_org': FrameIndex(unique_committers, 'rg_name'),
+            'commits_by_repo': FrameIndex(df_pr_committers, ['rg_name', 'repo_name'])}
+
+
+# community frames, loaded on first access and refreshed in the background
+communities = DataProvider('communities', load_communities, build_communities)
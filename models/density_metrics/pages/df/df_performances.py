@@ -2,7 +2,8 @@ import pandas as pd
 import json
 import sqlalchemy as salc
 import psycopg2
-from pages.df.df_activities import engine
+from pages.df.engine import get_engine
+from pages.df.provider import DataProvider, FrameIndex
 
 pr_query = salc.sql.text(f"""
 /*
@@ -94,9 +95,6 @@ def Bar_Color(i):
     elif i == 'Expired':
         return "grey"
 
-dframe_pr = pd.read_sql(pr_query, con=engine)
-dframe_pr['color'] = list(map(Bar_Color, dframe_pr['segment']))
-
 
 issue_query = salc.sql.text(f"""
 SELECT x.repo_group_id,
@@ -168,7 +166,55 @@ SELECT x.repo_group_id,
 	order by x.repo_id
 """)
 
-dframe_issue = pd.read_sql(issue_query, con=engine)
 
-# iterate through the Bar_Color function to unify the color for different groups
-dframe_issue['color'] = list(map(Bar_Color, dframe_issue['segment']))
\ No newline at end of file
+def load_performances():
+    """
+    Query the PR and issue close durations of every repository.
+
+    Returns:
+    --------
+        dict: The PR ('dframe_pr') and issue ('dframe_issue') counts by repository, month and segment.
+    """
+    dframe_pr = pd.read_sql(pr_query, con=get_engine())
+    dframe_pr['color'] = list(map(Bar_Color, dframe_pr['segment']))
+
+    dframe_issue = pd.read_sql(issue_query, con=get_engine())
+
+    # iterate through the Bar_Color function to unify the color for different groups
+    dframe_issue['color'] = list(map(Bar_Color, dframe_issue['segment']))
+
+    # sort by org and repo once, so the rows of a repository are contiguous
+    dframe_pr = dframe_pr.sort_values(['rg_name', 'repo_name'], kind='stable', ignore_index=True)
+    dframe_issue = dframe_issue.sort_values(['rg_name', 'repo_name'], kind='stable', ignore_index=True)
+    return {'dframe_pr': dframe_pr, 'dframe_issue': dframe_issue}
+
+
+def build_performances(frames):
+    """
+    Compute the rollups of the callbacks from the loaded performance frames.
+
+    Args:
+    -----
+        frames (dict): The frames of `load_performances`, with categorical org, repository, month and segment columns.
+
+    Returns:
+    --------
+        dict: The PR ('dframe_pr') and issue ('dframe_issue') counts by repository, month and segment,
+              with their rollups: the 10 repositories with the highest total score by org ('pr_top_by_org',
+              'issue_top_by_org') and the monthly counts by segment by (org, repo) ('pr_by_repo', 'issue_by_repo').
+    """
+    frames = dict(frames)
+    for name in ['pr', 'issue']:
+        dframe = frames[f'dframe_{name}']
+        totals = dframe.groupby(['rg_name', 'repo_name'], observed=True)['total'].sum().reset_index()
+        top = totals.sort_values(by='total', ascending=False, kind='stable').groupby('rg_name', observed=True).head(10)
+        monthly = dframe.groupby(['rg_name', 'repo_name', 'yearmonth', 'segment', 'color'], observed=True)['num'].sum()
+        monthly = monthly.reset_index()
+        frames[f'{name}_top_by_org'] = FrameIndex(top, 'rg_name')
+        frames[f'{name}_by_repo'] = FrameIndex(monthly, ['rg_name', 'repo_name'])
+
+    return frames
+
+
+# performance frames, loaded on first access and refreshed in the background
+performances = DataProvider('performances', load_performances, build_performances)
@@ -0,0 +1,224 @@
+import threading
+import time
+import pandas as pd
+from pages.df.engine import load_config
+from pages.df.storage import compact, memory_usage, read_shared, write_shared, shared_lock
+
+# seconds between two refreshes of the data frames, unless set with 'data_refresh_interval' in the config
+REFRESH_INTERVAL = 3600
+# seconds before a failed first load is tried again
+RETRY_INTERVAL = 60
+
+# shown by the pages in place of their titles while the data frames are being loaded
+LOADING_MESSAGE = 'Loading data...'
+
+
+#------------------------------------------------------ DATA PROVIDER --------------------------------------------------
+
+class DataProvider:
+    """
+    Thread-safe holder of data frames loaded lazily and refreshed in the background.
+
+    The first access starts a daemon thread that runs `load`, so importing a page or starting the
+    app never waits for the database. Until the first load has finished, `get` returns None and the
+    pages show a loading state. The thread then loads the frames again every `refresh_interval`
+    seconds and swaps the new frames in at once: a callback reading `get` once sees either the old
+    or the new frames, never a mix. A failed refresh keeps the previous frames.
+
+    The frames returned by `load` are compacted (see `storage.compact`) before `build` computes the
+    rollups of the callbacks from them. With a `shared_dir`, the compacted frames are written to
+    Arrow files mapped by every worker: the first worker to refresh queries the database while the
+    others wait, then they all map the same files instead of keeping their own copy.
+
+    Args:
+    -----
+        name (str): The name of the data set, used in the status, the thread and shared file names.
+        load (callable): A function without arguments returning a dictionary of data frames.
+        build (callable): An optional function computing the final dictionary of data frames from
+                          the compacted frames of `load`.
+        refresh_interval (float): The number of seconds between refreshes (None for the
+                                  'data_refresh_interval' config key, 0 to never refresh).
+        shared_dir (str): The directory of the shared frame files (None for the 'shared_frames_dir'
+                          config key, sharing is disabled if it is not set either).
+    """
+
+    def __init__(self, name, load, build=None, refresh_interval=None, shared_dir=None):
+        self.name = name
+        self.refresh_interval = refresh_interval
+        self.shared_dir = shared_dir
+        self._load = load
+        self._build = build
+        self._frames = None
+        self._memory = {} # frame name -> memory before/after compaction
+        self._version = 0 # incremented at each swap
+        self._loaded_at = None
+        self._error = None
+        self._thread = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Return the dictionary of data frames of the last load, or None while the first load is running.
+        """
+        self.start()
+        return self._frames
+
+    def start(self):
+        """
+        Start the background loading thread, if not started yet.
+
+        The thread is started by the first access rather than at import, so every forked worker
+        (e.g. gunicorn) runs its own.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f'data-provider-{self.name}', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """
+        Stop refreshing after the current load, the frames loaded so far are kept.
+        """
+        self._stopped.set()
+
+    def refresh(self):
+        """
+        Load the data frames in the calling thread and swap them in.
+
+        Returns:
+        --------
+            dict: The new data frames.
+        """
+        shared_dir = self.shared_dir if self.shared_dir is not None else load_config().get('shared_frames_dir')
+        if shared_dir is None:
+            frames, memory = self._load_compact()
+        else:
+            # the first worker holding the lock queries the database, the others map its files
+            with shared_lock(shared_dir, self.name):
+                frames = read_shared(shared_dir, self.name, self._interval() or REFRESH_INTERVAL)
+                if frames is None:
+                    frames, memory = self._load_compact()
+                    write_shared(shared_dir, self.name, frames)
+                    frames = read_shared(shared_dir, self.name, float('inf')) or frames
+                else:
+                    memory = {name: {'before': None, 'after': memory_usage(frame)} for name, frame in frames.items()}
+                for report in memory.values():
+                    report['shared'] = True
+        if self._build is not None:
+            frames = self._build(frames)
+
+        with self._lock:
+            self._frames = frames
+            self._memory = memory
+            self._version += 1
+            self._loaded_at = time.time()
+            self._error = None
+        return frames
+
+    def status(self):
+        """
+        Return whether the frames are loaded ('loaded'), the number of swaps ('version'), the time of
+        the last swap ('loaded_at') and the error of the last failed load ('error', None otherwise).
+        """
+        with self._lock:
+            return {'loaded': self._frames is not None, 'version': self._version, 'loaded_at': self._loaded_at,
+                    'error': None if self._error is None else repr(self._error)}
+
+    def memory_report(self):
+        """
+        Return the memory used by each frame of the last load before ('before_mb') and after ('after_mb')
+        compaction, and whether it is mapped from a shared file ('shared'). Frames mapped from the files
+        of another worker have no 'before_mb'.
+
+        Returns:
+        --------
+            pd.DataFrame: The report, a row per frame.
+        """
+        with self._lock:
+            memory = dict(self._memory)
+        rows = [{'frame': name, 'before_mb': None if report['before'] is None else report['before'] / 1e6,
+                 'after_mb': report['after'] / 1e6, 'shared': report.get('shared', False)}
+                for name, report in memory.items()]
+        return pd.DataFrame(rows, columns=['frame', 'before_mb', 'after_mb', 'shared'])
+
+    def _load_compact(self):
+        # load the frames and compact them, measuring their memory before and after
+        frames, memory = {}, {}
+        for name, frame in self._load().items():
+            frames[name] = compact(frame)
+            memory[name] = {'before': memory_usage(frame), 'after': memory_usage(frames[name])}
+        return frames, memory
+
+    def _interval(self):
+        if self.refresh_interval is None:
+            return load_config().get('data_refresh_interval', REFRESH_INTERVAL)
+        return self.refresh_interval
+
+    def _run(self):
+        interval = None
+        while not self._stopped.is_set():
+            try:
+                interval = self._interval()
+                self.refresh()
+            except Exception as error:
+                with self._lock:
+                    self._error = error # the previous frames, if any, are still served
+            if self._frames is None:
+                wait = RETRY_INTERVAL
+            elif interval:
+                wait = interval
+            else:
+                return # loaded once, refreshing disabled
+            self._stopped.wait(wait)
+
+
+#------------------------------------------------------ ROLLUPS ------------------------------------------------------
+
+class FrameIndex:
+    """
+    Index of the rows of a data frame by the values of `keys`, computed once per load so the page
+    callbacks look up the rows of an org (or repository) instead of filtering the whole frame.
+
+    The rows of each key must be contiguous: frames sorted by their keys (the loaded frames are sorted
+    by org and repository) are indexed as they are, others are sorted once by a stable sort. Only the
+    bounds of each key are kept; looking up a key slices its rows into a new frame, whose categorical
+    columns only keep the categories of these rows (so the figures do not list the repositories of
+    other orgs). Missing keys give an empty frame with the same columns.
+
+    Args:
+    -----
+        frame (pd.DataFrame): The data frame.
+        keys (str or list): The column(s) to index by, a key is a tuple of their values for several columns.
+    """
+
+    def __init__(self, frame, keys):
+        positions = frame.groupby(keys, sort=False, observed=True).indices
+        if any(rows[-1] - rows[0] + 1 != len(rows) for rows in positions.values()):
+            # the rows of some keys are not contiguous, sort them once
+            frame = frame.sort_values(keys, kind='stable', ignore_index=True)
+            positions = frame.groupby(keys, sort=False, observed=True).indices
+        self._frame = frame
+        self._slices = {key: slice(rows[0], rows[-1] + 1) for key, rows in positions.items()}
+
+    def __getitem__(self, key):
+        rows = self._slices.get(key, slice(0, 0))
+        return remove_unused_categories(self._frame.iloc[rows].reset_index(drop=True))
+
+    def __contains__(self, key):
+        return key in self._slices
+
+    def __len__(self):
+        return len(self._slices)
+
+    def keys(self):
+        return self._slices.keys()
+
+
+def remove_unused_categories(frame):
+    """
+    Return a data frame whose categorical columns only keep the categories present in its rows.
+    """
+    categoricals = {name: values.cat.remove_unused_categories() for name, values in frame.items()
+                    if isinstance(values.dtype, pd.CategoricalDtype)}
+    return frame.assign(**categoricals) if categoricals else frame
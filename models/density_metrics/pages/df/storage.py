@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+
+# string columns with at most this ratio of distinct values to rows are stored as categoricals
+CATEGORY_RATIO = 0.5
+
+
+#------------------------------------------------------ COMPACT FRAMES -------------------------------------------------
+
+def compact(frame, category_ratio=CATEGORY_RATIO):
+    """
+    Return a copy of a data frame using less memory: repeated strings (org and repository names,
+    months, emails, companies, ...) become categoricals and numeric columns are downcast to the
+    smallest integer or float type holding their values.
+
+    Grouping by a categorical column must pass `observed=True`, otherwise every category appears
+    in the result, including the categories absent from the rows grouped.
+
+    Args:
+    -----
+        frame (pd.DataFrame): The data frame.
+        category_ratio (float): The maximum ratio of distinct values to rows of the string columns
+                                converted to categoricals.
+
+    Returns:
+    --------
+        pd.DataFrame: The compacted data frame.
+    """
+    columns = {}
+    for name, values in frame.items():
+        if values.dtype == object or isinstance(values.dtype, pd.StringDtype):
+            if values.nunique() <= category_ratio * len(values):
+                values = values.astype('category')
+        elif pd.api.types.is_bool_dtype(values):
+            pass
+        elif pd.api.types.is_integer_dtype(values):
+            values = pd.to_numeric(values, downcast='integer')
+        elif pd.api.types.is_float_dtype(values):
+            values = pd.to_numeric(values, downcast='float')
+        columns[name] = values
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def memory_usage(frame):
+    """
+    Return the number of bytes used by a data frame, including the strings of its object columns.
+    """
+    return int(frame.memory_usage(deep=True).sum())
+
+
+#------------------------------------------------------ SHARED FRAMES --------------------------------------------------
+
+def write_shared(directory, name, frames):
+    """
+    Write data frames to uncompressed Arrow files shared by the app workers, see `read_shared`.
+
+    Each frame is written to `<name>-<frame>.arrow`, then a `<name>.json` manifest listing them is
+    written. Files are replaced atomically, so readers see either the old or the new file, and
+    workers that mapped the old file keep it until they read the new one.
+
+    Args:
+    -----
+        directory (str): The directory of the shared files.
+        name (str): The name of the data set (e.g. 'activities').
+        frames (dict): The data frames by name.
+    """
+    import pyarrow as pa
+
+    os.makedirs(directory, exist_ok=True)
+    for frame_name, frame in frames.items():
+        table = pa.Table.from_arrays([arrow_column(values) for _, values in frame.items()], names=list(frame.columns))
+        path = os.path.join(directory, f'{name}-{frame_name}.arrow')
+        with pa.OSFile(path + '.tmp', 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(path + '.tmp', path)
+
+    manifest = {'written_at': time.time(), 'frames': list(frames)}
+    path = os.path.join(directory, f'{name}.json')
+    with open(path + '.tmp', 'w') as manifest_file:
+        json.dump(manifest, manifest_file)
+    os.replace(path + '.tmp', path)
+
+
+def read_shared(directory, name, max_age):
+    """
+    Map the data frames written by `write_shared` into memory, if written less than `max_age` seconds ago.
+
+    Numeric columns without missing values and the codes of categorical columns are read without copy,
+    so their memory is shared by every worker mapping the same file. Other columns (strings, dates,
+    durations, columns with missing values) are copied.
+
+    Args:
+    -----
+        directory (str): The directory of the shared files.
+        name (str): The name of the data set.
+        max_age (float): The maximum age of the files, in seconds.
+
+    Returns:
+    --------
+        dict: The data frames by name, or None if the files are missing, too old, or being replaced.
+    """
+    import pyarrow as pa
+
+    manifest = read_manifest(directory, name)
+    if manifest is None or time.time() - manifest['written_at'] > max_age:
+        return None
+    frames = {}
+    try:
+        for frame_name in manifest['frames']:
+            table = pa.ipc.open_file(pa.memory_map(os.path.join(directory, f'{name}-{frame_name}.arrow'))).read_all()
+            columns = {column: pandas_column(table.column(column)) for column in table.column_names}
+            frames[frame_name] = pd.DataFrame(columns, copy=False)
+    except (OSError, pa.ArrowInvalid):
+        return None # replaced by another worker while reading, loaded from the database instead
+    # a frame of another generation may have been mapped if the files were replaced meanwhile
+    if read_manifest(directory, name) != manifest:
+        return None
+    return frames
+
+
+def read_manifest(directory, name):
+    """
+    Return the manifest of the shared files of a data set, or None if there is none.
+    """
+    try:
+        with open(os.path.join(directory, f'{name}.json')) as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+
+
+def shared_lock(directory, name):
+    """
+    Return an open lock file of a data set, locked exclusively with `fcntl.flock` until it is closed,
+    so a single worker queries the database while the others wait for its files. Without `fcntl`
+    (e.g. on Windows), the file is returned unlocked.
+    """
+    os.makedirs(directory, exist_ok=True)
+    lock_file = open(os.path.join(directory, f'{name}.lock'), 'w')
+    try:
+        import fcntl
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+    except ImportError:
+        pass
+    return lock_file
+
+
+def arrow_column(values):
+    """
+    Convert a pandas column to an Arrow array: categoricals become dictionary arrays of their codes,
+    and NaN stays a float value in numeric columns.
+    """
+    import pyarrow as pa
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        categories = pa.array(values.cat.categories.to_numpy())
+        return pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0), categories)
+    if values.dtype.kind in 'iuf':
+        return pa.array(values.to_numpy())
+    return pa.array(values, from_pandas=True)
+
+
+def pandas_column(column):
+    """
+    Convert an Arrow column read by `read_shared` back to a pandas column, without copy when possible.
+    """
+    import pyarrow as pa
+
+    if column.num_chunks == 1:
+        chunk = column.chunk(0)
+        if pa.types.is_dictionary(chunk.type):
+            indices = chunk.indices.fill_null(-1) if chunk.null_count else chunk.indices
+            return pd.Categorical.from_codes(indices.to_numpy(zero_copy_only=False),
+                                             categories=chunk.dictionary.to_pandas())
+        if chunk.null_count == 0 and (pa.types.is_integer(chunk.type) or pa.types.is_floating(chunk.type)):
+            return np.asarray(chunk.to_numpy(zero_copy_only=True))
+    return column.to_pandas()
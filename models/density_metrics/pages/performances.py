@@ -13,7 +13,8 @@ import plotly.io as pio
 pio.templates.default = "plotly_white"
 
 # Dataframe
-from pages.df.df_performances import dframe_issue, dframe_pr
+from pages.df.df_performances import performances
+from pages.df.provider import LOADING_MESSAGE
 
 
 # layout of thrid (performance) tab ******************************************
@@ -72,19 +73,22 @@ layout = dbc.Card(
     Output(component_id='issue_performance_output_container', component_property='children'),
     Output(component_id='p_graph1', component_property="figure"),
     Output(component_id="p_graph2", component_property="figure"),
-    [Input(component_id='select_org', component_property='value')]
+    [Input(component_id='select_org', component_property='value'),
+     Input(component_id='data-version', component_property='data')]
 )
 
-def update_graph(select_org):
+def update_graph(select_org, data_version):
+
+    frames = performances.get()
+    if frames is None:
+        return (LOADING_MESSAGE, LOADING_MESSAGE, {}, {})
 
     container_pr = 'Top 10 PR Performance in {}'.format(select_org)
     container_issue = 'Top 10 Issue Performance in {}'.format(select_org)
 
-    df_pr = dframe_pr.groupby(['rg_name', 'repo_name']).sum().reset_index()
-    pr_final = df_pr[df_pr['rg_name'] == select_org].sort_values(by='total', ascending=False)[:10]
-    
-    df_issue = dframe_issue.groupby(['rg_name', 'repo_name']).sum().reset_index()
-    issue_final = df_issue[df_issue['rg_name'] == select_org].sort_values(by='total', ascending=False)[:10]
+    # top 10 repositories of each org, computed once per data load
+    pr_final = frames['pr_top_by_org'][select_org]
+    issue_final = frames['issue_top_by_org'][select_org]
 
     piechart_pr = px.pie(
         data_frame=pr_final,
@@ -123,15 +127,19 @@ def update_graph(select_org):
     Output(component_id='pr_performance_output_subgraph_title', component_property='children'),
     Output(component_id='breakdown_performance', component_property='figure'),
     Input(component_id='select_repo', component_property='value'),
-    Input(component_id='select_org', component_property='value')
+    Input(component_id='select_org', component_property='value'),
+    Input(component_id='data-version', component_property='data')
 )
 
-def update_side_graph1(select_repo, select_org):
+def update_side_graph1(select_repo, select_org, data_version):
+
+    frames = performances.get()
+    if frames is None:
+        return LOADING_MESSAGE, {}
 
     subgraph_title_pr = 'Breakdown of PR Performance - {}'.format(select_repo)
 
-    df_org = dframe_pr[dframe_pr['rg_name'] == select_org]
-    df_repo = df_org[df_org['repo_name'] == select_repo].groupby(['yearmonth', 'segment', 'color']).sum().reset_index()
+    df_repo = frames['pr_by_repo'][(select_org, select_repo)]
 
     sub_piechart_pr = go.Figure(
                         data = [
@@ -158,16 +166,20 @@ def update_side_graph1(select_repo, select_org):
     Output(component_id='issue_performance_output_subgraph_title', component_property='children'),
     Output(component_id='breakdown_performance2', component_property='figure'),
     Input(component_id='select_repo', component_property='value'),
-    Input(component_id='select_org', component_property='value')
+    Input(component_id='select_org', component_property='value'),
+    Input(component_id='data-version', component_property='data')
 )
 
 
-def update_side_graph2(select_repo, select_org):
+def update_side_graph2(select_repo, select_org, data_version):
+
+    frames = performances.get()
+    if frames is None:
+        return LOADING_MESSAGE, {}
 
     subgraph_title_issue = 'Breakdown of Issue Performance - {}'.format(select_repo)
 
-    df_org = dframe_issue[dframe_issue['rg_name'] == select_org]
-    df_repo = df_org[df_org['repo_name'] == select_repo].groupby(['yearmonth', 'segment','color']).sum().reset_index()
+    df_repo = frames['issue_by_repo'][(select_org, select_repo)]
 
     sub_piechart_issue = go.Figure(
                         data = [
@@ -0,0 +1,131 @@
+# Vendored copy of demo_apps/community_dynamics_analysis/data_utils/engine.py, where the original
+# lives: change it there and copy it here. The apps run from their own directories, with
+# their own import roots, so they cannot import it.
+import os
+import json
+import threading
+import sqlalchemy as salc
+
+# path of the config file, relative to the app directory unless absolute
+CONFIG_PATH = os.environ.get('RAPPEL_CONFIG', 'config.json')
+
+dbschema = 'augur_data'
+
+# pool settings read from the config file, passed to SQLAlchemy when present (otherwise its defaults apply)
+POOL_SETTINGS = ('pool_size', 'max_overflow', 'pool_recycle', 'pool_timeout', 'pool_pre_ping')
+
+_config = None
+_engine = None
+_lock = threading.Lock()
+
+
+def load_config(path=None):
+    """
+    Load the config file (see README), once per process unless a path is given.
+
+    Args:
+    -----
+        path (str): Optional path of the config file, `CONFIG_PATH` by default.
+
+    Returns:
+    --------
+        dict: The configuration.
+    """
+    global _config
+    if path is not None:
+        with open(path) as config_file:
+            return json.load(config_file)
+    if _config is None:
+        with open(CONFIG_PATH) as config_file:
+            _config = json.load(config_file)
+    return _config
+
+
+def create_engine_from_config(config):
+    """
+    Create a SQLAlchemy engine for the Augur database described by a configuration.
+
+    The engine connects to the Postgres database of the config ('user', 'password', 'host', 'port',
+    'database') with `augur_data` as search path, unless 'engine_url' is set (e.g. a local SQLite or
+    DuckDB stand-in). The pool settings of `POOL_SETTINGS` found in the config are applied to
+    Postgres engines.
+
+    Args:
+    -----
+        config (dict): The configuration.
+
+    Returns:
+    --------
+        sqlalchemy.engine.Engine: The engine. No connection is opened until it is first used.
+    """
+    url = config.get('engine_url')
+    if url is None:
+        url = 'postgresql+psycopg2://{}:{}@{}:{}/{}'.format(
+            config['user'], config['password'], config['host'], config['port'], config['database'])
+    url = salc.engine.make_url(url)
+
+    kwargs = {}
+    if url.get_backend_name() == 'postgresql':
+        kwargs['connect_args'] = {'options': '-csearch_path={}'.format(dbschema)}
+        kwargs.update({key: config[key] for key in POOL_SETTINGS if key in config})
+
+    return salc.create_engine(url, **kwargs)
+
+
+def get_engine():
+    """
+    Return the process-wide database engine, creating it on first use.
+
+    Creating the engine lazily keeps imports free of database work, and lets every forked worker
+    (e.g. gunicorn) build its own connection pool instead of inheriting the parent's.
+
+    Returns:
+    --------
+        sqlalchemy.engine.Engine: The engine.
+    """
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _engine = create_engine_from_config(load_config())
+    return _engine
+
+
+def set_engine(engine):
+    """
+    Replace the process-wide engine, e.g. with a local SQLite or DuckDB stand-in in tests.
+
+    Args:
+    -----
+        engine (sqlalchemy.engine.Engine): The new engine (None to create it again from the config on next use).
+
+    Returns:
+    --------
+        sqlalchemy.engine.Engine: The previous engine (None if it had not been created).
+    """
+    global _engine
+    with _lock:
+        previous, _engine = _engine, engine
+    return previous
+
+
+def dispose_engine():
+    """
+    Close the pooled connections of the engine and drop it, so the next use creates a new one.
+    """
+    previous = set_engine(None)
+    if previous is not None:
+        previous.dispose()
+
+
+def _after_fork():
+    # a forked child (e.g. a background job of the dashboard) must not use the pooled connections of its
+    # parent, nor close them: the pool is dropped without closing them and a new engine is created on use
+    global _engine, _lock
+    _lock = threading.Lock()
+    if _engine is not None:
+        _engine.dispose(close=False)
+        _engine = None
+
+
+os.register_at_fork(after_in_child=_after_fork)
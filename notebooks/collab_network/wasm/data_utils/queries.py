@@ -1,17 +1,6 @@
 import sqlalchemy as salc
-import json
 import pandas as pd
-
-with open("config.json") as config_file:
-    config = json.load(config_file)
-
-# connect to Augur database
-database_connection_string = 'postgresql+psycopg2://{}:{}@{}:{}/{}'.format(config['user'], config['password'], config['host'], config['port'], config['database'])
-
-dbschema='augur_data'
-engine = salc.create_engine(
-    database_connection_string,
-    connect_args={'options': '-csearch_path={}'.format(dbschema)})
+from data_utils.engine import get_engine
 
 def fetch_data(repo_org, repo_name):
     """
@@ -58,7 +47,6 @@ def is_repo_exists(repo_org, repo_name):
         bool: True if the repository exists, False otherwise.
     """
     repo_check_query = salc.sql.text(f"""
-        SET SCHEMA 'augur_data';
         SELECT EXISTS (
             SELECT 1
             FROM repo_groups rg
@@ -67,7 +55,7 @@ def is_repo_exists(repo_org, repo_name):
         )
     """)
 
-    result = pd.read_sql(repo_check_query, con=engine)
+    result = pd.read_sql(repo_check_query, con=get_engine())
     exists = result.iloc[0, 0] 
     return exists
 
@@ -87,7 +75,6 @@ def commit_query(repo_org, repo_name):
                       author and committer IDs.
     """
     cmt_query = salc.sql.text(f"""
-                    SET SCHEMA 'augur_data';
                     SELECT
                         DISTINCT c.cmt_commit_hash,
                         c.cmt_committer_timestamp as timestamp,
@@ -106,7 +93,7 @@ def commit_query(repo_org, repo_name):
                         timestamp DESC
             """)
 
-    cmt_data = pd.read_sql(cmt_query, con=engine)
+    cmt_data = pd.read_sql(cmt_query, con=get_engine())
     cmt_data = cmt_data.dropna()
     # Convert the timestamp column to offset-naive datetime objects
     cmt_data['timestamp'] = cmt_data['timestamp'].apply(lambda x: x.replace(tzinfo=None) if x.tzinfo else x)
@@ -129,7 +116,6 @@ def issue_msg_query(repo_org, repo_name):
                       contributor IDs associated with each issue.
     """
     ism_query = salc.sql.text(f"""
-                 SET SCHEMA 'augur_data';
                  SELECT
                     i.issue_id,
                     m.cntrb_id,
@@ -150,7 +136,7 @@ def issue_msg_query(repo_org, repo_name):
                       timestamp DESC
         """)
 
-    ism_data = pd.read_sql(ism_query, con=engine)
+    ism_data = pd.read_sql(ism_query, con=get_engine())
 
     # reformat issue message data, combine contributor ids for each issue
     ism_data = ism_data.groupby('issue_id').agg({'cntrb_id': list, 'timestamp': 'last'}).reset_index()
@@ -177,7 +163,6 @@ def pr_query(repo_org, repo_name):
                       contributor IDs, and reviewer IDs for each pull request.
     """
     pr_query = salc.sql.text(f"""
-                  SET SCHEMA 'augur_data';
                   SELECT
                       pr.pull_request_id,
                       pre.cntrb_id,
@@ -200,7 +185,7 @@ def pr_query(repo_org, repo_name):
                       timestamp DESC
           """)
 
-    pr_data = pd.read_sql(pr_query, con=engine)
+    pr_data = pd.read_sql(pr_query, con=get_engine())
     pr_data = pr_data.dropna()
 
     return pr_data
@@ -221,7 +206,6 @@ def pr_msg_query(repo_org, repo_name):
                       and contributor IDs associated with each pull request message thread.
     """
     prm_query = salc.sql.text(f"""
-                  SET SCHEMA 'augur_data';
                   SELECT
                       pr.pull_request_id,
                       m.cntrb_id,
@@ -242,7 +226,7 @@ def pr_msg_query(repo_org, repo_name):
                       timestamp DESC
           """)
 
-    prm_data = pd.read_sql(prm_query, con=engine)
+    prm_data = pd.read_sql(prm_query, con=get_engine())
 
     # reformat pull request message data, combine contributor ids for each pr thread
     prm_data = prm_data.groupby('pull_request_id').agg({'cntrb_id': list, 'timestamp': 'last'}).reset_index()
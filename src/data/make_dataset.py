@@ -1,30 +1,107 @@
 """Data collection code."""
+import os
+import sys
+import time
 import click
 import logging
+import datetime as dt
 from pathlib import Path
 from dotenv import find_dotenv, load_dotenv
 
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+# the Augur queries and snapshot store of the community dynamics dashboard
+APP_DIR = PROJECT_DIR / "demo_apps" / "community_dynamics_analysis"
+
+
+def read_repo_list(path):
+    """Read the repositories to collect, one `org/repo` per line.
+
+    Blank lines and lines starting with `#` are ignored.
+    """
+    repos = []
+    with open(path) as repo_file:
+        for line in repo_file:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                repo_org, repo_name = line.split("/", 1)
+                repos.append((repo_org.strip(), repo_name.strip()))
+    return repos
+
 
 @click.command()
 @click.argument("input_filepath", type=click.Path(exists=True))
 @click.argument("output_filepath", type=click.Path())
-def main(input_filepath, output_filepath):
-    """Run data processing scripts to turn raw data to cleaned data.
+@click.option("--full", is_flag=True, help="Re-download the whole history instead of a delta.")
+@click.option("--config", "config_path", type=click.Path(exists=True), default=None,
+              help="Augur config.json (default: $RAPPEL_CONFIG or the dashboard's config.json).")
+def main(input_filepath, output_filepath, full, config_path):
+    """Collect the Augur event data of a list of repositories into the processed data store.
 
-    Transforms raw data from (../raw) into cleaned data ready to be analyzed
-    (saved in ../processed).
+    Reads the repositories (one `org/repo` per line) from INPUT_FILEPATH and refreshes their
+    snapshots under OUTPUT_FILEPATH (see `data_utils.snapshot.SnapshotStore`). For every repository,
+    only the events updated since the watermarks of its last successful run are queried, unless
+    `--full` is given. Run statistics are written to OUTPUT_FILEPATH/runs, including whether each
+    repository ran in delta or full mode (`mixed` when only some of its tables had to be fetched in full).
     """
     logger = logging.getLogger(__name__)
-    logger.info("making final data set from raw data")
+
+    if config_path:
+        os.environ["RAPPEL_CONFIG"] = config_path
+    else:
+        os.environ.setdefault("RAPPEL_CONFIG", str(APP_DIR / "config.json"))
+    sys.path.insert(0, str(APP_DIR))
+    from data_utils.queries import query_data
+    from data_utils.snapshot import SnapshotStore, write_json
+
+    store = SnapshotStore(output_filepath)
+    repos = read_repo_list(input_filepath)
+    run = {
+        "started_at": dt.datetime.now().isoformat(timespec="seconds"),
+        "mode": "full" if full else "delta",
+        "repos": {},
+    }
+    logger.info("collecting %d repositories (%s)", len(repos), run["mode"])
+
+    for repo_org, repo_name in repos:
+        start = time.perf_counter()
+        try:
+            stats = store.refresh(repo_org, repo_name, query_data, full=full)
+        except Exception as error:
+            # the watermarks are only advanced by a successful refresh, the next run retries the repository
+            logger.exception("failed to collect %s/%s", repo_org, repo_name)
+            run["repos"][f"{repo_org}/{repo_name}"] = {"status": "failed", "error": repr(error)}
+            continue
+
+        # a repository runs in delta mode only if none of its tables had to be fetched in full
+        modes = set(stats["modes"].values())
+        run["repos"][f"{repo_org}/{repo_name}"] = {
+            "status": "ok",
+            "mode": modes.pop() if len(modes) == 1 else "mixed",
+            "table_modes": stats["modes"],
+            "since": {table: since.isoformat() if since is not None else None
+                      for table, since in stats["since"].items()},
+            "fetched": stats["fetched"],
+            "watermarks": stats["watermarks"],
+            "query_seconds": stats["timings"],
+            "seconds": time.perf_counter() - start,
+        }
+        logger.info("%s/%s: %s rows fetched (%s)", repo_org, repo_name, sum(stats["fetched"].values()),
+                    run["repos"][f"{repo_org}/{repo_name}"]["mode"])
+
+    run["finished_at"] = dt.datetime.now().isoformat(timespec="seconds")
+    run_id = run["started_at"].replace(":", "")
+    write_json(Path(output_filepath) / "runs" / f"{run_id}.json", run)
+    write_json(Path(output_filepath) / "runs" / "last_run.json", run)
+
+    failed = [repo for repo, stats in run["repos"].items() if stats["status"] == "failed"]
+    if failed:
+        raise click.ClickException(f"failed to collect {len(failed)} repositories: {', '.join(failed)}")
 
 
 if __name__ == "__main__":
     log_fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     logging.basicConfig(level=logging.INFO, format=log_fmt)
 
-    # not used in this stub but often useful for finding various files
-    project_dir = Path(__file__).resolve().parents[2]
-
     # find .env automagically by walking up directories until it's found, then
     # load up the .env entries as environment variables
     load_dotenv(find_dotenv())